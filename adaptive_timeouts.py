@@ -0,0 +1,281 @@
+"""
+Adaptive connect/read timeouts learned from observed latency
+
+Keeps one latency histogram per (agent ARN, payload size bucket, optional
+variant such as the requested duration) for the longest silent gap of each
+call (what botocore's read_timeout applies to) and one per endpoint host
+for connection setup (DNS + TCP + TLS). Deadlines are a high percentile
+times a safety margin, clamped to floors and ceilings, and the ceiling is
+used until enough samples exist, so a long legitimate call is never cut off
+before its latency is known. A call that hits the read deadline is
+recorded at that deadline so the next one gets more room.
+
+All calls share one client (and so one warm connection pool) built with the
+ceilings; each call's own deadlines are applied to its connection by a
+connection mixin, the way phase_timing hooks in.
+
+What was learned is saved to TIMEOUT_POLICY (JSON) and reloaded next run.
+
+  python3 adaptive_timeouts.py            (AGENT/REPEAT/DURATION_SECONDS invocations through the policy)
+  python3 adaptive_timeouts.py show       (print the learned deadlines)
+  TIMEOUT_POLICY=timeout_policy.json  TIMEOUT_PERCENTILE=99.9  TIMEOUT_MARGIN=1.5  TIMEOUT_MIN_SAMPLES=20
+  READ_FLOOR=10  READ_CEILING=900  CONNECT_FLOOR=2  CONNECT_CEILING=60
+"""
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from botocore.exceptions import ConnectTimeoutError, ReadTimeoutError
+
+from agentcore_common import (REGION, agent_arn, build_payload, endpoint_url, expected_seconds, install_connection_mixin,
+                              make_client, new_session_id)
+from latency_histogram import LatencyHistogram, RunStats
+from phase_timing import PhaseTimer
+from streaming_reader import read_streaming_body
+
+
+def size_bucket(payload_bytes):
+    """Payload sizes grouped by powers of 4 bytes: '1KB', '4KB', '16KB', ..."""
+    bucket = 1024
+    while bucket < payload_bytes:
+        bucket *= 4
+    return f'{bucket // 1024}KB' if bucket < 1024 * 1024 else f'{bucket // (1024 * 1024)}MB'
+
+
+class TimeoutPolicy:
+    """Learned latency distributions and the deadlines derived from them"""
+
+    def __init__(self, percentile=99.9, margin=1.5, min_samples=20, read_floor=10.0, read_ceiling=900.0,
+                 connect_floor=2.0, connect_ceiling=60.0):
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.read_floor = read_floor
+        self.read_ceiling = read_ceiling
+        self.connect_floor = connect_floor
+        self.connect_ceiling = connect_ceiling
+        self.read = {}  # 'arn|size bucket[|variant]' -> LatencyHistogram of the longest silent gap per call
+        self.connect = {}  # endpoint host -> LatencyHistogram of DNS + TCP + TLS
+        self.timeouts = {}  # same keys -> read timeouts seen
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            percentile=float(os.getenv('TIMEOUT_PERCENTILE', '99.9')),
+            margin=float(os.getenv('TIMEOUT_MARGIN', '1.5')),
+            min_samples=int(os.getenv('TIMEOUT_MIN_SAMPLES', '20')),
+            read_floor=float(os.getenv('READ_FLOOR', '10')),
+            read_ceiling=float(os.getenv('READ_CEILING', '900')),
+            connect_floor=float(os.getenv('CONNECT_FLOOR', '2')),
+            connect_ceiling=float(os.getenv('CONNECT_CEILING', '60')),
+        )
+
+    @staticmethod
+    def key(arn, payload_bytes, variant=None):
+        key = f'{arn}|{size_bucket(payload_bytes)}'
+        return f'{key}|{variant}' if variant else key
+
+    def _deadline(self, histogram, floor, ceiling):
+        if histogram is None or histogram.count < self.min_samples:
+            return ceiling
+        return min(ceiling, max(floor, histogram.percentile(self.percentile) * self.margin))
+
+    def deadlines(self, arn, payload_bytes, host, variant=None):
+        """(connect_timeout, read_timeout) in seconds for one call"""
+        with self._lock:
+            return (self._deadline(self.connect.get(host), self.connect_floor, self.connect_ceiling),
+                    self._deadline(self.read.get(self.key(arn, payload_bytes, variant)), self.read_floor,
+                                   self.read_ceiling))
+
+    def record(self, arn, payload_bytes, host, read_seconds, connect_seconds=None, variant=None):
+        with self._lock:
+            self.read.setdefault(self.key(arn, payload_bytes, variant), LatencyHistogram()).record(read_seconds)
+            if connect_seconds is not None:
+                self.connect.setdefault(host, LatencyHistogram()).record(connect_seconds)
+
+    def record_read_timeout(self, arn, payload_bytes, deadline, variant=None):
+        """A call outlived its deadline: count it and record it at the deadline so the percentile rises"""
+        key = self.key(arn, payload_bytes, variant)
+        with self._lock:
+            self.timeouts[key] = self.timeouts.get(key, 0) + 1
+            self.read.setdefault(key, LatencyHistogram()).record(deadline)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'read': {key: h.to_dict() for key, h in self.read.items()},
+                'connect': {host: h.to_dict() for host, h in self.connect.items()},
+                'timeouts': dict(self.timeouts),
+            }
+
+    def save(self, path):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)  # never leave a half-written policy behind
+
+    def load(self, path):
+        """Merge a saved policy into this one; a missing file is a fresh start"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        with self._lock:
+            for key, h in data.get('read', {}).items():
+                self.read.setdefault(key, LatencyHistogram()).merge(LatencyHistogram.from_dict(h))
+            for host, h in data.get('connect', {}).items():
+                self.connect.setdefault(host, LatencyHistogram()).merge(LatencyHistogram.from_dict(h))
+            for key, n in data.get('timeouts', {}).items():
+                self.timeouts[key] = self.timeouts.get(key, 0) + n
+        return self
+
+    def report(self):
+        print(f'📐 Deadline = p{self.percentile:g} x {self.margin:g}, read {self.read_floor:g}..{self.read_ceiling:g}s, '
+              f'connect {self.connect_floor:g}..{self.connect_ceiling:g}s, ceiling until {self.min_samples} samples')
+        for host, h in sorted(self.connect.items()):
+            deadline = self._deadline(h, self.connect_floor, self.connect_ceiling)
+            print(f'🔌 {host}: {h.count} connects, p{self.percentile:g} {h.percentile(self.percentile) * 1000:.1f}ms '
+                  f'-> connect_timeout {deadline:.1f}s')
+        for key, h in sorted(self.read.items()):
+            arn, bucket, *variant = key.split('|')
+            deadline = self._deadline(h, self.read_floor, self.read_ceiling)
+            timeouts = f', {self.timeouts[key]} timeouts' if self.timeouts.get(key) else ''
+            variant = f' [{variant[0]}]' if variant else ''
+            print(f'⏱️  {arn.rsplit("/", 1)[-1]} <={bucket}{variant}: {h.count} calls{timeouts}, '
+                  f'p{self.percentile:g} {h.percentile(self.percentile):.2f}s -> read_timeout {deadline:.1f}s')
+
+
+def longest_gap(stream, wait):
+    """Longest stretch without bytes: the wait for headers or any gap between body chunks"""
+    gap = wait
+    previous = stream.ttfb or 0.0
+    for offset, _ in stream.chunk_times:
+        gap = max(gap, offset - previous)
+        previous = offset
+    return gap
+
+
+def deadline_mixin(deadlines):
+    """Connection mixin applying the calling thread's deadlines.connect / deadlines.read (seconds or None)
+
+    urllib3 copies the client-wide timeouts onto the connection before it
+    connects and before it waits for the response; these hooks run right
+    after that and put the per-call values in their place.
+    """
+
+    class DeadlineConnection:
+        def _new_conn(self):
+            if getattr(deadlines, 'connect', None) is not None:
+                self.timeout = deadlines.connect
+            return super()._new_conn()
+
+        def getresponse(self, *args, **kwargs):
+            if getattr(deadlines, 'read', None) is not None:
+                self.timeout = deadlines.read  # also covers every read of the streamed body
+            return super().getresponse(*args, **kwargs)
+
+    return DeadlineConnection
+
+
+class AdaptiveInvoker:
+    """Invokes with deadlines from a TimeoutPolicy and feeds every result back into it"""
+
+    def __init__(self, policy, max_pool_connections=10):
+        self.policy = policy
+        self.host = urlsplit(endpoint_url() or f'https://bedrock-agentcore.{REGION}.amazonaws.com').hostname
+        self._deadlines = threading.local()
+        # One client for every deadline: the ceilings are only its fallback, each call sets its own
+        self.client = make_client(read_timeout=policy.read_ceiling, connect_timeout=policy.connect_ceiling,
+                                  max_pool_connections=max_pool_connections)
+        self.timer = PhaseTimer(on_record=None).install(self.client)
+        install_connection_mixin(self.client, deadline_mixin(self._deadlines))
+
+    def invoke(self, arn, session_id, payload, variant=None):
+        """Invoke once with learned deadlines and return the StreamResult
+
+        variant separates calls whose latency the payload size does not
+        predict, e.g. the duration a sleep agent is asked for.
+        """
+        body = json.dumps(payload)
+        size = len(body.encode('utf-8'))
+        connect_timeout, read_timeout = self.policy.deadlines(arn, size, self.host, variant)
+        self._deadlines.connect, self._deadlines.read = connect_timeout, read_timeout
+        start_time = time.time()
+        try:
+            response = self.client.invoke_agent_runtime(agentRuntimeArn=arn, runtimeSessionId=session_id,
+                                                        payload=body)
+            stream = read_streaming_body(response['response'], start_time)
+        except ReadTimeoutError:
+            self.timer.finish()
+            self.policy.record_read_timeout(arn, size, read_timeout, variant)
+            raise
+        except ConnectTimeoutError:
+            self.timer.finish()
+            raise
+        finally:
+            self._deadlines.connect = self._deadlines.read = None
+        record = self.timer.finish(stream.body_seconds)
+        connect = None
+        if record is not None and not record.reused:
+            connect = record.dns + record.connect + record.tls
+        self.policy.record(arn, size, self.host, longest_gap(stream, record.wait if record else stream.ttfb or 0.0),
+                           connect, variant)
+        return stream
+
+
+def test_adaptive_timeouts():
+    """Invoke AGENT REPEAT times through the policy, then save what was learned"""
+
+    agent = os.getenv('AGENT', 'sleep')
+    repeat = int(os.getenv('REPEAT', '20'))
+    duration_seconds = int(os.getenv('DURATION_SECONDS', '0'))
+    policy_path = os.getenv('TIMEOUT_POLICY', 'timeout_policy.json')
+
+    policy = TimeoutPolicy.from_env().load(policy_path)
+    invoker = AdaptiveInvoker(policy, max_pool_connections=1)
+    stats = RunStats(label=f'{agent}-adaptive')
+
+    print(f'🚀 ADAPTIVE TIMEOUT TEST: {agent} agent x {repeat}')
+    print(f'💾 Policy file: {policy_path}')
+    print('')
+
+    try:
+        arn = agent_arn(agent)
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    payload = build_payload(agent, duration_seconds)
+    variant = f'{expected_seconds(agent, duration_seconds):g}s' if expected_seconds(agent, duration_seconds) else None
+    for i in range(repeat):
+        size = len(json.dumps(payload).encode('utf-8'))
+        connect_timeout, read_timeout = policy.deadlines(arn, size, invoker.host, variant)
+        start_time = time.time()
+        try:
+            invoker.invoke(arn, new_session_id(f'adaptive-{agent}-{i}'), payload, variant)
+            stats.record_success(time.time() - start_time)
+            print(f'   ✅ {i + 1}/{repeat}: {time.time() - start_time:.2f}s '
+                  f'(connect_timeout {connect_timeout:.1f}s, read_timeout {read_timeout:.1f}s)')
+        except Exception as e:
+            stats.record_error(type(e).__name__)
+            print(f'   ❌ {i + 1}/{repeat}: {type(e).__name__} after {time.time() - start_time:.2f}s '
+                  f'(read_timeout {read_timeout:.1f}s)')
+
+    print('')
+    stats.report()
+    print('')
+    policy.report()
+    policy.save(policy_path)
+    print(f'💾 Policy written to {policy_path}')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'show':
+        TimeoutPolicy.from_env().load(os.getenv('TIMEOUT_POLICY', 'timeout_policy.json')).report()
+    else:
+        test_adaptive_timeouts()
@@ -0,0 +1,129 @@
+"""
+Shared AgentCore helpers - agent ARNs, payloads, session IDs and client setup
+"""
+import boto3
+import json
+import os
+import time
+from botocore.config import Config
+
+REGION = 'us-west-2'
+
+# Runtime IDs of the agents exercised by the test scripts
+AGENT_RUNTIMES = {
+    'sleep': 'echoLime_Agent-NO4rb4DyPq',
+    'sync': 'syncAgentv2_Agent-PMR8N7GtlK',
+    'async': 'asyncAgentv3_Agent-pcnPRl8xbN',
+    '4m40s': 'astroCyan_Agent-LDkBsqEKQO',
+    'debug': 'atomicIvory_Agent-hy21w68p1l',
+}
+
+
+def agent_arn(agent):
+    """Build the runtime ARN for one of the AGENT_RUNTIMES keys"""
+    account_id = os.getenv('AWS_ACCOUNT_ID')
+    if not account_id:
+        raise ValueError("AWS_ACCOUNT_ID environment variable required")
+    return f"arn:aws:bedrock-agentcore:{REGION}:{account_id}:runtime/{AGENT_RUNTIMES[agent]}"
+
+
+def build_payload(agent, duration_seconds, prompt='tell me a joke'):
+    """Build the same payload each agent's own test script sends"""
+    if agent == 'sleep':
+        return {
+            'duration_seconds': duration_seconds,
+            'test_type': 'github_sleep_test',
+            'message': f'Testing {duration_seconds}s sleep duration'
+        }
+    if agent == 'sync':
+        return {
+            'prompt': prompt,
+            'steps': max(1, duration_seconds // 60)  # 1 step = 1 minute
+        }
+    if agent == 'async':
+        return {
+            'prompt': prompt,
+            'duration_seconds': duration_seconds
+        }
+    if agent == '4m40s':
+        return {
+            'test_type': '4m40s_github_test',
+            'message': 'Testing 4m40s response'
+        }
+    return {
+        'customer_name': 'DebugTest',
+        'model_name': 'test',
+        'temperature': '0.0',
+        'large_data': 'x' * 50000  # 50KB
+    }
+
+
+def expected_seconds(agent, duration_seconds):
+    """How long the agent is asked to work for; TIME_SCALE matches local_agentcore_server.py"""
+    if agent == 'sync':
+        seconds = max(1, duration_seconds // 60) * 60
+    elif agent == '4m40s':
+        seconds = 280
+    elif agent == 'sleep':
+        seconds = duration_seconds
+    else:
+        seconds = 0
+    return seconds * float(os.getenv('TIME_SCALE', '1.0'))
+
+
+def new_session_id(prefix):
+    """Unique runtimeSessionId in the format used by every script"""
+    return f'{prefix}-{int(time.time())}-{int(time.time() * 1000000)}'
+
+
+def endpoint_url():
+    """Endpoint override (e.g. local_agentcore_server.py); None means the real AWS endpoint"""
+    return os.getenv('AGENTCORE_ENDPOINT_URL')
+
+
+def make_client(read_timeout=900, connect_timeout=60, max_pool_connections=10, retries=None):
+    """Create one bedrock-agentcore client whose connection pool can be shared by threads"""
+    config = Config(
+        read_timeout=read_timeout,
+        connect_timeout=connect_timeout,
+        retries=retries or {'max_attempts': 1},
+        max_pool_connections=max_pool_connections
+    )
+    return boto3.client(
+        'bedrock-agentcore',
+        region_name=REGION,
+        config=config,
+        endpoint_url=endpoint_url()
+    )
+
+
+def invoke(client, arn, session_id, payload):
+    """Invoke an agent and return the decoded response body"""
+    response = client.invoke_agent_runtime(
+        agentRuntimeArn=arn,
+        runtimeSessionId=session_id,
+        payload=json.dumps(payload)
+    )
+    return response['response'].read().decode('utf-8')
+
+
+def install_connection_mixin(client, mixin):
+    """Mix a class into this client's urllib3 connection classes
+
+    Only this client's pools are affected (each client owns its own
+    URLLib3Session), so differently instrumented clients can share a process.
+    Must run before the client opens its first connection. Mixins stack:
+    installing a second one subclasses the classes produced by the first.
+    """
+    pool_classes = client._endpoint.http_session._pool_classes_by_scheme
+    for scheme, pool_cls in list(pool_classes.items()):
+        connection_cls = type(
+            f'{mixin.__name__}{pool_cls.ConnectionCls.__name__}',
+            (mixin, pool_cls.ConnectionCls),
+            {}
+        )
+        pool_classes[scheme] = type(
+            f'{mixin.__name__}{pool_cls.__name__}',
+            (pool_cls,),
+            {'ConnectionCls': connection_cls}
+        )
@@ -8,14 +8,20 @@ import logging
 import os
 from botocore.config import Config
 
-# Enable detailed boto3 DEBUG logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from ring_tracer import tracer_from_env
 
-logging.getLogger('boto3').setLevel(logging.DEBUG)
-logging.getLogger('botocore').setLevel(logging.DEBUG)
+# TRACE_MODE=ring keeps DEBUG logging off the hot path and uses ring_tracer instead
+TRACE_MODE = os.getenv('TRACE_MODE', 'debug')
+
+if TRACE_MODE != 'ring':
+    # Enable detailed boto3 DEBUG logging
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    logging.getLogger('boto3').setLevel(logging.DEBUG)
+    logging.getLogger('botocore').setLevel(logging.DEBUG)
 
 def test_agentcore_async_pattern():
     """Test AgentCore async pattern with proper task management"""
@@ -26,7 +32,13 @@ def test_agentcore_async_pattern():
         retries={'max_attempts': 1}
     )
     
-    client = boto3.client('bedrock-agentcore', region_name='us-west-2', config=config)
+    client = boto3.client(
+        'bedrock-agentcore',
+        region_name='us-west-2',
+        config=config,
+        endpoint_url=os.getenv('AGENTCORE_ENDPOINT_URL')  # e.g. local_agentcore_server.py
+    )
+    tracer = tracer_from_env().install(client) if TRACE_MODE == 'ring' else None
     
     # Payload requesting async task (same size as sync test)
     payload = {
@@ -78,6 +90,8 @@ def test_agentcore_async_pattern():
         return session_id
         
     except Exception as e:
+        if tracer:
+            tracer.mark_failure()  # dump the ring at exit
         duration = time.time() - start_time
         print(f'❌ Error after {duration:.1f} seconds: {e}')
         print('🔍 Check if this is connection timeout or agent configuration issue')
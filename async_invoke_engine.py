@@ -0,0 +1,314 @@
+"""
+asyncio invoke engine - start and poll many async agent tasks on one event loop
+"""
+import asyncio
+import json
+import os
+import ssl
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+import botocore.session
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+
+from agentcore_common import REGION, agent_arn, new_session_id
+from agentcore_common import endpoint_url as agentcore_endpoint_url
+from response_decoding import decode_response
+
+SESSION_HEADER = 'X-Amzn-Bedrock-AgentCore-Runtime-Session-Id'
+
+
+class AgentCoreHTTPError(Exception):
+    """Non-2xx response from invoke_agent_runtime"""
+
+    def __init__(self, status, body):
+        super().__init__(f'HTTP {status}: {body[:200]!r}')
+        self.status = status
+        self.body = body
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection"""
+    __slots__ = ('reader', 'writer')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncAgentCoreClient:
+    """Non-blocking invoke_agent_runtime client with SigV4 signing and a keep-alive pool"""
+
+    def __init__(self, region=REGION, endpoint_url=None, max_connections=100,
+                 connect_timeout=30, read_timeout=60, max_fresh_connections=None):
+        self.region = region
+        self.endpoint_url = (endpoint_url or agentcore_endpoint_url() or f'https://bedrock-agentcore.{region}.amazonaws.com').rstrip('/')
+        parts = urlsplit(self.endpoint_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.netloc = parts.netloc
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._ssl = ssl.create_default_context() if self.scheme == 'https' else None
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+        # Separate budget for fresh_connection requests such as hedges
+        self._fresh_slots = asyncio.Semaphore(max_fresh_connections or max_connections)
+        # Resolve credentials once; refreshable credentials refresh themselves on access
+        self._signer = SigV4Auth(botocore.session.get_session().get_credentials(), 'bedrock-agentcore', region)
+
+    def _sign(self, path, body, headers):
+        request = AWSRequest(method='POST', url=f'{self.endpoint_url}{path}', data=body, headers=headers)
+        self._signer.add_auth(request)
+        return request.headers
+
+    async def _connect(self, fresh=False):
+        while self._idle and not fresh:
+            conn = self._idle.pop()
+            if not conn.reader.at_eof():
+                return conn, True
+            conn.close()  # the server already closed it while it sat idle
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self._ssl),
+            timeout=self.connect_timeout
+        )
+        return _Connection(reader, writer), False
+
+    async def _roundtrip(self, conn, request):
+        try:
+            conn.writer.write(request)
+            await conn.writer.drain()
+            status, _, body, reusable = await asyncio.wait_for(
+                self._read_response(conn), timeout=self.read_timeout
+            )
+        except BaseException:
+            conn.close()
+            raise
+        if reusable:
+            self._idle.append(conn)
+        else:
+            conn.close()
+        return status, body
+
+    async def _read_response(self, conn):
+        reader = conn.reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed before response')
+        status = int(status_line.split(b' ', 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+            reusable = True
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+            reusable = True
+        else:
+            body = await reader.read()
+            reusable = False
+
+        if headers.get('connection', '').lower() == 'close':
+            reusable = False
+        return status, headers, body, reusable
+
+    async def invoke(self, arn, session_id, payload, qualifier=None, fresh_connection=False, idempotent=True):
+        """POST one invocation and return the raw response body as bytes
+
+        A request that fails on a reused pooled connection is sent once more
+        on a new one, unless idempotent=False: the first copy may already
+        have reached the agent, and starting an async task twice is worse
+        than reporting the dropped connection.
+
+        fresh_connection=True skips the idle pool, so the request cannot land
+        on a connection that is stuck behind another one, and takes its slot
+        from the max_fresh_connections budget, so it is not queued behind the
+        stuck requests holding every pooled slot either.
+        """
+        path = f'/runtimes/{quote(arn, safe="")}/invocations'
+        if qualifier:
+            path += f'?qualifier={quote(qualifier, safe="")}'
+        body = json.dumps(payload).encode('utf-8')
+        headers = self._sign(path, body, {
+            'Content-Type': 'application/json',
+            SESSION_HEADER: session_id,
+        })
+
+        head = [f'POST {path} HTTP/1.1', f'Host: {self.netloc}', f'Content-Length: {len(body)}']
+        head.extend(f'{name}: {value}' for name, value in headers.items() if name.lower() != 'host')
+        request = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+        async with self._fresh_slots if fresh_connection else self._slots:
+            conn, reused = await self._connect(fresh=fresh_connection)
+            try:
+                status, response_body = await self._roundtrip(conn, request)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not reused or not idempotent:
+                    raise
+                # The server closed an idle pooled connection; retry once on a new one
+                conn, _ = await self._connect(fresh=True)
+                status, response_body = await self._roundtrip(conn, request)
+
+        if status >= 400:
+            raise AgentCoreHTTPError(status, response_body)
+        return response_body
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class TrackedTask:
+    """Per-task state kept small so thousands of tasks fit in one process"""
+    __slots__ = ('session_id', 'task_id', 'started_at', 'status', 'result', 'error')
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.task_id = None
+        self.started_at = 0.0
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+
+
+async def start_task(client, arn, task, prompt, duration):
+    """Start one async agent task and record its task_id"""
+    task.started_at = time.time()
+    try:
+        body = await client.invoke(arn, task.session_id, {'prompt': prompt, 'duration_seconds': duration},
+                                   idempotent=False)
+        task.task_id = json.loads(body).get('task_id')
+        task.status = 'started'
+    except Exception as e:
+        task.status = 'failed'
+        task.error = f'{type(e).__name__}: {e}'
+
+
+async def get_task_result(client, arn, task):
+    """Check one task once with the get_results action"""
+    try:
+        body = await client.invoke(arn, task.session_id, {'action': 'get_results', 'task_id': int(task.task_id)})
+        task.result = body.decode('utf-8')
+        try:
+            task.status = decode_response(body).get('status', 'unknown')
+        except (ValueError, AttributeError):
+            task.status = 'unparsed'
+    except Exception as e:
+        task.status = 'failed'
+        task.error = f'{type(e).__name__}: {e}'
+
+
+async def start_many(count, prompt, duration, concurrency):
+    client = AsyncAgentCoreClient(max_connections=concurrency)
+    arn = agent_arn('async')
+    tasks = [TrackedTask(new_session_id(f'async-engine-{i}')) for i in range(count)]
+    start_time = time.time()
+    await asyncio.gather(*(start_task(client, arn, task, prompt, duration) for task in tasks))
+    await client.close()
+    return tasks, time.time() - start_time
+
+
+async def poll_many(tasks, concurrency):
+    client = AsyncAgentCoreClient(max_connections=concurrency)
+    arn = agent_arn('async')
+    start_time = time.time()
+    await asyncio.gather(*(get_task_result(client, arn, task) for task in tasks if task.task_id is not None))
+    await client.close()
+    return time.time() - start_time
+
+
+def run_start():
+    count = int(os.getenv('TASK_COUNT', '100'))
+    concurrency = int(os.getenv('CONCURRENCY', '100'))
+    prompt = os.getenv('PROMPT', 'tell me a joke')
+    duration = int(os.getenv('DURATION_SECONDS', '420'))
+    tasks_file = os.getenv('TASKS_FILE', 'async_tasks.json')
+
+    print(f'🚀 ASYNC ENGINE: Starting {count} tasks')
+    print(f'🔀 In-flight limit: {concurrency}')
+    print(f'⏱️  Duration: {duration} seconds')
+    print('')
+
+    try:
+        tasks, elapsed = asyncio.run(start_many(count, prompt, duration, concurrency))
+    except Exception as e:
+        print(f'❌ FAILED to start tasks: {e}')
+        sys.exit(1)
+
+    started = [task for task in tasks if task.status == 'started']
+    print(f'✅ {len(started)}/{count} tasks started in {elapsed:.1f} seconds')
+    for task in tasks:
+        if task.error:
+            print(f'❌ {task.session_id}: {task.error}')
+
+    with open(tasks_file, 'w') as f:
+        json.dump([{'session_id': t.session_id, 'task_id': t.task_id} for t in started], f)
+    print(f'💾 Task IDs written to {tasks_file}')
+
+
+def run_get_results():
+    concurrency = int(os.getenv('CONCURRENCY', '100'))
+    tasks_file = os.getenv('TASKS_FILE', 'async_tasks.json')
+
+    with open(tasks_file) as f:
+        entries = json.load(f)
+    tasks = []
+    for entry in entries:
+        task = TrackedTask(entry['session_id'])
+        task.task_id = entry['task_id']
+        tasks.append(task)
+
+    print(f'🔍 GETTING RESULTS: {len(tasks)} tasks from {tasks_file}')
+    print('')
+
+    try:
+        elapsed = asyncio.run(poll_many(tasks, concurrency))
+    except Exception as e:
+        print(f'❌ FAILED to get results: {e}')
+        sys.exit(1)
+
+    statuses = {}
+    for task in tasks:
+        statuses[task.status] = statuses.get(task.status, 0) + 1
+        if task.error:
+            print(f'❌ Task {task.task_id}: {task.error}')
+
+    print(f'✅ Polled {len(tasks)} tasks in {elapsed:.1f} seconds')
+    for status, count in sorted(statuses.items()):
+        print(f'📋 {status}: {count}')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python3 async_invoke_engine.py [start|get_results]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == 'start':
+        run_start()
+    elif action == 'get_results':
+        run_get_results()
+    else:
+        print("Invalid action. Use 'start' or 'get_results'")
+        sys.exit(1)
@@ -0,0 +1,114 @@
+"""
+Concurrent fan-out load test - N workers sharing one pooled bedrock-agentcore client
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from agentcore_common import agent_arn, build_payload, expected_seconds, make_client, new_session_id
+from latency_histogram import RunStats
+from phase_timing import PhaseTimer, summarize
+from results_store import results_sink
+from streaming_reader import read_streaming_body
+
+
+def run_one(client, arn, agent, duration_seconds, index, timer=None):
+    """Run a single invocation and return (latency, error class name or None)"""
+    session_id = new_session_id(f'load-{agent}-{index}')
+    payload = build_payload(agent, duration_seconds)
+    start_time = time.time()
+    try:
+        response = client.invoke_agent_runtime(
+            agentRuntimeArn=arn,
+            runtimeSessionId=session_id,
+            payload=json.dumps(payload)
+        )
+        stream = read_streaming_body(response['response'], start_time)
+        if timer:
+            timer.finish(stream.body_seconds)
+        return time.time() - start_time, None
+    except Exception as e:
+        return time.time() - start_time, type(e).__name__
+
+
+def test_concurrent_load():
+    """Fan out TOTAL_REQUESTS invocations with at most CONCURRENCY in flight"""
+
+    agent = os.getenv('AGENT', 'sleep')
+    concurrency = int(os.getenv('CONCURRENCY', '50'))
+    total_requests = int(os.getenv('TOTAL_REQUESTS', '100'))
+    duration_seconds = int(os.getenv('DURATION_SECONDS', '0'))
+    read_timeout = int(os.getenv('READ_TIMEOUT', '900'))
+    phase_timing = os.getenv('PHASE_TIMING', '0') == '1'
+    histogram_out = os.getenv('HISTOGRAM_OUT')
+
+    # One client, one urllib3 pool sized to the in-flight limit so workers never wait for a connection
+    client = make_client(
+        read_timeout=read_timeout,
+        connect_timeout=60,
+        max_pool_connections=concurrency
+    )
+    phase_records = []
+    timer = None
+    if phase_timing:
+        timer = PhaseTimer(on_record=phase_records.append).install(client)
+
+    print(f'🚀 CONCURRENT LOAD TEST: {agent} agent')
+    print(f'🔀 In-flight limit: {concurrency}')
+    print(f'📦 Total requests: {total_requests}')
+    print(f'⏱️  Duration: {duration_seconds} seconds per invocation')
+    print(f'⏰ Client timeout: {read_timeout} seconds')
+    print('')
+
+    try:
+        arn = agent_arn(agent)
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    requested = expected_seconds(agent, duration_seconds)
+    stats = RunStats(label=f'{agent}-c{concurrency}', requested_seconds=requested,
+                     on_result=results_sink(agent, f'concurrent-c{concurrency}', requested=requested))
+    done = 0
+    report_every = max(1, total_requests // 10)
+
+    start_time = time.time()
+    print(f"📡 Starting load at {time.strftime('%H:%M:%S')}")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(run_one, client, arn, agent, duration_seconds, i, timer)
+            for i in range(total_requests)
+        ]
+        for future in as_completed(futures):
+            latency, error = future.result()
+            done += 1
+            if error:
+                stats.record_error(error, latency)
+            else:
+                stats.record_success(latency)
+            if done % report_every == 0:
+                elapsed = time.time() - start_time
+                print(f'   📈 {done}/{total_requests} done after {elapsed:.1f}s ({sum(stats.errors.values())} errors)')
+
+    wall_time = time.time() - start_time
+    succeeded = stats.histogram.count
+    failed = sum(stats.errors.values())
+
+    print('')
+    print(f'🏁 LOAD TEST COMPLETE after {wall_time:.1f} seconds')
+    print(f'✅ Succeeded: {succeeded}')
+    print(f'❌ Failed: {failed}')
+    print(f'⚡ Throughput: {succeeded / wall_time if wall_time else 0:.2f} req/s')
+    print('')
+    stats.report()
+    if phase_records:
+        print(f'⏱️  Median phases (ms): {json.dumps(summarize(phase_records))}')
+    if histogram_out:
+        stats.save(histogram_out)
+        print(f'💾 Histogram written to {histogram_out}')
+
+
+if __name__ == "__main__":
+    test_concurrent_load()
@@ -0,0 +1,308 @@
+"""
+Multi-socket idle-connection monitor with TCP_INFO sampling
+
+Holds many idle connections to the AgentCore endpoint on one selectors loop
+(epoll on Linux). Every connection has its own source port and therefore its
+own NAT mapping. The loop notices the moment a peer closes (FIN), resets
+(RST) or the kernel gives up (timeout), and on Linux it samples TCP_INFO
+(state, rtt, retransmits, probes, last_data_recv) for every connection at a
+fixed interval.
+
+  MONITOR_HOST=bedrock-agentcore.us-west-2.amazonaws.com  MONITOR_PORT=443
+  CONNECTIONS=200  MONITOR_SECONDS=600  SAMPLE_INTERVAL=1  TLS=1
+  KEEPALIVE_IDLE/KEEPALIVE_INTERVAL/KEEPALIVE_COUNT  (unset = no keep-alive)
+  SAMPLE_LOG=samples.jsonl  (optional per-sample JSON lines)
+"""
+import errno
+import json
+import os
+import selectors
+import socket
+import ssl
+import struct
+import time
+from collections import Counter
+
+from tcp_options import TcpOptions
+
+# Leading part of Linux struct tcp_info that every kernel since 2.6 provides
+TCP_INFO_FORMAT = struct.Struct('8B24I')
+TCP_INFO_FIELDS = {
+    'state': 0, 'retransmits': 2, 'probes': 3, 'backoff': 4,
+    'rto': 8, 'unacked': 12, 'lost': 14, 'retrans': 15,
+    'last_data_sent': 17, 'last_data_recv': 19, 'last_ack_recv': 20,
+    'rtt': 23, 'rttvar': 24, 'snd_cwnd': 26, 'total_retrans': 31,
+}
+TCP_STATES = {
+    1: 'ESTABLISHED', 2: 'SYN_SENT', 3: 'SYN_RECV', 4: 'FIN_WAIT1', 5: 'FIN_WAIT2',
+    6: 'TIME_WAIT', 7: 'CLOSE', 8: 'CLOSE_WAIT', 9: 'LAST_ACK', 10: 'LISTEN', 11: 'CLOSING',
+}
+
+
+def tcp_info(sock):
+    """Selected TCP_INFO fields (times in ms, rtt in us) or None where unsupported"""
+    if not hasattr(socket, 'TCP_INFO'):
+        return None
+    try:
+        raw = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, TCP_INFO_FORMAT.size)
+    except OSError:
+        return None
+    if len(raw) < TCP_INFO_FORMAT.size:
+        return None
+    values = TCP_INFO_FORMAT.unpack(raw)
+    info = {name: values[index] for name, index in TCP_INFO_FIELDS.items()}
+    info['state'] = TCP_STATES.get(info['state'], info['state'])
+    return info
+
+
+def apply_keepalive(sock, idle, interval, count):
+    """Turn on TCP keep-alive for one socket (Linux option names, skipped where missing)"""
+    TcpOptions(keep_idle=idle, keep_interval=interval, keep_count=count, nodelay=False).apply(sock)
+
+
+class MonitoredConnection:
+    """One idle connection and how it ended"""
+    __slots__ = ('index', 'sock', 'phase', 'local_port', 'opened_at', 'died_at', 'cause', 'detail', 'last_info')
+
+    def __init__(self, index, sock):
+        self.index = index
+        self.sock = sock
+        self.phase = 'connecting'  # connecting -> handshake -> open -> dead
+        self.local_port = None
+        self.opened_at = None
+        self.died_at = None
+        self.cause = None
+        self.detail = ''
+        self.last_info = None
+
+    def lifetime(self):
+        if self.opened_at is None:
+            return 0.0
+        return (self.died_at or time.time()) - self.opened_at
+
+
+class ConnectionMonitor:
+    """Open many connections on one selector and watch them until they die"""
+    connection_class = MonitoredConnection
+
+    def __init__(self, host, port, count, tls=True, sample_interval=1.0, keepalive=None, sample_log=None):
+        self.host = host
+        self.port = port
+        self.count = count
+        self.tls = tls
+        self.sample_interval = sample_interval
+        self.keepalive = keepalive
+        self.sample_log = sample_log
+        self.selector = selectors.DefaultSelector()
+        self.connections = []
+        self._ssl_context = ssl.create_default_context() if tls else None
+
+    def _mark_dead(self, conn, cause, detail=''):
+        if conn.phase == 'dead':
+            return
+        info = tcp_info(conn.sock)
+        if info is not None:
+            conn.last_info = info
+        conn.phase = 'dead'
+        conn.died_at = time.time()
+        conn.cause = cause
+        conn.detail = detail
+        try:
+            self.selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+        print(f'   💀 #{conn.index} (port {conn.local_port}) {cause.upper()} after {conn.lifetime():.1f}s {detail}')
+
+    def _classify(self, conn, error):
+        if isinstance(error, ConnectionResetError):
+            self._mark_dead(conn, 'rst', str(error))
+        elif isinstance(error, (TimeoutError, socket.timeout)) or getattr(error, 'errno', None) == errno.ETIMEDOUT:
+            self._mark_dead(conn, 'timeout', str(error))
+        else:
+            self._mark_dead(conn, 'error', f'{type(error).__name__}: {error}')
+
+    def keepalive_for(self, index):
+        """(idle, interval, count) for connection `index`, or None for no keep-alive"""
+        return self.keepalive
+
+    def open_all(self, timeout=30.0):
+        """Start every connect at once and drive connects/TLS handshakes on the selector"""
+        address = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)[0]
+        family, socktype, proto, _, sockaddr = address
+        for index in range(self.count):
+            sock = socket.socket(family, socktype, proto)
+            sock.setblocking(False)
+            keepalive = self.keepalive_for(index)
+            if keepalive:
+                apply_keepalive(sock, *keepalive)
+            conn = self.connection_class(index, sock)
+            self.connections.append(conn)
+            sock.connect_ex(sockaddr)
+            self.selector.register(sock, selectors.EVENT_WRITE, conn)
+
+        deadline = time.time() + timeout
+        while time.time() < deadline and any(c.phase in ('connecting', 'handshake') for c in self.connections):
+            for key, _ in self.selector.select(timeout=0.5):
+                self._advance_open(key.data)
+        for conn in self.connections:
+            if conn.phase in ('connecting', 'handshake'):
+                self._mark_dead(conn, 'connect_timeout')
+        return sum(1 for c in self.connections if c.phase == 'open')
+
+    def _advance_open(self, conn):
+        if conn.phase == 'connecting':
+            error = conn.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error:
+                self._mark_dead(conn, 'connect_failed', os.strerror(error))
+                return
+            conn.local_port = conn.sock.getsockname()[1]
+            if not self.tls:
+                self._opened(conn)
+                return
+            self.selector.unregister(conn.sock)
+            conn.sock = self._ssl_context.wrap_socket(conn.sock, server_hostname=self.host,
+                                                      do_handshake_on_connect=False)
+            conn.phase = 'handshake'
+            self.selector.register(conn.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, conn)
+        try:
+            conn.sock.do_handshake()
+        except ssl.SSLWantReadError:
+            self.selector.modify(conn.sock, selectors.EVENT_READ, conn)
+            return
+        except ssl.SSLWantWriteError:
+            self.selector.modify(conn.sock, selectors.EVENT_WRITE, conn)
+            return
+        except (OSError, ssl.SSLError) as e:
+            self._mark_dead(conn, 'handshake_failed', str(e))
+            return
+        self._opened(conn)
+
+    def _opened(self, conn):
+        conn.phase = 'open'
+        conn.opened_at = time.time()
+        self.selector.modify(conn.sock, selectors.EVENT_READ, conn)
+
+    def _on_readable(self, conn):
+        try:
+            data = conn.sock.recv(4096)
+        except (ssl.SSLWantReadError, BlockingIOError):
+            return  # e.g. a TLS session ticket, not application data
+        except ssl.SSLZeroReturnError:
+            self._mark_dead(conn, 'fin', 'TLS close_notify')
+            return
+        except OSError as e:
+            self._classify(conn, e)
+            return
+        if not data:
+            self._mark_dead(conn, 'fin', 'peer closed')
+        else:
+            conn.detail = f'unexpected {len(data)} bytes'
+
+    def _sample(self, log):
+        now = time.time()
+        for conn in self.connections:
+            if conn.phase != 'open':
+                continue
+            info = tcp_info(conn.sock)
+            if info is None:
+                continue
+            conn.last_info = info
+            if log:
+                log.write(json.dumps({'t': round(now, 3), 'conn': conn.index, 'port': conn.local_port, **info}) + '\n')
+            if info['state'] == 'CLOSE':
+                # The kernel already gave up (keep-alive or retransmission timeout)
+                self._mark_dead(conn, 'timeout', f'tcp state CLOSE, probes={info["probes"]}')
+
+    def run(self, seconds):
+        """Watch open connections for up to `seconds` or until all have died"""
+        log = open(self.sample_log, 'w') if self.sample_log else None
+        start = time.time()
+        next_sample = start
+        next_status = start + 30
+        try:
+            while time.time() - start < seconds:
+                alive = [c for c in self.connections if c.phase == 'open']
+                if not alive:
+                    break
+                now = time.time()
+                if now >= next_sample:
+                    self._sample(log)
+                    next_sample += self.sample_interval
+                if now >= next_status:
+                    elapsed = int(now - start)
+                    rtts = sorted(c.last_info['rtt'] for c in alive if c.last_info)
+                    median_rtt = f'{rtts[len(rtts) // 2] / 1000:.1f}ms' if rtts else 'n/a'
+                    print(f'   ✅ {len(alive)}/{len(self.connections)} alive at {elapsed // 60}m {elapsed % 60}s (median rtt {median_rtt})')
+                    next_status += 30
+                for key, _ in self.selector.select(timeout=max(0.0, next_sample - time.time())):
+                    self._on_readable(key.data)
+        finally:
+            if log:
+                log.close()
+        return time.time() - start
+
+    def close(self):
+        for conn in self.connections:
+            if conn.phase != 'dead':
+                conn.sock.close()
+        self.selector.close()
+
+    def report(self, elapsed):
+        dead = [c for c in self.connections if c.phase == 'dead' and c.opened_at is not None]
+        alive = [c for c in self.connections if c.phase == 'open']
+        causes = Counter(c.cause for c in dead)
+        print('')
+        print(f'🏁 MONITOR COMPLETE after {elapsed:.0f}s')
+        print(f'✅ Still alive: {len(alive)}/{len(self.connections)}')
+        print(f'💀 Died: {len(dead)} ({", ".join(f"{cause}={n}" for cause, n in causes.most_common()) or "none"})')
+        never_opened = [c for c in self.connections if c.opened_at is None]
+        if never_opened:
+            print(f'❌ Never opened: {len(never_opened)} ({Counter(c.cause for c in never_opened).most_common(3)})')
+        if dead:
+            lifetimes = sorted(c.lifetime() for c in dead)
+            print(f'⏱️  Lifetime of dropped connections min/median/max: '
+                  f'{lifetimes[0]:.1f}s / {lifetimes[len(lifetimes) // 2]:.1f}s / {lifetimes[-1]:.1f}s')
+            print('')
+            print('   conn  port    lifetime  cause      state        rtt(ms)  retrans  probes  last_recv(ms)')
+            for c in sorted(dead, key=lambda c: c.lifetime()):
+                info = c.last_info or {}
+                print(f'   {c.index:<5} {c.local_port or 0:<7} {c.lifetime():8.1f}s  {c.cause:<10} '
+                      f'{str(info.get("state", "-")):<12} {info.get("rtt", 0) / 1000:7.1f}  '
+                      f'{info.get("total_retrans", "-"):<8} {info.get("probes", "-"):<7} {info.get("last_data_recv", "-")}')
+
+
+def test_connection_monitor():
+    host = os.getenv('MONITOR_HOST', 'bedrock-agentcore.us-west-2.amazonaws.com')
+    port = int(os.getenv('MONITOR_PORT', '443'))
+    count = int(os.getenv('CONNECTIONS', '200'))
+    seconds = float(os.getenv('MONITOR_SECONDS', '600'))
+    interval = float(os.getenv('SAMPLE_INTERVAL', '1'))
+    tls = os.getenv('TLS', '1' if port == 443 else '0') == '1'
+    keepalive = None
+    if os.getenv('KEEPALIVE_IDLE'):
+        keepalive = (int(os.getenv('KEEPALIVE_IDLE')), int(os.getenv('KEEPALIVE_INTERVAL', '30')),
+                     int(os.getenv('KEEPALIVE_COUNT', '3')))
+
+    print('🔍 MULTI-CONNECTION MONITOR')
+    print(f"Environment: {'GitHub Actions' if os.getenv('GITHUB_ACTIONS') else 'Local'}")
+    print(f'📡 {count} connections to {host}:{port} (TLS {"on" if tls else "off"})')
+    print(f'⏱️  Watching for {seconds:.0f}s, TCP_INFO every {interval:g}s')
+    print(f'🔧 Keep-alive: {"idle=%d interval=%d count=%d" % keepalive if keepalive else "OFF"}')
+    print('')
+
+    monitor = ConnectionMonitor(host, port, count, tls=tls, sample_interval=interval,
+                                keepalive=keepalive, sample_log=os.getenv('SAMPLE_LOG'))
+    try:
+        opened = monitor.open_all()
+        print(f'✅ {opened}/{count} connections established')
+        elapsed = monitor.run(seconds)
+        monitor.report(elapsed)
+    except Exception as e:
+        print(f'❌ Monitor failed: {type(e).__name__}: {e}')
+    finally:
+        monitor.close()
+
+
+if __name__ == "__main__":
+    test_connection_monitor()
@@ -18,11 +18,18 @@ def test_connection_stability():
     logging.info("=" * 60)
     
     try:
-        # Test direct TCP connection to AgentCore
-        logging.info("📡 Connecting to bedrock-agentcore.us-west-2.amazonaws.com:443")
+        # Test direct TCP connection to AgentCore (TARGET_HOST/TARGET_PORT can point at fault_proxy.py)
+        host = os.getenv('TARGET_HOST', 'bedrock-agentcore.us-west-2.amazonaws.com')
+        port = int(os.getenv('TARGET_PORT', '443'))
+        # Resolve before connecting so DNS time is not folded into the connect
+        resolve_start = time.time()
+        address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        logging.info(f"🔍 Resolved {host} -> {address} in {(time.time() - resolve_start) * 1000:.1f}ms")
+        logging.info(f"📡 Connecting to {address}:{port}")
         logging.debug("Creating socket connection with 30s timeout")
-        sock = socket.create_connection(('bedrock-agentcore.us-west-2.amazonaws.com', 443), timeout=30)
-        logging.info("✅ TCP connection established")
+        connect_start = time.time()
+        sock = socket.create_connection((address, port), timeout=30)
+        logging.info(f"✅ TCP connection established in {(time.time() - connect_start) * 1000:.1f}ms")
         logging.debug(f"Socket details: {sock.getsockname()} -> {sock.getpeername()}")
         
         # Monitor connection for 10 minutes
@@ -8,18 +8,24 @@ import logging
 import os
 from botocore.config import Config
 
-# Enable detailed boto3 DEBUG logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from ring_tracer import tracer_from_env
 
-# Enable specific boto3 loggers
-logging.getLogger('boto3').setLevel(logging.DEBUG)
-logging.getLogger('botocore').setLevel(logging.DEBUG)
-logging.getLogger('botocore.retryhandler').setLevel(logging.DEBUG)
-logging.getLogger('botocore.endpoint').setLevel(logging.DEBUG)
-logging.getLogger('urllib3').setLevel(logging.DEBUG)
+# TRACE_MODE=ring keeps DEBUG logging off the hot path and uses ring_tracer instead
+TRACE_MODE = os.getenv('TRACE_MODE', 'debug')
+
+if TRACE_MODE != 'ring':
+    # Enable detailed boto3 DEBUG logging
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    # Enable specific boto3 loggers
+    logging.getLogger('boto3').setLevel(logging.DEBUG)
+    logging.getLogger('botocore').setLevel(logging.DEBUG)
+    logging.getLogger('botocore.retryhandler').setLevel(logging.DEBUG)
+    logging.getLogger('botocore.endpoint').setLevel(logging.DEBUG)
+    logging.getLogger('urllib3').setLevel(logging.DEBUG)
 
 def test_with_debug_logging():
     # Test configuration with 1 retry
@@ -29,7 +35,13 @@ def test_with_debug_logging():
         retries={'max_attempts': 1},  # 1 RETRY
     )
     
-    client = boto3.client('bedrock-agentcore', region_name='us-west-2', config=config)
+    client = boto3.client(
+        'bedrock-agentcore',
+        region_name='us-west-2',
+        config=config,
+        endpoint_url=os.getenv('AGENTCORE_ENDPOINT_URL')  # e.g. local_agentcore_server.py
+    )
+    tracer = tracer_from_env().install(client) if TRACE_MODE == 'ring' else None
     
     # Test payload
     payload = {
@@ -66,6 +78,8 @@ def test_with_debug_logging():
         print(f'✅ Response received after {duration:.1f} seconds')
         
     except Exception as e:
+        if tracer:
+            tracer.mark_failure()  # dump the ring at exit
         print(f'❌ Error: {e}')
         print(f'⏱️  Failed after {time.time() - start_time:.1f} seconds')
 
@@ -0,0 +1,268 @@
+"""
+Fault-injection TCP proxy - reproduces idle drops, resets, latency, bandwidth caps and stalls locally
+
+Two ways to route through it:
+  forward mode   UPSTREAM=127.0.0.1:8080 python3 fault_proxy.py
+                 then AGENTCORE_ENDPOINT_URL=http://127.0.0.1:8899 (or MONITOR_HOST/PROBE_HOST/TARGET_HOST)
+  CONNECT mode   python3 fault_proxy.py  (no UPSTREAM)
+                 then HTTPS_PROXY=http://127.0.0.1:8899 for any boto3 script against the real endpoint
+
+Faults (IDLE_DROP_SECONDS and RST_AFTER_SECONDS are multiplied by TIME_SCALE,
+so they can be given in real-runner seconds next to a scaled local server):
+  IDLE_DROP_SECONDS=280    drop a connection after this long with no payload in either direction
+  IDLE_DROP_MODE=silent    silent (blackhole, like a NAT entry expiring) | rst | fin
+  RST_AFTER_SECONDS=0      reset every connection this long after it opened
+  RST_PROBABILITY=0        chance that a connection gets the RST_AFTER_SECONDS reset
+  LATENCY_MS=0             added one-way delay per direction
+  BANDWIDTH_BYTES=0        per-direction cap in bytes/second
+  STALL_PROBABILITY=0      chance per forwarded chunk of pausing the direction for STALL_SECONDS
+
+Only payload bytes are visible to a userspace proxy: TCP keep-alive probes end
+at the proxy's own sockets and do not reset the idle timer, unlike a NAT.
+"""
+import asyncio
+import os
+import random
+import socket
+import struct
+import time
+
+TIME_SCALE = float(os.getenv('TIME_SCALE', '1.0'))
+CHUNK_SIZE = 65536
+
+
+class FaultConfig:
+    """Fault settings for every proxied connection"""
+
+    def __init__(self, idle_drop=0.0, idle_mode='silent', rst_after=0.0, rst_probability=0.0,
+                 latency=0.0, bandwidth=0, stall_probability=0.0, stall_seconds=0.0, seed=None):
+        if idle_mode not in ('silent', 'rst', 'fin'):
+            raise ValueError(f'IDLE_DROP_MODE must be silent, rst or fin, not {idle_mode!r}')
+        self.idle_drop = idle_drop
+        self.idle_mode = idle_mode
+        self.rst_after = rst_after
+        self.rst_probability = rst_probability
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.stall_probability = stall_probability
+        self.stall_seconds = stall_seconds
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_env(cls):
+        seed = os.getenv('SEED')
+        return cls(
+            idle_drop=float(os.getenv('IDLE_DROP_SECONDS', '0')) * TIME_SCALE,
+            idle_mode=os.getenv('IDLE_DROP_MODE', 'silent'),
+            rst_after=float(os.getenv('RST_AFTER_SECONDS', '0')) * TIME_SCALE,
+            rst_probability=float(os.getenv('RST_PROBABILITY', '1' if os.getenv('RST_AFTER_SECONDS') else '0')),
+            latency=float(os.getenv('LATENCY_MS', '0')) / 1000,
+            bandwidth=int(os.getenv('BANDWIDTH_BYTES', '0')),
+            stall_probability=float(os.getenv('STALL_PROBABILITY', '0')),
+            stall_seconds=float(os.getenv('STALL_SECONDS', '5')),
+            seed=int(seed) if seed else None,
+        )
+
+    def describe(self):
+        parts = []
+        if self.idle_drop:
+            parts.append(f'idle drop {self.idle_drop:g}s ({self.idle_mode})')
+        if self.rst_after and self.rst_probability:
+            parts.append(f'RST after {self.rst_after:g}s (p={self.rst_probability:g})')
+        if self.latency:
+            parts.append(f'+{self.latency * 1000:g}ms')
+        if self.bandwidth:
+            parts.append(f'{self.bandwidth} B/s cap')
+        if self.stall_probability:
+            parts.append(f'stall {self.stall_seconds:g}s (p={self.stall_probability:g})')
+        return ', '.join(parts) or 'none (transparent)'
+
+
+class ProxiedConnection:
+    """One client connection, its upstream and how it ended"""
+    __slots__ = ('index', 'client_writer', 'upstream_writer', 'target', 'opened_at', 'last_activity',
+                 'bytes_up', 'bytes_down', 'outcome', 'blackholed', 'closed')
+
+    def __init__(self, index, client_writer):
+        self.index = index
+        self.client_writer = client_writer
+        self.upstream_writer = None
+        self.target = None
+        self.opened_at = time.time()
+        self.last_activity = self.opened_at
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self.outcome = None
+        self.blackholed = False
+        self.closed = asyncio.Event()
+
+
+def reset(writer):
+    """Close with RST instead of FIN"""
+    sock = writer.get_extra_info('socket')
+    if sock is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        except OSError:
+            pass
+    writer.transport.abort()
+
+
+class FaultProxy:
+    def __init__(self, config, upstream=None):
+        self.config = config
+        self.upstream = upstream  # (host, port) for forward mode, None for CONNECT mode
+        self.outcomes = {}
+        self._next_index = 0
+
+    async def _open_upstream(self, reader, conn):
+        """Forward mode connects straight away; CONNECT mode reads the request line first"""
+        if self.upstream:
+            conn.target = self.upstream
+            return await asyncio.open_connection(*self.upstream)
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+        method, authority, _ = request_line.decode('latin-1').split(' ', 2)
+        if method != 'CONNECT':
+            conn.client_writer.write(b'HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\n\r\n')
+            raise ValueError(f'expected CONNECT, got {method}')
+        host, _, port = authority.rpartition(':')
+        conn.target = (host, int(port))
+        upstream = await asyncio.open_connection(host, int(port))
+        conn.client_writer.write(b'HTTP/1.1 200 Connection Established\r\n\r\n')
+        return upstream
+
+    async def _pipe(self, conn, reader, writer, direction):
+        """Copy one direction, applying latency, bandwidth cap and stalls without reordering"""
+        queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, data = await queue.get()
+                if data is None:
+                    break
+                if due > time.time():
+                    await asyncio.sleep(due - time.time())
+                if self.config.stall_probability and self.config.rng.random() < self.config.stall_probability:
+                    await asyncio.sleep(self.config.stall_seconds)
+                if self.config.bandwidth:
+                    await asyncio.sleep(len(data) / self.config.bandwidth)
+                if conn.blackholed:
+                    continue
+                writer.write(data)
+                await writer.drain()
+            if not conn.blackholed and writer.can_write_eof():
+                writer.write_eof()
+
+        deliverer = asyncio.create_task(deliver())
+        try:
+            while True:
+                data = await reader.read(CHUNK_SIZE)
+                if not data:
+                    break
+                if conn.blackholed:
+                    continue  # the path is gone: swallow whatever either side still sends
+                conn.last_activity = time.time()
+                if direction == 'up':
+                    conn.bytes_up += len(data)
+                else:
+                    conn.bytes_down += len(data)
+                queue.put_nowait((time.time() + self.config.latency, data))
+        except (ConnectionError, OSError):
+            pass
+        queue.put_nowait((0.0, None))
+        try:
+            await deliverer
+        except (ConnectionError, OSError):
+            pass
+
+    async def _watchdog(self, conn):
+        """Fire the idle drop and scheduled reset"""
+        config = self.config
+        rst_at = None
+        if config.rst_after and config.rng.random() < config.rst_probability:
+            rst_at = conn.opened_at + config.rst_after
+        while not conn.closed.is_set():
+            now = time.time()
+            if rst_at is not None and now >= rst_at:
+                self._end(conn, 'rst_injected', rst=True)
+                return
+            if config.idle_drop and not conn.blackholed and now - conn.last_activity >= config.idle_drop:
+                if config.idle_mode == 'silent':
+                    conn.blackholed = True
+                    conn.outcome = 'idle_blackholed'
+                    print(f'🕳️  #{conn.index} idle {now - conn.last_activity:.1f}s - blackholed')
+                    if conn.upstream_writer:
+                        conn.upstream_writer.transport.abort()
+                else:
+                    self._end(conn, f'idle_{config.idle_mode}', rst=config.idle_mode == 'rst')
+                    return
+            wake = [now + 1.0]
+            if rst_at is not None:
+                wake.append(rst_at)
+            if config.idle_drop and not conn.blackholed:
+                wake.append(conn.last_activity + config.idle_drop)
+            try:
+                await asyncio.wait_for(conn.closed.wait(), max(0.01, min(wake) - time.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    def _end(self, conn, outcome, rst=False):
+        conn.outcome = conn.outcome or outcome
+        for writer in (conn.client_writer, conn.upstream_writer):
+            if writer is None:
+                continue
+            if rst:
+                reset(writer)
+            else:
+                writer.close()
+        conn.closed.set()
+
+    async def handle(self, reader, writer):
+        self._next_index += 1
+        conn = ProxiedConnection(self._next_index, writer)
+        try:
+            upstream_reader, conn.upstream_writer = await self._open_upstream(reader, conn)
+        except (OSError, ValueError) as e:
+            print(f'❌ #{conn.index} upstream failed: {type(e).__name__}: {e}')
+            writer.close()
+            return
+        print(f'🔗 #{conn.index} {writer.get_extra_info("peername")[1]} -> {conn.target[0]}:{conn.target[1]}')
+
+        watchdog = asyncio.create_task(self._watchdog(conn))
+        await asyncio.gather(
+            self._pipe(conn, reader, conn.upstream_writer, 'up'),
+            self._pipe(conn, upstream_reader, writer, 'down'),
+        )
+        self._end(conn, 'closed')
+        await watchdog
+
+        self.outcomes[conn.outcome] = self.outcomes.get(conn.outcome, 0) + 1
+        print(f'🔌 #{conn.index} {conn.outcome} after {time.time() - conn.opened_at:.1f}s '
+              f'(up {conn.bytes_up}B, down {conn.bytes_down}B)')
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        print(f'🚀 FAULT PROXY listening on {host}:{port}')
+        if self.upstream:
+            print(f'📡 Forwarding to {self.upstream[0]}:{self.upstream[1]}')
+        else:
+            print('📡 CONNECT mode (use as HTTPS_PROXY)')
+        print(f'💥 Faults: {self.config.describe()}')
+        print('')
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    upstream = os.getenv('UPSTREAM')
+    if upstream:
+        upstream_host, _, upstream_port = upstream.rpartition(':')
+        upstream = (upstream_host, int(upstream_port))
+    proxy = FaultProxy(FaultConfig.from_env(), upstream)
+    try:
+        asyncio.run(proxy.serve(os.getenv('PROXY_HOST', '127.0.0.1'), int(os.getenv('PROXY_PORT', '8899'))))
+    except KeyboardInterrupt:
+        summary = ', '.join(f'{outcome}={n}' for outcome, n in proxy.outcomes.items()) or 'no connections'
+        print(f'🏁 Proxy stopped: {summary}')
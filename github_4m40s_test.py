@@ -8,10 +8,17 @@ import logging
 import os
 from botocore.config import Config
 
-# Enable debug logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logging.getLogger('boto3').setLevel(logging.DEBUG)
-logging.getLogger('botocore').setLevel(logging.DEBUG)
+from ring_tracer import tracer_from_env
+from streaming_reader import read_streaming_body
+
+# TRACE_MODE=ring keeps DEBUG logging off the hot path and uses ring_tracer instead
+TRACE_MODE = os.getenv('TRACE_MODE', 'debug')
+
+if TRACE_MODE != 'ring':
+    # Enable debug logging
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger('boto3').setLevel(logging.DEBUG)
+    logging.getLogger('botocore').setLevel(logging.DEBUG)
 
 def test_github_4m40s():
     """Test 4m40s agent from GitHub Actions - expect timeout at 5 minutes"""
@@ -23,7 +30,13 @@ def test_github_4m40s():
         retries={'max_attempts': 1}
     )
     
-    client = boto3.client('bedrock-agentcore', region_name='us-west-2', config=config)
+    client = boto3.client(
+        'bedrock-agentcore',
+        region_name='us-west-2',
+        config=config,
+        endpoint_url=os.getenv('AGENTCORE_ENDPOINT_URL')  # e.g. local_agentcore_server.py
+    )
+    tracer = tracer_from_env().install(client) if TRACE_MODE == 'ring' else None
     
     payload = {
         'test_type': '4m40s_github_test',
@@ -56,15 +69,14 @@ def test_github_4m40s():
             payload=json.dumps(payload)
         )
         
+        # Read the actual response content from the agent (the streaming body is under 'response')
+        stream = read_streaming_body(response['response'], start_time)
+        
         end_time = time.time()
         duration = end_time - start_time
         
-        # Read the actual response content from the agent
-        if 'body' in response:
-            response_body = response['body'].read().decode('utf-8')
-            print(f"📄 Agent Response: {response_body}")
-        else:
-            print("📄 No response body found")
+        print(f"📄 Agent Response: {stream.text()}")
+        print(f'📶 Stream: {stream.summary()}')
         
         print(f'✅ UNEXPECTED SUCCESS: Response received after {duration:.1f} seconds')
         print(f'📋 Status: {response.get("ResponseMetadata", {}).get("HTTPStatusCode")}')
@@ -76,6 +88,8 @@ def test_github_4m40s():
             print('⚠️  Response came back faster than expected')
             
     except Exception as e:
+        if tracer:
+            tracer.mark_failure()  # dump the ring at exit
         duration = time.time() - start_time
         print(f'❌ EXPECTED FAILURE after {duration:.1f} seconds: {e}')
         
@@ -8,6 +8,9 @@ import os
 import sys
 from botocore.config import Config
 
+from response_decoding import decode_response
+from streaming_reader import read_streaming_body
+
 def start_async_task():
     """Start async agent task"""
     
@@ -17,7 +20,12 @@ def start_async_task():
         retries={'max_attempts': 1}
     )
     
-    client = boto3.client('bedrock-agentcore', region_name='us-west-2', config=config)
+    client = boto3.client(
+        'bedrock-agentcore',
+        region_name='us-west-2',
+        config=config,
+        endpoint_url=os.getenv('AGENTCORE_ENDPOINT_URL')  # e.g. local_agentcore_server.py
+    )
     
     prompt = os.getenv('PROMPT', 'tell me a joke')
     duration = int(os.getenv('DURATION_SECONDS', '420'))
@@ -52,13 +60,15 @@ def start_async_task():
         )
         
         # Read response
-        response_body = response['response'].read().decode('utf-8')
+        stream = read_streaming_body(response['response'], start_time)
+        response_body = stream.text()
         response_data = json.loads(response_body)
         
         end_time = time.time()
         duration_actual = end_time - start_time
         
         print(f'✅ TASK STARTED: Response received after {duration_actual:.1f} seconds')
+        print(f'📶 Stream: {stream.summary()}')
         print(f'📄 Response: {response_body}')
         print(f'🆔 Task ID: {response_data.get("task_id")}')
         
@@ -80,7 +90,12 @@ def get_task_results():
         retries={'max_attempts': 1}
     )
     
-    client = boto3.client('bedrock-agentcore', region_name='us-west-2', config=config)
+    client = boto3.client(
+        'bedrock-agentcore',
+        region_name='us-west-2',
+        config=config,
+        endpoint_url=os.getenv('AGENTCORE_ENDPOINT_URL')  # e.g. local_agentcore_server.py
+    )
     
     task_id = os.getenv('TASK_ID')
     if not task_id:
@@ -101,6 +116,7 @@ def get_task_results():
         account_id = os.getenv('AWS_ACCOUNT_ID')
         agent_arn = f"arn:aws:bedrock-agentcore:us-west-2:{account_id}:runtime/asyncAgentv3_Agent-pcnPRl8xbN"
         
+        start_time = time.time()
         print(f"📡 Retrieving results at {time.strftime('%H:%M:%S')}")
         
         response = client.invoke_agent_runtime(
@@ -110,25 +126,21 @@ def get_task_results():
         )
         
         # Read response
-        response_body = response['response'].read().decode('utf-8')
+        stream = read_streaming_body(response['response'], start_time)
+        response_body = stream.text()
         
         print(f'✅ RESULTS RETRIEVED')
+        print(f'📶 Stream: {stream.summary()}')
         print(f'📄 Raw Response: {response_body}')
         print(f'📄 Response Type: {type(response_body)}')
         print('')
         
-        # Handle different response formats
+        # JSON, Python dict reprs and DynamoDB-typed items, detected from the first bytes
         try:
-            # Try JSON parsing first
-            response_data = json.loads(response_body)
-        except json.JSONDecodeError:
-            try:
-                # Try eval for dict-like strings from DynamoDB
-                response_data = eval(response_body)
-            except:
-                # If all else fails, treat as error
-                print(f'❌ Could not parse response: {response_body}')
-                return
+            response_data = decode_response(stream.content())  # spilled bodies are read back from disk
+        except ValueError:
+            print(f'❌ Could not parse response: {response_body}')
+            return
         
         # Now safely access the data
         if hasattr(response_data, 'get') and response_data.get('status') == 'completed':
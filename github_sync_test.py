@@ -9,18 +9,28 @@ import sys
 import logging
 from botocore.config import Config
 
-# Enable detailed boto3 DEBUG logging (like the previous working script)
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from phase_timing import PhaseTimer
+from regression_gate import check_sample
+from response_decoding import decode_response
+from ring_tracer import tracer_from_env
+from streaming_reader import read_streaming_body
 
-# Enable specific boto3 loggers for detailed connection debugging
-logging.getLogger('boto3').setLevel(logging.DEBUG)
-logging.getLogger('botocore').setLevel(logging.DEBUG)
-logging.getLogger('botocore.retryhandler').setLevel(logging.DEBUG)
-logging.getLogger('botocore.endpoint').setLevel(logging.DEBUG)
-logging.getLogger('urllib3').setLevel(logging.DEBUG)
+# TRACE_MODE=ring keeps DEBUG logging off the hot path and uses ring_tracer instead
+TRACE_MODE = os.getenv('TRACE_MODE', 'debug')
+
+if TRACE_MODE != 'ring':
+    # Enable detailed boto3 DEBUG logging (like the previous working script)
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    # Enable specific boto3 loggers for detailed connection debugging
+    logging.getLogger('boto3').setLevel(logging.DEBUG)
+    logging.getLogger('botocore').setLevel(logging.DEBUG)
+    logging.getLogger('botocore.retryhandler').setLevel(logging.DEBUG)
+    logging.getLogger('botocore.endpoint').setLevel(logging.DEBUG)
+    logging.getLogger('urllib3').setLevel(logging.DEBUG)
 
 def test_sync_agent():
     """Test sync agent - single call, waits for completion"""
@@ -37,7 +47,16 @@ def test_sync_agent():
         retries={'max_attempts': 1}  # Enable 1 retry to see retry behavior
     )
     
-    client = boto3.client('bedrock-agentcore', region_name='us-west-2', config=config)
+    client = boto3.client(
+        'bedrock-agentcore',
+        region_name='us-west-2',
+        config=config,
+        endpoint_url=os.getenv('AGENTCORE_ENDPOINT_URL')  # e.g. local_agentcore_server.py
+    )
+    tracer = tracer_from_env().install(client) if TRACE_MODE == 'ring' else None
+    
+    # PHASE_TIMING=1 prints one compact DNS/connect/TLS/send/wait/body record per call
+    timer = PhaseTimer().install(client) if os.getenv('PHASE_TIMING') == '1' else None
     
     payload = {
         'prompt': prompt,
@@ -73,25 +92,26 @@ def test_sync_agent():
             payload=json.dumps(payload)
         )
         
-        # Read response
-        response_body = response['response'].read().decode('utf-8')
+        # Read response incrementally to capture TTFB and chunk timing
+        stream = read_streaming_body(response['response'], start_time)
+        response_body = stream.text()
+        if timer:
+            timer.finish(stream.body_seconds)
         
         end_time = time.time()
         duration_actual = end_time - start_time
         
         print(f'✅ SYNC RESPONSE RECEIVED after {duration_actual:.1f} seconds')
+        print(f'📶 Stream: {stream.summary()}')
         print(f'📄 Raw Response: {response_body}')
         print('')
         
         # Parse response
         try:
-            response_data = json.loads(response_body)
-        except json.JSONDecodeError:
-            try:
-                response_data = eval(response_body)
-            except:
-                print(f'⚠️  Could not parse response, showing raw: {response_body}')
-                return
+            response_data = decode_response(stream.content())  # spilled bodies are read back from disk
+        except ValueError:
+            print(f'⚠️  Could not parse response, showing raw: {response_body}')
+            return
         
         # Display results
         if hasattr(response_data, 'get') and response_data.get('status') == 'completed':
@@ -102,7 +122,9 @@ def test_sync_agent():
             
             # Compare expected vs actual timing
             expected_duration = duration
-            if expected_duration > 0:
+            if os.getenv('BASELINE_HISTOGRAM'):
+                check_sample(duration_actual, os.getenv('BASELINE_HISTOGRAM'))
+            elif expected_duration > 0:
                 if abs(duration_actual - expected_duration) <= 10:
                     print(f'✅ Timing verification: PASSED ({duration_actual:.1f}s ≈ {expected_duration}s)')
                 else:
@@ -117,6 +139,8 @@ def test_sync_agent():
             print(f'📄 Response Data: {response_data}')
         
     except Exception as e:
+        if tracer:
+            tracer.mark_failure()  # dump the ring at exit
         duration_actual = time.time() - start_time
         print(f'❌ SYNC AGENT FAILED after {duration_actual:.1f} seconds: {e}')
         
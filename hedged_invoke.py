@@ -0,0 +1,197 @@
+"""
+Hedged invocations - cut tail latency of idempotent calls such as get_results
+
+A request that has not answered by the HEDGE_PERCENTILE of recent latencies
+gets a second copy sent on a fresh connection. Whichever answers first wins
+and the other is cancelled (its connection is closed). Only use this for
+idempotent requests: both copies may reach the agent. Hedges draw on their
+own HEDGE_CONNECTIONS budget, so they still go out when stuck originals hold
+every CONCURRENCY slot.
+
+  python3 hedged_invoke.py    (starts TASK_COUNT async tasks, then polls them ROUNDS times)
+  TASK_COUNT=20  ROUNDS=10  CONCURRENCY=50  HEDGE_CONNECTIONS=CONCURRENCY  DURATION_SECONDS=60
+  HEDGE=1 (0 = no hedging, for comparison)
+  HEDGE_PERCENTILE=95  HEDGE_MIN_SAMPLES=20  HEDGE_INITIAL_DELAY=1.0  HEDGE_FLOOR=0.01  HEDGE_CEILING=30
+"""
+import asyncio
+import os
+import time
+
+from agentcore_common import agent_arn, new_session_id
+from async_invoke_engine import AsyncAgentCoreClient, TrackedTask, start_task
+from latency_histogram import LatencyHistogram, RunStats
+from response_decoding import decode_response
+
+
+class HedgePolicy:
+    """Hedge delay that follows a percentile of recently observed latencies"""
+
+    def __init__(self, percentile=95, min_samples=20, initial_delay=1.0, floor=0.01, ceiling=30.0, window=1000):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.floor = floor
+        self.ceiling = ceiling
+        self.window = window
+        self.histogram = LatencyHistogram()
+        self._recent = LatencyHistogram()
+        self._delay = initial_delay
+
+    def record(self, seconds):
+        """Add a successful call's latency; failures must not pull the delay down"""
+        # Two histograms, swapped every `window` samples, keep the threshold following recent behaviour
+        self._recent.record(seconds)
+        if self._recent.count >= self.window:
+            self.histogram, self._recent = self._recent, LatencyHistogram()
+        self._delay = self._compute_delay()
+
+    def _compute_delay(self):
+        samples = LatencyHistogram().merge(self.histogram).merge(self._recent)
+        if samples.count < self.min_samples:
+            return self.initial_delay
+        return min(self.ceiling, max(self.floor, samples.percentile(self.percentile)))
+
+    def delay(self):
+        return self._delay  # refreshed by record(), not on every request
+
+
+class HedgeStats:
+    """Who won and how much extra load hedging added"""
+
+    def __init__(self):
+        self.requests = 0
+        self.hedges_sent = 0
+        self.primary_wins = 0  # answered before a hedge was needed
+        self.late_primary_wins = 0  # original beat its hedge
+        self.hedge_wins = 0
+        self.failures = 0
+
+    def extra_load(self):
+        return self.hedges_sent / self.requests if self.requests else 0.0
+
+    def report(self):
+        print(f'🔀 Hedges sent: {self.hedges_sent}/{self.requests} requests ({self.extra_load():.1%} extra load)')
+        if self.hedges_sent:
+            print(f'🏆 Hedge won {self.hedge_wins}/{self.hedges_sent} ({self.hedge_wins / self.hedges_sent:.0%}), '
+                  f'original won {self.late_primary_wins}/{self.hedges_sent}')
+        if self.failures:
+            print(f'❌ Both copies failed: {self.failures}')
+
+
+async def hedged_invoke(client, arn, session_id, payload, policy, stats):
+    """Invoke; send a hedge on a fresh connection once the policy delay passes; return the first answer"""
+    stats.requests += 1
+    start = time.time()
+    primary = asyncio.ensure_future(client.invoke(arn, session_id, payload))
+    done, _ = await asyncio.wait({primary}, timeout=policy.delay())
+    if done:
+        if primary.exception() is None:
+            policy.record(time.time() - start)
+            stats.primary_wins += 1
+        else:
+            stats.failures += 1
+        return primary.result()
+
+    hedge = asyncio.ensure_future(client.invoke(arn, session_id, payload, fresh_connection=True))
+    stats.hedges_sent += 1
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                if finished.exception() is not None:
+                    error = error or finished.exception()
+                    continue
+                policy.record(time.time() - start)
+                if finished is hedge:
+                    stats.hedge_wins += 1
+                else:
+                    stats.late_primary_wins += 1
+                return finished.result()
+    finally:
+        for loser in pending:
+            loser.cancel()  # _roundtrip closes the loser's connection on cancellation
+    stats.failures += 1
+    raise error
+
+
+async def poll_rounds(tasks, rounds, concurrency, hedge, policy, hedge_connections=None):
+    client = AsyncAgentCoreClient(max_connections=concurrency, max_fresh_connections=hedge_connections)
+    arn = agent_arn('async')
+    stats = HedgeStats()
+    latency = RunStats(label='hedged' if hedge else 'unhedged')
+    limit = asyncio.Semaphore(concurrency)
+
+    async def poll(task):
+        payload = {'action': 'get_results', 'task_id': int(task.task_id)}
+        async with limit:
+            start = time.time()
+            try:
+                if hedge:
+                    body = await hedged_invoke(client, arn, task.session_id, payload, policy, stats)
+                else:
+                    stats.requests += 1
+                    body = await client.invoke(arn, task.session_id, payload)
+                latency.record_success(time.time() - start)
+                task.status = decode_response(body).get('status', 'unknown')
+            except Exception as e:
+                latency.record_error(type(e).__name__)
+
+    for _ in range(rounds):
+        await asyncio.gather(*(poll(task) for task in tasks))
+    await client.close()
+    return stats, latency
+
+
+async def run_hedged(count, rounds, concurrency, duration, hedge, policy, hedge_connections=None):
+    client = AsyncAgentCoreClient(max_connections=concurrency)
+    arn = agent_arn('async')
+    tasks = [TrackedTask(new_session_id(f'hedged-{i}')) for i in range(count)]
+    await asyncio.gather(*(start_task(client, arn, task, 'tell me a joke', duration) for task in tasks))
+    await client.close()
+    started = [task for task in tasks if task.task_id is not None]
+    print(f'✅ {len(started)}/{count} async tasks started')
+    return await poll_rounds(started, rounds, concurrency, hedge, policy, hedge_connections)
+
+
+def test_hedged_invoke():
+    """Poll async tasks ROUNDS times with (or without) hedging and report tail latency and hedge outcomes"""
+
+    count = int(os.getenv('TASK_COUNT', '20'))
+    rounds = int(os.getenv('ROUNDS', '10'))
+    concurrency = int(os.getenv('CONCURRENCY', '50'))
+    hedge_connections = int(os.getenv('HEDGE_CONNECTIONS', str(concurrency)))
+    duration = int(os.getenv('DURATION_SECONDS', '60'))
+    hedge = os.getenv('HEDGE', '1') == '1'
+    policy = HedgePolicy(
+        percentile=float(os.getenv('HEDGE_PERCENTILE', '95')),
+        min_samples=int(os.getenv('HEDGE_MIN_SAMPLES', '20')),
+        initial_delay=float(os.getenv('HEDGE_INITIAL_DELAY', '1.0')),
+        floor=float(os.getenv('HEDGE_FLOOR', '0.01')),
+        ceiling=float(os.getenv('HEDGE_CEILING', '30')),
+    )
+
+    print(f'🚀 HEDGED GET_RESULTS: {count} tasks x {rounds} rounds, hedging {"ON" if hedge else "OFF"}')
+    if hedge:
+        print(f'🎯 Hedge after p{policy.percentile:g} of recent latency '
+              f'({policy.initial_delay:g}s until {policy.min_samples} samples)')
+    print('')
+
+    try:
+        stats, latency = asyncio.run(run_hedged(count, rounds, concurrency, duration, hedge, policy,
+                                                      hedge_connections))
+    except Exception as e:
+        print(f'❌ FAILED: {type(e).__name__}: {e}')
+        return
+
+    print('')
+    latency.report()
+    print('')
+    if hedge:
+        stats.report()
+        print(f'⏱️  Final hedge delay: {policy.delay() * 1000:.1f}ms')
+
+
+if __name__ == "__main__":
+    test_hedged_invoke()
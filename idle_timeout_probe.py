@@ -0,0 +1,222 @@
+"""
+Idle-drop grid probe - finds a network path's idle timeout in one parallel pass
+
+Opens PROBES_PER_GROUP connections at once and gives them idle periods on an
+even grid from IDLE_MIN to IDLE_MAX inclusive, so neighbouring probes are
+(IDLE_MAX - IDLE_MIN) / (PROBES_PER_GROUP - 1) seconds apart. Each sends a
+small HTTP request when its idle period ends. A connection that answers
+survived that much idle time; one that resets or stays silent was dropped.
+The longest survivor below the shortest drop and that drop bracket the
+timeout to one grid step. PASSES > 1 lays a new grid over that bracket each
+pass, shrinking the step by about PROBES_PER_GROUP - 1 times per pass.
+
+When KEEPALIVE_IDLE is set, a second group with those keep-alive settings
+runs alongside the control group to confirm whether keep-alive prevents the drop.
+"""
+import os
+import ssl
+import time
+
+from connection_monitor import ConnectionMonitor, MonitoredConnection
+from results_store import shared_store
+
+
+class ProbeConnection(MonitoredConnection):
+    __slots__ = ('group', 'idle_target', 'probe_sent_at', 'answered')
+
+    def __init__(self, index, sock):
+        super().__init__(index, sock)
+        self.group = None
+        self.idle_target = 0.0
+        self.probe_sent_at = None
+        self.answered = False
+
+    def idle_seconds(self):
+        """Idle time actually survived (probed) or reached before a passive drop"""
+        if self.opened_at is None:
+            return 0.0
+        if self.probe_sent_at is not None:
+            return self.probe_sent_at - self.opened_at
+        return self.lifetime()
+
+
+class ProbeMonitor(ConnectionMonitor):
+    """ConnectionMonitor whose connections each idle for their own period and are then probed"""
+    connection_class = ProbeConnection
+
+    def __init__(self, host, port, idle_times, tls=True, keepalive=None, probe_timeout=10.0):
+        groups = ['control'] + (['keepalive'] if keepalive else [])
+        super().__init__(host, port, len(idle_times) * len(groups), tls=tls, keepalive=keepalive)
+        self.idle_times = idle_times
+        self.groups = groups
+        self.probe_timeout = probe_timeout
+        self.request = (f'GET /ping HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n').encode('ascii')
+
+    def keepalive_for(self, index):
+        return self.keepalive if index >= len(self.idle_times) else None
+
+    def open_all(self, timeout=30.0):
+        opened = super().open_all(timeout)
+        for conn in self.connections:
+            group_index, slot = divmod(conn.index, len(self.idle_times))
+            conn.group = self.groups[group_index]
+            conn.idle_target = self.idle_times[slot]
+        return opened
+
+    def _send_probe(self, conn):
+        conn.probe_sent_at = time.time()
+        try:
+            conn.sock.send(self.request)
+        except OSError as e:
+            self._classify(conn, e)
+
+    def _on_readable(self, conn):
+        if conn.probe_sent_at is None:
+            super()._on_readable(conn)  # closed while idle: FIN/RST before our probe
+            return
+        try:
+            data = conn.sock.recv(4096)
+        except (ssl.SSLWantReadError, BlockingIOError):
+            return
+        except OSError as e:
+            self._classify(conn, e)
+            return
+        if not data:
+            self._mark_dead(conn, 'fin', 'closed instead of answering the probe')
+            return
+        conn.answered = True
+        conn.phase = 'done'
+        self.selector.unregister(conn.sock)
+        conn.sock.close()
+
+    def run(self, seconds):
+        start = time.time()
+        while time.time() - start < seconds:
+            pending = [c for c in self.connections if c.phase == 'open']
+            if not pending:
+                break
+            now = time.time()
+            next_event = now + 1.0
+            for conn in pending:
+                if conn.probe_sent_at is None:
+                    due = conn.opened_at + conn.idle_target
+                    if now >= due:
+                        self._send_probe(conn)
+                    else:
+                        next_event = min(next_event, due)
+                elif now > conn.probe_sent_at + self.probe_timeout:
+                    self._mark_dead(conn, 'no_response', f'silent for {self.probe_timeout:g}s after probe')
+                else:
+                    next_event = min(next_event, conn.probe_sent_at + self.probe_timeout)
+            for key, _ in self.selector.select(timeout=max(0.0, next_event - time.time())):
+                self._on_readable(key.data)
+        return time.time() - start
+
+
+def find_boundary(samples):
+    """samples: (idle seconds, survived) -> bracket around the idle timeout"""
+    dead = sorted(idle for idle, survived in samples if not survived)
+    alive = sorted(idle for idle, survived in samples if survived)
+    if not dead:
+        return {'first_dead': None, 'last_alive': alive[-1] if alive else None, 'violations': 0}
+    first_dead = dead[0]
+    below = [idle for idle in alive if idle < first_dead]
+    return {
+        'first_dead': first_dead,
+        'last_alive': below[-1] if below else None,
+        # Survivors idle longer than the first drop mean the cutoff is not one fixed timer
+        'violations': sum(1 for idle in alive if idle > first_dead),
+    }
+
+
+def run_pass(host, port, tls, idle_min, idle_max, per_group, keepalive, probe_timeout):
+    step = (idle_max - idle_min) / max(1, per_group - 1)
+    idle_times = [idle_min + i * step for i in range(per_group)]
+    monitor = ProbeMonitor(host, port, idle_times, tls=tls, keepalive=keepalive, probe_timeout=probe_timeout)
+    try:
+        opened = monitor.open_all()
+        print(f'✅ {opened}/{monitor.count} probe connections established, idle {idle_min:.1f}s..{idle_max:.1f}s '
+              f'in {step:.2f}s steps')
+        monitor.run(idle_max + probe_timeout + 30)
+    finally:
+        monitor.close()
+
+    results = {}
+    for group in monitor.groups:
+        conns = [c for c in monitor.connections if c.group == group and c.opened_at is not None]
+        samples = [(c.idle_seconds(), c.answered) for c in conns]
+        boundary = find_boundary(samples)
+        boundary['causes'] = {}
+        for c in conns:
+            if not c.answered and c.cause:
+                boundary['causes'][c.cause] = boundary['causes'].get(c.cause, 0) + 1
+        boundary['survived'] = sum(1 for _, survived in samples if survived)
+        store = shared_store()
+        if store:
+            for c in conns:
+                store.record(host, f'idle-probe-{group}', 'ok' if c.answered else c.cause or 'dropped',
+                             c.idle_seconds(), started_at=c.opened_at, kind='probe')
+        boundary['total'] = len(samples)
+        results[group] = boundary
+    return results, step
+
+
+def test_idle_timeout_probe():
+    host = os.getenv('PROBE_HOST', 'bedrock-agentcore.us-west-2.amazonaws.com')
+    port = int(os.getenv('PROBE_PORT', '443'))
+    tls = os.getenv('TLS', '1' if port == 443 else '0') == '1'
+    idle_min = float(os.getenv('IDLE_MIN', '240'))
+    idle_max = float(os.getenv('IDLE_MAX', '360'))
+    per_group = int(os.getenv('PROBES_PER_GROUP', '120'))
+    passes = int(os.getenv('PASSES', '1'))
+    probe_timeout = float(os.getenv('PROBE_TIMEOUT', '10'))
+    keepalive = None
+    if os.getenv('KEEPALIVE_IDLE'):
+        keepalive = (int(os.getenv('KEEPALIVE_IDLE')), int(os.getenv('KEEPALIVE_INTERVAL', '30')),
+                     int(os.getenv('KEEPALIVE_COUNT', '3')))
+
+    print('🔍 IDLE TIMEOUT PROBE')
+    print(f"Environment: {'GitHub Actions' if os.getenv('GITHUB_ACTIONS') else 'Local'}")
+    print(f'📡 Target: {host}:{port} (TLS {"on" if tls else "off"})')
+    print(f'⏱️  Idle range: {idle_min:g}s..{idle_max:g}s, {per_group} probes per group, {passes} pass(es)')
+    print(f'🔧 Keep-alive group: {"idle=%d interval=%d count=%d" % keepalive if keepalive else "OFF"}')
+    print('')
+
+    for number in range(1, passes + 1):
+        print(f'🔄 PASS {number}/{passes}')
+        try:
+            results, step = run_pass(host, port, tls, idle_min, idle_max, per_group, keepalive, probe_timeout)
+        except Exception as e:
+            print(f'❌ Probe pass failed: {type(e).__name__}: {e}')
+            return
+
+        for group, result in results.items():
+            causes = ', '.join(f'{cause}={n}' for cause, n in result['causes'].items()) or 'none'
+            print(f'📊 {group}: {result["survived"]}/{result["total"]} survived (drops: {causes})')
+            if result['first_dead'] is None:
+                print(f'   ✅ No drop up to {result["last_alive"] or 0:.1f}s idle')
+            elif result['last_alive'] is None:
+                print(f'   ❌ Dropped already at {result["first_dead"]:.1f}s idle - lower IDLE_MIN')
+            else:
+                print(f'   🎯 Idle timeout between {result["last_alive"]:.2f}s and {result["first_dead"]:.2f}s')
+            if result['violations']:
+                print(f'   ⚠️  {result["violations"]} connections survived longer than the first drop - cutoff is not a single fixed timer')
+
+        control = results['control']
+        if keepalive:
+            kept = results['keepalive']
+            if control['first_dead'] is not None and kept['first_dead'] is None:
+                print('✅ Keep-alive PREVENTS the idle drop on this path')
+            elif control['first_dead'] is not None:
+                print('❌ Keep-alive does NOT prevent the idle drop with these settings')
+
+        if control['first_dead'] is None or control['last_alive'] is None:
+            break
+        if number < passes:
+            idle_min, idle_max = control['last_alive'], control['first_dead']
+            print(f'🔎 Narrowing to {idle_min:.2f}s..{idle_max:.2f}s')
+        print('')
+
+
+if __name__ == "__main__":
+    test_idle_timeout_probe()
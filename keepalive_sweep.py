@@ -0,0 +1,200 @@
+"""
+Keep-alive parameter sweep - runs long invocations under a matrix of TCP keep-alive settings in parallel
+
+Every setting gets its own client (and so its own connection pool) with the
+options applied through TcpOptionsFactory, and RUNS_PER_SETTING invocations
+per setting all run at the same time. For each setting it reports survival
+rate, keep-alive probe overhead and latency added over the requested
+duration, ranked by survival, then overhead, then latency.
+
+Linux resets the keep-alive timer whenever a probe is answered, so a healthy
+idle connection sends one probe (plus one ACK back) every KEEPIDLE seconds;
+INTVL and CNT only matter once probes go unanswered and decide how long a
+dead path takes to be detected. Per-setting probe counts are estimated from
+each request's idle time; the kernel's process-wide TCPKeepAlive counter is
+shown alongside as a measured total.
+
+  AGENT=sleep  DURATION_SECONDS=300  RUNS_PER_SETTING=3
+  KEEPALIVE_SETTINGS="off 30,10,3 60,30,3 120,30,3 240,30,3"  (idle,interval,count)
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agentcore_common import agent_arn, build_payload, expected_seconds, make_client, new_session_id
+from latency_histogram import LatencyHistogram
+from streaming_reader import read_streaming_body
+from tcp_options import TcpOptions, TcpOptionsFactory
+
+SEGMENT_BYTES = 52  # IPv4 + TCP header with timestamps, no payload
+
+
+def parse_settings(spec):
+    """'off 60,30,3 ...' -> [(name, TcpOptions)]"""
+    settings = []
+    for item in spec.split():
+        if item == 'off':
+            settings.append(('off', TcpOptions(keepalive=False)))
+            continue
+        idle, interval, count = (int(part) for part in item.split(','))
+        settings.append((item, TcpOptions(keep_idle=idle, keep_interval=interval, keep_count=count)))
+    return settings
+
+
+def kernel_keepalive_probes():
+    """TcpExt TCPKeepAlive from /proc/net/netstat (probes sent by this network namespace), or None"""
+    try:
+        with open('/proc/net/netstat') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for header, values in zip(lines[::2], lines[1::2]):
+        if header.startswith('TcpExt:'):
+            fields = dict(zip(header.split()[1:], values.split()[1:]))
+            return int(fields['TCPKeepAlive']) if 'TCPKeepAlive' in fields else None
+    return None
+
+
+def estimated_probes(options, idle_seconds):
+    """Probes a healthy connection sends while idle: one per KEEPIDLE, since every ACK restarts the timer"""
+    if not options.keepalive or not options.keep_idle:
+        return 0
+    return int(idle_seconds // options.keep_idle)
+
+
+class SettingResult:
+    """Outcome of every run for one keep-alive setting"""
+
+    def __init__(self, name, options):
+        self.name = name
+        self.options = options
+        self.latency = LatencyHistogram()
+        self.errors = {}
+        self.probes = 0
+        self.lock = threading.Lock()  # every run of a setting records from its own worker thread
+
+    def record(self, latency, idle_seconds, error):
+        with self.lock:
+            self.probes += estimated_probes(self.options, idle_seconds)
+            if error:
+                self.errors[error] = self.errors.get(error, 0) + 1
+            else:
+                self.latency.record(latency)
+
+    def runs(self):
+        return self.latency.count + sum(self.errors.values())
+
+    def survival(self):
+        return self.latency.count / self.runs() if self.runs() else 0.0
+
+    def detection_seconds(self):
+        """Worst-case time to notice a dead peer on an idle connection"""
+        if not self.options.keepalive:
+            return None
+        return self.options.keep_idle + self.options.keep_interval * self.options.keep_count
+
+
+def run_one(client, arn, agent, duration_seconds, name, index, result):
+    start_time = time.time()
+    idle_seconds = 0.0
+    error = None
+    try:
+        response = client.invoke_agent_runtime(
+            agentRuntimeArn=arn,
+            runtimeSessionId=new_session_id(f'kasweep-{name.replace(",", "-")}-{index}'),
+            payload=json.dumps(build_payload(agent, duration_seconds))
+        )
+        stream = read_streaming_body(response['response'], start_time)
+        # Nothing crosses the connection until the agent answers; an empty body has no first byte
+        idle_seconds = stream.ttfb if stream.ttfb is not None else time.time() - start_time
+    except Exception as e:
+        error = type(e).__name__
+        idle_seconds = time.time() - start_time
+    result.record(time.time() - start_time, idle_seconds, error)
+
+
+def test_keepalive_sweep():
+    """Run every keep-alive setting against the same long invocation and rank them"""
+
+    agent = os.getenv('AGENT', 'sleep')
+    duration_seconds = int(os.getenv('DURATION_SECONDS', '300'))
+    runs = int(os.getenv('RUNS_PER_SETTING', '3'))
+    read_timeout = int(os.getenv('READ_TIMEOUT', '900'))
+    settings = parse_settings(os.getenv('KEEPALIVE_SETTINGS', 'off 30,10,3 60,30,3 120,30,3 240,30,3'))
+    requested = expected_seconds(agent, duration_seconds)
+
+    print(f'🚀 KEEP-ALIVE SWEEP: {agent} agent, {duration_seconds}s per invocation')
+    print(f'🔧 {len(settings)} settings x {runs} runs, all in parallel')
+    for name, options in settings:
+        print(f'   {name}: {options.describe()}')
+    print('')
+
+    try:
+        arn = agent_arn(agent)
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    results = []
+    jobs = []
+    for name, options in settings:
+        client = make_client(read_timeout=read_timeout, connect_timeout=60, max_pool_connections=runs)
+        TcpOptionsFactory(options).install(client)
+        result = SettingResult(name, options)
+        results.append(result)
+        jobs.extend((client, name, index, result) for index in range(runs))
+
+    probes_before = kernel_keepalive_probes()
+    start_time = time.time()
+    print(f"📡 Starting {len(jobs)} invocations at {time.strftime('%H:%M:%S')}")
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = [pool.submit(run_one, client, arn, agent, duration_seconds, name, index, result)
+                   for client, name, index, result in jobs]
+        for future in futures:
+            future.result()  # run_one records its own errors, so anything raised here is a bug worth seeing
+    wall_time = time.time() - start_time
+    probes_after = kernel_keepalive_probes()
+
+    baseline = next((r for r in results if not r.options.keepalive and r.latency.count), None)
+    # Among settings that survive equally well, fewer probes wins; latency differences are mostly noise
+    ranked = sorted(results, key=lambda r: (-r.survival(), r.probes / max(1, r.runs()),
+                                            r.latency.percentile(50) if r.latency.count else float('inf')))
+
+    print('')
+    print(f'🏁 SWEEP COMPLETE after {wall_time:.1f} seconds')
+    print('')
+    print('📊 RANKED RESULTS (survival, then probe overhead, then added latency):')
+    print(f'{"rank":>4}  {"setting":<12} {"survived":>9} {"added p50":>10} {"added p99":>10} {"vs off":>8} '
+          f'{"probes/run":>10} {"bytes/run":>9} {"detect":>7}  errors')
+    for rank, r in enumerate(ranked, 1):
+        if r.latency.count:
+            added_p50 = f'{r.latency.percentile(50) - requested:+.2f}s'
+            added_p99 = f'{r.latency.percentile(99) - requested:+.2f}s'
+            versus = f'{r.latency.percentile(50) - baseline.latency.percentile(50):+.2f}s' if baseline else '-'
+        else:
+            added_p50 = added_p99 = versus = '-'
+        per_run = r.probes / r.runs() if r.runs() else 0
+        detect = f'{r.detection_seconds()}s' if r.detection_seconds() is not None else '-'
+        errors = ', '.join(f'{name}={n}' for name, n in r.errors.items()) or 'none'
+        print(f'{rank:>4}  {r.name:<12} {r.latency.count:>4}/{r.runs():<4} {added_p50:>10} {added_p99:>10} {versus:>8} '
+              f'{per_run:>10.1f} {per_run * 2 * SEGMENT_BYTES:>9.0f} {detect:>7}  {errors}')
+
+    print('')
+    estimated = sum(r.probes for r in results)
+    if probes_before is not None and probes_after is not None:
+        print(f'📦 Keep-alive probes: {estimated} estimated, {probes_after - probes_before} counted by the kernel '
+              f'(TCPKeepAlive, whole namespace)')
+    else:
+        print(f'📦 Keep-alive probes: {estimated} estimated (kernel counter unavailable)')
+
+    best = ranked[0]
+    if best.survival() == 1.0:
+        print(f'✅ Recommended: {best.name} ({best.options.describe()})')
+    else:
+        print(f'❌ No setting survived every run - best was {best.name} at {best.survival():.0%}')
+
+
+if __name__ == "__main__":
+    test_keepalive_sweep()
@@ -0,0 +1,209 @@
+"""
+Mergeable HDR-style latency histogram and percentile reporting
+
+Values are stored as integer microseconds in log-linear buckets: exact below
+2**SUB_BUCKET_BITS us, then 2**(SUB_BUCKET_BITS-1) buckets per power of two,
+so every recorded value is kept to within 0.1% with SUB_BUCKET_BITS=11.
+Histograms with the same bucket layout merge losslessly by adding counts,
+which lets runs from different processes, runners or days be combined.
+
+  python3 latency_histogram.py report run.json
+  python3 latency_histogram.py merge combined.json run1.json run2.json ...
+"""
+import json
+import sys
+from collections import Counter
+
+SUB_BUCKET_BITS = 11
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of latencies in seconds, stored as microseconds"""
+
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._half = self._sub_count >> 1
+        self.counts = Counter()
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = None
+
+    def _index(self, value_us):
+        if value_us < self._sub_count:
+            return value_us
+        shift = value_us.bit_length() - self.sub_bucket_bits
+        return self._sub_count + (shift - 1) * self._half + ((value_us >> shift) - self._half)
+
+    def _bucket_range(self, index):
+        """Lowest and highest microsecond value that land in a bucket"""
+        if index < self._sub_count:
+            return index, index
+        shift, offset = divmod(index - self._sub_count, self._half)
+        shift += 1
+        mantissa = offset + self._half
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds, count=1):
+        value_us = max(0, int(round(seconds * 1e6)))
+        self.counts[self._index(value_us)] += count
+        self.count += count
+        self.total_us += value_us * count
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def merge(self, other):
+        """Add another histogram's counts; both must share the bucket layout"""
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError(f'Cannot merge histograms with {other.sub_bucket_bits} and {self.sub_bucket_bits} sub-bucket bits')
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total_us += other.total_us
+        for value in (other.min_us, other.max_us):
+            if value is not None:
+                self.min_us = value if self.min_us is None else min(self.min_us, value)
+                self.max_us = value if self.max_us is None else max(self.max_us, value)
+        return self
+
+    def percentile(self, pct):
+        """Latency in seconds at the given percentile (bucket midpoint, clamped to min/max)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(-(-pct * self.count // 100)))  # ceil without floats drifting
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self._bucket_range(index)
+                value = min(max((low + high) // 2, self.min_us), self.max_us)
+                return value / 1e6
+        return self.max_us / 1e6
+
+    def mean(self):
+        return self.total_us / self.count / 1e6 if self.count else 0.0
+
+    def min(self):
+        return (self.min_us or 0) / 1e6
+
+    def max(self):
+        return (self.max_us or 0) / 1e6
+
+    def values(self):
+        """(representative seconds, count) per non-empty bucket, ascending"""
+        for index in sorted(self.counts):
+            low, high = self._bucket_range(index)
+            yield (low + high) / 2 / 1e6, self.counts[index]
+
+    def to_dict(self):
+        return {
+            'sub_bucket_bits': self.sub_bucket_bits,
+            'count': self.count,
+            'total_us': self.total_us,
+            'min_us': self.min_us,
+            'max_us': self.max_us,
+            'counts': {str(index): count for index, count in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data.get('sub_bucket_bits', SUB_BUCKET_BITS))
+        histogram.counts = Counter({int(index): count for index, count in data['counts'].items()})
+        histogram.count = data['count']
+        histogram.total_us = data['total_us']
+        histogram.min_us = data['min_us']
+        histogram.max_us = data['max_us']
+        return histogram
+
+
+class RunStats:
+    """Latency histogram plus error counts by exception class for one or more runs"""
+
+    def __init__(self, label='', requested_seconds=0, on_result=None):
+        self.label = label
+        self.requested_seconds = requested_seconds
+        self.histogram = LatencyHistogram()
+        self.errors = Counter()
+        self.on_result = on_result  # called as on_result(seconds, error name or None), e.g. results_store
+
+    def record_success(self, seconds):
+        self.histogram.record(seconds)
+        if self.on_result:
+            self.on_result(seconds, None)
+
+    def record_error(self, exception_name, seconds=None):
+        self.errors[exception_name] += 1
+        if self.on_result:
+            self.on_result(seconds, exception_name)
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.errors.update(other.errors)
+        if other.label and other.label not in self.label.split('+'):
+            self.label = f'{self.label}+{other.label}' if self.label else other.label
+        return self
+
+    def attempts(self):
+        return self.histogram.count + sum(self.errors.values())
+
+    def to_dict(self):
+        return {
+            'label': self.label,
+            'requested_seconds': self.requested_seconds,
+            'errors': dict(self.errors),
+            'histogram': self.histogram.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data.get('label', ''), data.get('requested_seconds', 0))
+        stats.errors = Counter(data.get('errors', {}))
+        stats.histogram = LatencyHistogram.from_dict(data['histogram'])
+        return stats
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def report(self):
+        histogram = self.histogram
+        attempts = self.attempts()
+        print(f'📊 LATENCY REPORT{f" ({self.label})" if self.label else ""}')
+        print(f'📦 Samples: {histogram.count} succeeded / {attempts} attempts')
+        if histogram.count:
+            print(f'📊 min/mean/max: {histogram.min():.3f}s / {histogram.mean():.3f}s / {histogram.max():.3f}s')
+            for pct in REPORT_PERCENTILES:
+                value = histogram.percentile(pct)
+                line = f'   p{pct:<5} {value:10.3f}s'
+                if self.requested_seconds:
+                    line += f'   overhead {value - self.requested_seconds:+.3f}s'
+                print(line)
+            if self.requested_seconds:
+                print(f'⏱️  Requested duration: {self.requested_seconds:g}s, '
+                      f'max overhead {histogram.max() - self.requested_seconds:+.3f}s')
+        for name, count in self.errors.most_common():
+            print(f'❌ {name}: {count} ({100.0 * count / attempts:.1f}%)')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ('report', 'merge'):
+        print("Usage: python3 latency_histogram.py report run.json | merge out.json run1.json run2.json ...")
+        sys.exit(1)
+
+    if sys.argv[1] == 'report':
+        RunStats.load(sys.argv[2]).report()
+    else:
+        combined = RunStats()
+        for path in sys.argv[3:]:
+            run = RunStats.load(path)
+            combined.requested_seconds = combined.requested_seconds or run.requested_seconds
+            combined.merge(run)
+        combined.save(sys.argv[2])
+        print(f'💾 Merged {len(sys.argv) - 3} runs into {sys.argv[2]}')
+        combined.report()
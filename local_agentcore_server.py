@@ -0,0 +1,283 @@
+"""
+Local AgentCore stand-in - serves invoke_agent_runtime and emulates the test agents
+
+Point any script at it with AGENTCORE_ENDPOINT_URL=http://127.0.0.1:8080
+(any AWS credentials work, signatures are not checked).
+
+Finished async/sync tasks are forgotten TASK_RETENTION_SECONDS after they
+complete (get_results then answers not_found) and sessions once they have
+been idle past SESSION_IDLE_SECONDS, so long soak and scenario runs do not
+grow the server without bound.
+"""
+import asyncio
+import gzip
+import json
+import os
+import time
+from urllib.parse import unquote, urlsplit
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from agentcore_common import AGENT_RUNTIMES
+
+SESSION_HEADER = 'x-amzn-bedrock-agentcore-runtime-session-id'
+
+# Seconds of emulated work are multiplied by this, e.g. 0.01 turns 4m40s into 2.8s
+TIME_SCALE = float(os.getenv('TIME_SCALE', '1.0'))
+
+# Async agent state: task_id -> (due time, prompt)
+ASYNC_TASKS = {}
+
+# Runtime session cold start: the first request on a session (or one idle past
+# SESSION_IDLE_SECONDS) waits COLD_START_SECONDS before the agent runs
+COLD_START_SECONDS = float(os.getenv('COLD_START_SECONDS', '0'))
+SESSION_IDLE_SECONDS = float(os.getenv('SESSION_IDLE_SECONDS', '900'))
+SESSIONS = {}  # session id -> time of the last request
+
+# Sync invocations that carried a task_id: task_id -> (due time, result document)
+SYNC_TASKS = {}
+_next_task_id = int(time.time())
+
+# Wall-clock seconds a finished task stays available to get_results
+TASK_RETENTION_SECONDS = float(os.getenv('TASK_RETENTION_SECONDS', '3600'))
+EXPIRE_INTERVAL_SECONDS = 60
+_busy_until = 0.0  # latest due time of any task, so /ping does not scan them all
+
+
+def task_started(due):
+    global _busy_until
+    _busy_until = max(_busy_until, due)
+
+
+def expire_state(now=None):
+    """Drop tasks finished longer than the retention window ago and sessions past their idle timeout"""
+    now = now or time.time()
+    for tasks in (ASYNC_TASKS, SYNC_TASKS):
+        for task_id in [task_id for task_id, (due, _) in tasks.items() if due < now - TASK_RETENTION_SECONDS]:
+            del tasks[task_id]
+    idle_limit = SESSION_IDLE_SECONDS * TIME_SCALE  # an older session starts cold anyway
+    for session_id in [session_id for session_id, last in SESSIONS.items() if last < now - idle_limit]:
+        del SESSIONS[session_id]
+
+
+async def expire_loop():
+    while True:
+        await asyncio.sleep(EXPIRE_INTERVAL_SECONDS)
+        expire_state()
+
+
+def agent_for_arn(arn):
+    """Map a runtime ARN to one of the AGENT_RUNTIMES keys by its runtime name"""
+    runtime_id = arn.rsplit('/', 1)[-1]
+    for agent, known_id in AGENT_RUNTIMES.items():
+        if runtime_id.split('-', 1)[0] == known_id.split('-', 1)[0]:
+            return agent
+    return None
+
+
+def completion_time():
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+
+
+async def work(seconds):
+    await asyncio.sleep(max(0.0, seconds) * TIME_SCALE)
+
+
+async def start_session(session_id):
+    """Emulate the microVM start for a new or expired session"""
+    now = time.time()
+    last_seen = SESSIONS.get(session_id)
+    SESSIONS[session_id] = now
+    if last_seen is None or now - last_seen > SESSION_IDLE_SECONDS * TIME_SCALE:
+        await work(COLD_START_SECONDS)
+
+
+async def sleep_agent(payload):
+    duration = int(payload.get('duration_seconds', 0))
+    await work(duration)
+    return 200, {
+        'status': 'completed',
+        'slept_seconds': duration,
+        'message': payload.get('message', ''),
+        'completion_time': completion_time()
+    }
+
+
+async def sync_agent(payload):
+    task_id = payload.get('task_id')
+    if payload.get('action') == 'get_results':
+        # Answers echo the task_id so clients can tell them from an agent that ignored the action
+        if task_id not in SYNC_TASKS:
+            return 200, {'status': 'not_found', 'task_id': task_id, 'message': f'No task {task_id}'}
+        due, document = SYNC_TASKS[task_id]
+        if time.time() < due:
+            return 200, {'status': 'processing', 'task_id': task_id, 'message': f'{due - time.time():.1f}s remaining'}
+        return 200, dict(document, task_id=task_id)
+
+    steps = int(payload.get('steps', 1))
+    if task_id is not None and task_id in SYNC_TASKS:
+        # Same task_id again: wait for the work already running instead of starting it twice
+        due, document = SYNC_TASKS[task_id]
+        await asyncio.sleep(max(0.0, due - time.time()))
+        return 200, document
+
+    due = time.time() + steps * 60 * TIME_SCALE
+    document = {
+        'status': 'completed',
+        'processed_data': f"Processed '{payload.get('prompt', '')}' in {steps} steps",
+        'completion_time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(due))
+    }
+    if task_id is not None:
+        # Stored before the work starts so get_results can find it after the client's connection drops
+        SYNC_TASKS[task_id] = (due, document)
+        task_started(due)
+    await work(steps * 60)
+    return 200, document
+
+
+async def async_agent(payload):
+    global _next_task_id
+    if payload.get('action') == 'get_results':
+        task_id = int(payload.get('task_id', -1))
+        if task_id not in ASYNC_TASKS:
+            return 200, {'status': 'not_found', 'message': f'No task {task_id}'}
+        due, prompt = ASYNC_TASKS[task_id]
+        if time.time() < due:
+            return 200, {'status': 'processing', 'message': f'{due - time.time():.1f}s remaining'}
+        return 200, {
+            'status': 'completed',
+            'processed_data': f"Processed '{prompt}'",
+            'completion_time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(due))
+        }
+
+    _next_task_id += 1
+    duration = int(payload.get('duration_seconds', 0))
+    ASYNC_TASKS[_next_task_id] = (time.time() + duration * TIME_SCALE, payload.get('prompt', ''))
+    task_started(ASYNC_TASKS[_next_task_id][0])
+    return 200, {'status': 'started', 'task_id': _next_task_id}
+
+
+async def fixed_delay_agent(payload):
+    await work(280)  # 4m40s
+    return 200, {'status': 'completed', 'message': 'Responded after 4m40s'}
+
+
+async def debug_agent(payload):
+    return 200, {
+        'status': 'completed',
+        'received_bytes': len(payload.get('large_data', '')),
+        'customer_name': payload.get('customer_name')
+    }
+
+
+AGENT_HANDLERS = {
+    'sleep': sleep_agent,
+    'sync': sync_agent,
+    'async': async_agent,
+    '4m40s': fixed_delay_agent,
+    'debug': debug_agent,
+}
+
+
+async def route(method, path, headers, body):
+    """Return (status, extra headers, JSON document) for one request"""
+    parts = urlsplit(path)
+    segments = parts.path.strip('/').split('/')
+
+    if method == 'GET' and parts.path == '/ping':
+        return 200, {}, {'status': 'HealthyBusy' if _busy_until > time.time() else 'Healthy'}
+
+    if method != 'POST' or len(segments) != 3 or segments[0] != 'runtimes' or segments[2] != 'invocations':
+        return 404, {'x-amzn-ErrorType': 'UnknownOperationException'}, {'message': f'No route for {method} {parts.path}'}
+
+    arn = unquote(segments[1])
+    agent = agent_for_arn(arn)
+    if agent is None:
+        return 404, {'x-amzn-ErrorType': 'ResourceNotFoundException'}, {'message': f'No agent runtime {arn}'}
+
+    encoding = headers.get('content-encoding', 'identity').lower()
+    try:
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'zstd' and zstandard is not None:
+            body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+        elif encoding != 'identity':
+            return 415, {'x-amzn-ErrorType': 'UnsupportedMediaTypeException'}, {'message': f'Unsupported Content-Encoding {encoding}'}
+    except Exception as e:  # gzip raises OSError/EOFError, zstandard its own ZstdError
+        return 400, {'x-amzn-ErrorType': 'ValidationException'}, {'message': f'Cannot decode {encoding} body: {e}'}
+
+    try:
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        return 400, {'x-amzn-ErrorType': 'ValidationException'}, {'message': 'Payload is not JSON'}
+
+    session_id = headers.get(SESSION_HEADER, '')
+    await start_session(session_id)
+    status, document = await AGENT_HANDLERS[agent](payload)
+    SESSIONS[session_id] = time.time()  # idle time counts from the end of the last request
+    return status, {SESSION_HEADER: session_id}, document
+
+
+async def handle_connection(reader, writer):
+    """Serve keep-alive HTTP/1.1 requests until the client closes"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            body = b''
+            if 'content-length' in headers:
+                body = await reader.readexactly(int(headers['content-length']))
+
+            status, extra_headers, document = await route(method, path, headers, body)
+            out = json.dumps(document).encode('utf-8')
+            head = [f'HTTP/1.1 {status} {"OK" if status < 400 else "Error"}',
+                    'Content-Type: application/json',
+                    f'Content-Length: {len(out)}']
+            head.extend(f'{name}: {value}' for name, value in extra_headers.items())
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + out)
+            await writer.drain()
+
+            if headers.get('connection', '').lower() == 'close':
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port):
+    # A deep backlog lets thousands of clients connect at once; each open request is just a parked coroutine
+    server = await asyncio.start_server(handle_connection, host, port, backlog=4096)
+    print(f'🚀 LOCAL AGENTCORE listening on http://{host}:{port}')
+    print(f'⏱️  Time scale: {TIME_SCALE}')
+    if COLD_START_SECONDS:
+        print(f'🧊 Session cold start: {COLD_START_SECONDS:g}s, sessions expire after {SESSION_IDLE_SECONDS:g}s idle')
+    print(f'🤖 Agents: {", ".join(f"{name}={runtime}" for name, runtime in AGENT_RUNTIMES.items())}')
+    print(f'🗑️  Finished tasks kept for {TASK_RETENTION_SECONDS:g}s')
+    print('')
+    expiry = asyncio.create_task(expire_loop())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        expiry.cancel()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(os.getenv('HOST', '127.0.0.1'), int(os.getenv('PORT', '8080'))))
+    except KeyboardInterrupt:
+        print('🏁 Server stopped')
@@ -0,0 +1,155 @@
+"""
+Open-loop load generator - issues invocations on a fixed schedule instead of call-and-wait
+
+Requests are sent at their intended times (constant rate or Poisson arrivals)
+whether or not earlier ones have finished, and latency is measured from the
+intended send time. When the runtime slows down, queued requests show up as
+latency instead of silently lowering the offered load (coordinated omission).
+"""
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agentcore_common import agent_arn, build_payload, expected_seconds, make_client, new_session_id
+from latency_histogram import LatencyHistogram, RunStats
+from results_store import results_sink
+from streaming_reader import read_streaming_body
+
+
+def arrival_offsets(rate, count, arrival, seed=None):
+    """Intended send offsets in seconds from the start of the run"""
+    if arrival == 'poisson':
+        rng = random.Random(seed)
+        offsets = []
+        t = 0.0
+        for _ in range(count):
+            t += rng.expovariate(rate)
+            offsets.append(t)
+        return offsets
+    return [i / rate for i in range(count)]
+
+
+class OpenLoopResults:
+    """Thread-safe collection of latency-from-intended, service time and lag samples"""
+
+    def __init__(self, stats):
+        self.stats = stats  # latency measured from the intended send time
+        self.service = LatencyHistogram()  # latency measured from the actual send time
+        self.start_lag = LatencyHistogram()  # actual send time - intended send time
+        self.submit_lag = LatencyHistogram()  # scheduler wake-up - intended send time
+        self.lock = threading.Lock()
+
+    def record(self, intended, started, finished, error):
+        with self.lock:
+            self.start_lag.record(max(0.0, started - intended))
+            if error:
+                self.stats.record_error(error, finished - intended)
+            else:
+                self.stats.record_success(finished - intended)
+                self.service.record(finished - started)
+
+
+def run_one(client, arn, agent, duration_seconds, index, intended, results):
+    started = time.time()
+    error = None
+    try:
+        response = client.invoke_agent_runtime(
+            agentRuntimeArn=arn,
+            runtimeSessionId=new_session_id(f'openloop-{agent}-{index}'),
+            payload=json.dumps(build_payload(agent, duration_seconds))
+        )
+        read_streaming_body(response['response'], started)
+    except Exception as e:
+        error = type(e).__name__
+    results.record(intended, started, time.time(), error)
+
+
+def test_open_loop():
+    """Offer RATE req/s for TEST_SECONDS with constant or Poisson arrivals"""
+
+    agent = os.getenv('AGENT', 'sleep')
+    rate = float(os.getenv('RATE', '10'))
+    test_seconds = float(os.getenv('TEST_SECONDS', '60'))
+    arrival = os.getenv('ARRIVAL', 'constant')
+    max_in_flight = int(os.getenv('MAX_IN_FLIGHT', '500'))
+    duration_seconds = int(os.getenv('DURATION_SECONDS', '0'))
+    read_timeout = int(os.getenv('READ_TIMEOUT', '900'))
+    lag_threshold = float(os.getenv('LAG_THRESHOLD_SECONDS', '0.05'))
+    seed = os.getenv('SEED')
+    histogram_out = os.getenv('HISTOGRAM_OUT')
+
+    count = int(rate * test_seconds)
+    offsets = arrival_offsets(rate, count, arrival, int(seed) if seed else None)
+
+    client = make_client(read_timeout=read_timeout, connect_timeout=60, max_pool_connections=max_in_flight)
+    requested = expected_seconds(agent, duration_seconds)
+    results = OpenLoopResults(RunStats(label=f'{agent}-{arrival}-{rate:g}rps', requested_seconds=requested,
+                                       on_result=results_sink(agent, f'open-loop-{arrival}-{rate:g}rps',
+                                                              requested=requested)))
+
+    print(f'🚀 OPEN-LOOP LOAD TEST: {agent} agent')
+    print(f'📈 Target rate: {rate:g} req/s ({arrival} arrivals) for {test_seconds:g}s = {count} requests')
+    print(f'🔀 Worker limit: {max_in_flight}')
+    print(f'⏱️  Duration: {duration_seconds} seconds per invocation')
+    print('')
+
+    try:
+        arn = agent_arn(agent)
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    late_submits = 0
+    start_time = time.time()
+    print(f"📡 Starting schedule at {time.strftime('%H:%M:%S')}")
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for index, offset in enumerate(offsets):
+            intended = start_time + offset
+            delay = intended - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            lag = time.time() - intended
+            results.submit_lag.record(max(0.0, lag))
+            if lag > lag_threshold:
+                late_submits += 1
+            # Never wait for a free worker here - that would turn this back into a closed loop
+            pool.submit(run_one, client, arn, agent, duration_seconds, index, intended, results)
+        schedule_seconds = time.time() - start_time
+
+    wall_time = time.time() - start_time
+    stats = results.stats
+    late_starts = sum(count for value, count in results.start_lag.values() if value > lag_threshold)
+
+    print('')
+    print(f'🏁 OPEN-LOOP TEST COMPLETE after {wall_time:.1f} seconds')
+    print(f'📈 Offered: {count / schedule_seconds if schedule_seconds else 0:.2f} req/s '
+          f'(target {rate:g}), achieved {stats.histogram.count / wall_time if wall_time else 0:.2f} req/s')
+    print('')
+    print('📊 Latency from INTENDED send time (what users would see):')
+    stats.report()
+    print('')
+    print(f'📊 Service time from actual send p50/p99: '
+          f'{results.service.percentile(50):.3f}s / {results.service.percentile(99):.3f}s')
+    print(f'⏳ Scheduler lag p99/max: {results.submit_lag.percentile(99) * 1000:.1f}ms / {results.submit_lag.max() * 1000:.1f}ms')
+    print(f'⏳ Start lag p99/max: {results.start_lag.percentile(99) * 1000:.1f}ms / {results.start_lag.max() * 1000:.1f}ms')
+
+    if late_submits:
+        print(f'⚠️  GENERATOR FELL BEHIND: {late_submits}/{count} sends were scheduled more than '
+              f'{lag_threshold * 1000:.0f}ms late - offered load is below target')
+    if late_starts:
+        print(f'⚠️  WORKERS SATURATED: {late_starts}/{count} requests started more than '
+              f'{lag_threshold * 1000:.0f}ms late - raise MAX_IN_FLIGHT or lower RATE')
+    if not late_submits and not late_starts:
+        print('✅ Generator kept up with the schedule')
+
+    if histogram_out:
+        stats.save(histogram_out)
+        print(f'💾 Histogram written to {histogram_out}')
+
+
+if __name__ == "__main__":
+    test_open_loop()
@@ -0,0 +1,187 @@
+"""
+Payload size sweep - serialization cost, bytes on the wire and latency from 1KB to many MB
+
+For every size in PAYLOAD_SIZES the debug agent's payload is built with a
+large_data field of that size and serialized ONCE into a bytes buffer that
+every request of that size reuses, so nothing is re-encoded or copied per
+call (botocore's blob validation rejects memoryview, and bytes are passed to
+the socket as they are). The per-call json.dumps + encode cost the
+older scripts pay is still measured and reported next to it.
+
+Each ENCODINGS entry is sent with a matching Content-Encoding header:
+identity, gzip, and zstd when the optional zstandard package is installed.
+local_agentcore_server.py accepts all three; the real endpoint may reject
+compressed bodies, which shows up as errors in the table.
+
+  PAYLOAD_SIZES="1KB 16KB 256KB 1MB 4MB"  ENCODINGS="identity gzip zstd"  REQUESTS_PER_SIZE=5
+  PAYLOAD_DATA=random (random | text | repeat)  GZIP_LEVEL=6  ZSTD_LEVEL=3
+"""
+import base64
+import gzip
+import json
+import os
+import random
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from agentcore_common import agent_arn, build_payload, make_client, new_session_id
+from latency_histogram import LatencyHistogram
+from streaming_reader import read_streaming_body
+
+UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 * 1024}
+WORDS = ('agent', 'runtime', 'session', 'invoke', 'latency', 'payload', 'stream', 'result', 'token', 'prompt')
+
+
+def parse_size(text):
+    """'16KB' -> 16384"""
+    text = text.strip().upper()
+    for unit in ('MB', 'KB', 'B'):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * UNITS[unit])
+    return int(text)
+
+
+def format_size(size):
+    if size >= UNITS['MB']:
+        return f'{size / UNITS["MB"]:.3g}MB'
+    if size >= UNITS['KB']:
+        return f'{size / UNITS["KB"]:.3g}KB'
+    return f'{size}B'
+
+
+def make_data(size, kind, seed=0):
+    """large_data of exactly `size` characters: incompressible, text-like or one repeated character"""
+    if kind == 'repeat':
+        return 'x' * size
+    rng = random.Random(seed)
+    if kind == 'text':
+        words = []
+        length = 0
+        while length < size:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return ' '.join(words)[:size]
+    return base64.b64encode(rng.randbytes(size * 3 // 4 + 3)).decode('ascii')[:size]
+
+
+def compressor(encoding, gzip_level=6, zstd_level=3):
+    """bytes -> bytes for one Content-Encoding, or None when it is not available here"""
+    if encoding == 'identity':
+        return lambda data: data
+    if encoding == 'gzip':
+        return lambda data: gzip.compress(data, gzip_level)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdCompressor(level=zstd_level).compress
+    return None
+
+
+def best_of(fn, repeat=5):
+    """Fastest of `repeat` runs, in seconds, plus the last result"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class PreparedBody:
+    """One size/encoding request body, built once and reused by every request"""
+    __slots__ = ('size', 'encoding', 'body', 'json_bytes', 'serialize_seconds', 'compress_seconds')
+
+    def __init__(self, size, encoding, payload, compress):
+        self.size = size
+        self.encoding = encoding
+        # What every older script does per call: dict -> str -> bytes
+        self.serialize_seconds, raw = best_of(lambda: json.dumps(payload).encode('utf-8'))
+        self.json_bytes = len(raw)
+        self.compress_seconds, body = best_of(lambda: compress(raw)) if encoding != 'identity' else (0.0, raw)
+        self.body = body
+
+    def wire_bytes(self):
+        return len(self.body)
+
+
+def encoding_client(encoding, read_timeout):
+    client = make_client(read_timeout=read_timeout, connect_timeout=30, max_pool_connections=1)
+    if encoding != 'identity':
+        def add_content_encoding(request, **kwargs):
+            request.headers['Content-Encoding'] = encoding
+        # before-sign so the header is covered by the SigV4 signature
+        client.meta.events.register('before-sign.bedrock-agentcore.InvokeAgentRuntime', add_content_encoding)
+    return client
+
+
+def test_payload_sweep():
+    """Sweep body sizes and encodings against the debug agent"""
+
+    sizes = [parse_size(s) for s in os.getenv('PAYLOAD_SIZES', '1KB 16KB 256KB 1MB 4MB').split()]
+    encodings = os.getenv('ENCODINGS', 'identity gzip zstd').split()
+    requests = int(os.getenv('REQUESTS_PER_SIZE', '5'))
+    kind = os.getenv('PAYLOAD_DATA', 'random')
+    read_timeout = int(os.getenv('READ_TIMEOUT', '120'))
+    gzip_level = int(os.getenv('GZIP_LEVEL', '6'))
+    zstd_level = int(os.getenv('ZSTD_LEVEL', '3'))
+
+    available = []
+    for encoding in encodings:
+        if compressor(encoding) is None:
+            print(f'⚠️  Skipping {encoding}: not available (pip install zstandard)')
+        else:
+            available.append(encoding)
+
+    print(f'🚀 PAYLOAD SWEEP: {", ".join(format_size(s) for s in sizes)} x {", ".join(available)}')
+    print(f'📦 {kind} large_data, {requests} requests per size and encoding')
+    print('')
+
+    try:
+        arn = agent_arn('debug')
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    clients = {encoding: encoding_client(encoding, read_timeout) for encoding in available}
+    print(f'{"size":>7} {"encoding":<9} {"wire":>9} {"ratio":>6} {"json/call":>10} {"compress":>9} '
+          f'{"p50":>9} {"max":>9} {"MB/s":>7}  errors')
+
+    for size in sizes:
+        payload = build_payload('debug', 0)
+        payload['large_data'] = make_data(size, kind)
+        for encoding in available:
+            prepared = PreparedBody(size, encoding, payload, compressor(encoding, gzip_level, zstd_level))
+            latency = LatencyHistogram()
+            errors = {}
+            for i in range(requests):
+                start_time = time.time()
+                try:
+                    response = clients[encoding].invoke_agent_runtime(
+                        agentRuntimeArn=arn,
+                        runtimeSessionId=new_session_id(f'payload-{format_size(size)}-{encoding}-{i}'),
+                        payload=prepared.body  # same bytes every time: no per-request encode or copy
+                    )
+                    read_streaming_body(response['response'], start_time)
+                    latency.record(time.time() - start_time)
+                except Exception as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+            p50 = latency.percentile(50)
+            throughput = prepared.json_bytes / p50 / UNITS['MB'] if latency.count and p50 else 0.0
+            print(f'{format_size(size):>7} {encoding:<9} {format_size(prepared.wire_bytes()):>9} '
+                  f'{prepared.json_bytes / prepared.wire_bytes():>5.1f}x {prepared.serialize_seconds * 1000:>8.2f}ms '
+                  f'{prepared.compress_seconds * 1000:>7.2f}ms '
+                  f'{p50 * 1000 if latency.count else 0:>7.1f}ms {latency.max() * 1000 if latency.count else 0:>7.1f}ms '
+                  f'{throughput:>7.1f}  {", ".join(f"{k}={n}" for k, n in errors.items()) or "none"}')
+
+    print('')
+    print('💡 json/call is what re-serializing per request costs; the sweep itself reuses one buffer per size.')
+    print('💡 Compression pays off where compress time < the latency it saves on the wire.')
+
+
+if __name__ == "__main__":
+    test_payload_sweep()
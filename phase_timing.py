@@ -0,0 +1,193 @@
+"""
+Per-phase latency breakdown for invoke_agent_runtime calls
+
+Hooks botocore call events and the client's urllib3 connection class to time
+each phase of an invocation without DEBUG logging:
+
+  sign     before-call -> before-send (serialize + SigV4)
+  dns      getaddrinfo for a new connection
+  connect  TCP handshake
+  tls      TLS handshake
+  send     writing request headers and body
+  wait     request written -> response headers received (time to first byte)
+  body     reading the streaming body (reported by the caller)
+
+plus whether the request went out on a reused pooled connection.
+"""
+import json
+import socket
+import threading
+import time
+
+from agentcore_common import install_connection_mixin
+
+PHASES = ('sign', 'dns', 'connect', 'tls', 'send', 'wait', 'body')
+
+
+class PhaseRecord:
+    """Phase durations in seconds for one invocation"""
+    __slots__ = PHASES + ('operation', 'started', 'sent', 'reused', 'attempts', 'status', 'error')
+
+    def __init__(self, operation):
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.sent = None
+        self.reused = None
+        self.attempts = 0
+        self.status = None
+        self.error = None
+
+    def total(self):
+        return sum(getattr(self, phase) for phase in PHASES)
+
+    def as_dict(self):
+        record = {phase: round(getattr(self, phase) * 1000, 2) for phase in PHASES}
+        record.update({
+            'op': self.operation,
+            'total': round(self.total() * 1000, 2),
+            'reused': self.reused,
+            'attempts': self.attempts,
+            'status': self.status,
+        })
+        if self.error:
+            record['error'] = self.error
+        return record
+
+    def line(self):
+        """Compact one-line JSON record, milliseconds per phase"""
+        return json.dumps(self.as_dict(), separators=(',', ':'))
+
+
+def print_record(record):
+    print(f'⏱️  PHASES {record.line()}')
+
+
+class PhaseTimer:
+    """Collects one PhaseRecord per invocation on each thread"""
+
+    def __init__(self, on_record=print_record):
+        self.on_record = on_record
+        self._local = threading.local()
+
+    def current(self):
+        return getattr(self._local, 'record', None)
+
+    def install(self, client):
+        """Register the event hooks and connection mixin on one client"""
+        events = client.meta.events
+        events.register('before-call', self._before_call)
+        events.register('before-send', self._before_send)
+        events.register('after-call', self._after_call)
+        events.register('after-call-error', self._after_call_error)
+        install_connection_mixin(client, self._connection_mixin())
+        return self
+
+    def finish(self, body_seconds=0.0):
+        """Close the current record once the caller has read the body and emit it"""
+        record = self.current()
+        if record is None:
+            return None
+        record.body = body_seconds
+        self._local.record = None
+        if self.on_record:  # None when the caller only uses finish()'s return value
+            self.on_record(record)
+        return record
+
+    def _before_call(self, model, **kwargs):
+        self._local.record = PhaseRecord(model.name)
+
+    def _before_send(self, **kwargs):
+        record = self.current()
+        if record is not None and record.sent is None:
+            record.sent = time.perf_counter()
+            record.sign = record.sent - record.started
+
+    def _after_call(self, http_response, **kwargs):
+        record = self.current()
+        if record is not None:
+            record.status = http_response.status_code
+
+    def _after_call_error(self, exception, **kwargs):
+        record = self.current()
+        if record is not None:
+            record.error = type(exception).__name__
+            self.finish()
+
+    def _connection_mixin(self):
+        timer = self
+
+        class PhaseTimingConnection:
+            """Times DNS/connect/TLS on new connections and send/wait on every request"""
+            _phase_fresh = False
+
+            def _new_conn(self):
+                record = timer.current()
+                host = self._dns_host
+                started = time.perf_counter()
+                try:
+                    # Resolve here so DNS is timed apart from the TCP handshake
+                    self._dns_host = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+                except socket.gaierror:
+                    pass  # let urllib3 raise its own NameResolutionError
+                resolved = time.perf_counter()
+                try:
+                    sock = super()._new_conn()
+                finally:
+                    self._dns_host = host
+                if record is not None:
+                    record.dns += resolved - started
+                    record.connect += time.perf_counter() - resolved
+                return sock
+
+            def connect(self):
+                record = timer.current()
+                before = (record.dns + record.connect) if record is not None else 0.0
+                started = time.perf_counter()
+                super().connect()
+                # Opened outside any call (e.g. pre-warmed) means the first request reuses it
+                self._phase_fresh = record is not None
+                if record is not None:
+                    remainder = max(0.0, time.perf_counter() - started - (record.dns + record.connect - before))
+                    if hasattr(self, 'ssl_context'):
+                        record.tls += remainder  # whatever connect() spent beyond DNS + TCP is the handshake
+                    else:
+                        record.connect += remainder  # plain http has no TLS phase
+
+            def request(self, *args, **kwargs):
+                record = timer.current()
+                if record is None:
+                    return super().request(*args, **kwargs)
+                before = record.dns + record.connect + record.tls
+                started = time.perf_counter()
+                try:
+                    return super().request(*args, **kwargs)
+                finally:
+                    # http:// connections open lazily inside request(), https:// ones before it
+                    record.send += time.perf_counter() - started - (record.dns + record.connect + record.tls - before)
+                    record.attempts += 1
+                    record.reused = not self._phase_fresh
+                    self._phase_fresh = False
+                    self._phase_sent_at = time.perf_counter()
+
+            def getresponse(self, *args, **kwargs):
+                response = super().getresponse(*args, **kwargs)
+                record = timer.current()
+                if record is not None:
+                    record.wait += time.perf_counter() - self._phase_sent_at
+                return response
+
+        return PhaseTimingConnection
+
+
+def summarize(records):
+    """Median of each phase in milliseconds plus the pooled-connection reuse rate"""
+    if not records:
+        return {}
+    summary = {}
+    for phase in PHASES + ('total',):
+        values = sorted(r.total() if phase == 'total' else getattr(r, phase) for r in records)
+        summary[phase] = round(values[len(values) // 2] * 1000, 2)
+    summary['reused_pct'] = round(100.0 * sum(1 for r in records if r.reused) / len(records), 1)
+    return summary
@@ -0,0 +1,218 @@
+"""
+Connection pre-warming and DNS pre-resolution ahead of timed invocations
+
+Before the timed phase starts:
+  1. resolve the endpoint once and pin the addresses in a per-client DNS cache
+  2. open and TLS-handshake PREWARM_CONNECTIONS connections in parallel and
+     park them in the client's urllib3 pool
+  3. right before timing, re-check the parked connections and reopen any the
+     server or a middlebox closed in the meantime (TCP keep-alive from
+     tcp_options keeps NAT entries alive while they wait)
+
+test_prewarm runs the same burst of short invocations on a cold client and on
+a pre-warmed one and reports how much setup latency pre-warming removed.
+
+  AGENT=debug  REQUESTS=20  PREWARM_CONNECTIONS=10  PREWARM_HOLD_SECONDS=0  DNS_TTL=300
+"""
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from agentcore_common import agent_arn, build_payload, install_connection_mixin, make_client, new_session_id
+from latency_histogram import LatencyHistogram
+from phase_timing import PhaseTimer, summarize
+from streaming_reader import read_streaming_body
+from tcp_options import TcpOptions, TcpOptionsFactory
+
+
+class DnsCache:
+    """Resolved endpoint addresses shared by every new connection of the clients it is installed on"""
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+        self._entries = {}  # (host, port) -> (expires at, [addresses])
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        """Look the host up now and cache every address it returned"""
+        started = time.perf_counter()
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        elapsed = time.perf_counter() - started
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self.lookups += 1
+            self.lookup_seconds += elapsed
+            self._entries[(host, port)] = (time.time() + self.ttl, addresses)
+        return addresses
+
+    def addresses(self, host, port):
+        with self._lock:
+            entry = self._entries.get((host, port))
+        if entry is None or entry[0] < time.time():
+            return self.resolve(host, port)
+        return entry[1]
+
+    def install(self, client):
+        cache = self
+
+        class CachedDnsConnection:
+            def _new_conn(self):
+                host = self._dns_host
+                try:
+                    # Connect to the cached address; TLS still verifies and sends SNI for self.host
+                    self._dns_host = cache.addresses(host, self.port)[0]
+                except (socket.gaierror, IndexError):
+                    pass  # let urllib3 raise its own NameResolutionError
+                try:
+                    return super()._new_conn()
+                finally:
+                    self._dns_host = host
+
+        install_connection_mixin(client, CachedDnsConnection)
+        return self
+
+
+class Prewarmer:
+    """Opens connections in a botocore client's pool before it sends its first request"""
+
+    def __init__(self, client, connections):
+        self.client = client
+        self.connections = connections
+        self.url = client._endpoint.host
+        parts = urlsplit(self.url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+
+    def _pool(self):
+        session = self.client._endpoint.http_session
+        proxy_url = session._proxy_config.proxy_url_for(self.url)
+        pool = session._get_connection_manager(self.url, proxy_url).connection_from_url(self.url)
+        session._setup_ssl_cert(pool, self.url, session._verify)  # what botocore does before every send
+        return pool
+
+    def warm(self):
+        """Open and handshake the connections in parallel; returns each one's setup seconds"""
+        pool = self._pool()
+        conns = [pool._get_conn() for _ in range(self.connections)]
+
+        def open_one(conn):
+            started = time.perf_counter()
+            conn.connect()
+            return time.perf_counter() - started
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.connections) as executor:
+                return list(executor.map(open_one, conns))
+        finally:
+            for conn in conns:
+                pool._put_conn(conn)
+
+    def refresh(self):
+        """Reopen parked connections the peer closed while waiting; returns how many were reopened"""
+        pool = self._pool()
+        conns = [pool._get_conn() for _ in range(self.connections)]
+        reopened = 0
+        try:
+            for conn in conns:
+                if not conn.is_connected:
+                    conn.close()
+                    conn.connect()
+                    reopened += 1
+        finally:
+            for conn in conns:
+                pool._put_conn(conn)
+        return reopened
+
+
+def run_burst(client, timer, arn, agent, requests, concurrency):
+    """Same short invocation REQUESTS times, CONCURRENCY at once; returns per-request latencies"""
+    payload = json.dumps(build_payload(agent, 0))
+
+    def run(index):
+        start_time = time.time()
+        try:
+            response = client.invoke_agent_runtime(agentRuntimeArn=arn,
+                                                   runtimeSessionId=new_session_id(f'prewarm-{agent}-{index}'),
+                                                   payload=payload)
+            stream = read_streaming_body(response['response'], start_time)
+            timer.finish(stream.body_seconds)
+            return time.time() - start_time
+        except Exception as e:
+            print(f'   ❌ request {index}: {type(e).__name__}: {e}')
+            return None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(run, range(requests)))
+
+
+def timed_client(connections, records):
+    client = make_client(read_timeout=60, connect_timeout=30, max_pool_connections=connections)
+    TcpOptionsFactory(TcpOptions.from_env()).install(client)
+    timer = PhaseTimer(on_record=records.append).install(client)
+    return client, timer
+
+
+def test_prewarm():
+    """Run one burst of short invocations cold and one pre-warmed, and compare"""
+
+    agent = os.getenv('AGENT', 'debug')
+    requests = int(os.getenv('REQUESTS', '20'))
+    connections = int(os.getenv('PREWARM_CONNECTIONS', '10'))
+    hold_seconds = float(os.getenv('PREWARM_HOLD_SECONDS', '0'))
+    dns_ttl = float(os.getenv('DNS_TTL', '300'))
+
+    print(f'🚀 PRE-WARM TEST: {agent} agent, {requests} requests, {connections} at once')
+    print('')
+
+    try:
+        arn = agent_arn(agent)
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    results = {}
+    for label in ('cold', 'prewarmed'):
+        records = []
+        client, timer = timed_client(connections, records)
+        if label == 'prewarmed':
+            cache = DnsCache(ttl=dns_ttl).install(client)
+            warm_start = time.time()
+            prewarmer = Prewarmer(client, connections)
+            addresses = cache.resolve(prewarmer.host, prewarmer.port)
+            setup = prewarmer.warm()
+            print(f'🔥 Resolved {prewarmer.host} -> {", ".join(addresses)} in {cache.lookup_seconds * 1000:.1f}ms, '
+                  f'opened {len(setup)} connections (slowest {max(setup) * 1000:.1f}ms) '
+                  f'in {time.time() - warm_start:.2f}s')
+            if hold_seconds:
+                time.sleep(hold_seconds)
+                print(f'♻️  Reopened {prewarmer.refresh()} connections closed during a {hold_seconds:g}s hold')
+
+        latency = LatencyHistogram()
+        for seconds in run_burst(client, timer, arn, agent, requests, connections):
+            if seconds is not None:
+                latency.record(seconds)
+        results[label] = (latency, records)
+
+    print('')
+    print(f'{"":<10} {"p50":>8} {"p99":>8} {"max":>8} {"setup in timed window":>22} {"reused":>7}')
+    for label, (latency, records) in results.items():
+        setup = sum(r.dns + r.connect + r.tls for r in records)
+        reused = summarize(records).get('reused_pct', 0)
+        print(f'{label:<10} {latency.percentile(50) * 1000:>6.1f}ms {latency.percentile(99) * 1000:>6.1f}ms '
+              f'{latency.max() * 1000:>6.1f}ms {setup * 1000:>20.1f}ms {reused:>6.0f}%')
+
+    cold, warm = results['cold'][0], results['prewarmed'][0]
+    if cold.count and warm.count:
+        print('')
+        print(f'✅ Pre-warming removed {(cold.percentile(50) - warm.percentile(50)) * 1000:.1f}ms at p50 and '
+              f'{(cold.max() - warm.max()) * 1000:.1f}ms from the slowest request')
+
+
+if __name__ == "__main__":
+    test_prewarm()
@@ -0,0 +1,237 @@
+"""
+Statistical latency regression gate - current samples vs a stored baseline histogram
+
+Replaces "one sample within +/-Ns of the requested duration" with tests on
+whole distributions. Both sides are RunStats histogram files (HISTOGRAM_OUT
+of repeat_test.py and friends, or several merged with latency_histogram.py):
+
+  median   Mann-Whitney U (tie-corrected normal approximation; histogram
+           buckets are ties) with Cliff's delta as the effect size
+  p50/p99  bootstrap confidence interval of current - baseline. Each
+           replicate draws the resampled order statistic directly as
+           F^-1(Beta(rank, n - rank + 1)), so it costs the same for 20
+           samples as for 2 million
+  errors   one-sided two-proportion z-test on the error rate
+
+A shift only counts as a regression when it is significant AND its whole
+confidence interval is above MIN_SHIFT_PCT of the baseline value (or
+MIN_SHIFT_SECONDS), so noise and irrelevant millisecond shifts do not fail
+the gate. Exit status: 0 pass, 1 regression, 2 not enough samples.
+
+  python3 regression_gate.py current.json baseline.json
+  ALPHA=0.01  GATE_PERCENTILES="50 99"  MIN_SHIFT_PCT=5  MIN_SHIFT_SECONDS=0  BOOTSTRAP=2000  MIN_SAMPLES=10  SEED=0
+"""
+import bisect
+import math
+import os
+import random
+import sys
+
+from latency_histogram import RunStats
+
+
+def _normal_sf(z):
+    """P(Z > z) for a standard normal"""
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def _buckets(histogram):
+    return list(histogram.values())
+
+
+def mann_whitney(current, baseline):
+    """U statistic of current over baseline and one-sided p that current is stochastically larger
+
+    Works on (value, count) buckets without expanding them; equal bucket
+    values are ties and get the average rank plus the tie-corrected variance.
+    """
+    n1, n2 = current.count, baseline.count
+    counts = {}
+    for value, count in _buckets(current):
+        counts.setdefault(value, [0, 0])[0] += count
+    for value, count in _buckets(baseline):
+        counts.setdefault(value, [0, 0])[1] += count
+
+    rank_sum = 0.0
+    ties = 0.0
+    seen = 0
+    for value in sorted(counts):
+        in_current, in_baseline = counts[value]
+        total = in_current + in_baseline
+        rank_sum += in_current * (seen + (total + 1) / 2.0)
+        ties += total ** 3 - total
+        seen += total
+
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0  # every value identical
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)  # continuity correction toward "no shift"
+    return u, _normal_sf(z)
+
+
+def cliffs_delta(u, n1, n2):
+    """P(current > baseline) - P(current < baseline), from the Mann-Whitney U"""
+    return 2.0 * u / (n1 * n2) - 1.0
+
+
+def effect_label(delta):
+    """Romano et al. thresholds for |Cliff's delta|"""
+    size = abs(delta)
+    if size < 0.147:
+        return 'negligible'
+    if size < 0.33:
+        return 'small'
+    if size < 0.474:
+        return 'medium'
+    return 'large'
+
+
+class Quantiles:
+    """Inverse CDF of a histogram for drawing bootstrap percentiles"""
+
+    def __init__(self, histogram):
+        self.values = []
+        self.cumulative = []
+        total = 0
+        for value, count in _buckets(histogram):
+            total += count
+            self.values.append(value)
+            self.cumulative.append(total)
+        self.count = total
+
+    def draw(self, pct, rng):
+        """One bootstrap replicate of the pct-th percentile (nearest rank) of a resample of size count"""
+        rank = max(1, math.ceil(self.count * pct / 100.0))
+        u = rng.betavariate(rank, self.count - rank + 1)  # rank-th order statistic of count uniforms
+        index = bisect.bisect_left(self.cumulative, u * self.count)
+        return self.values[min(index, len(self.values) - 1)]
+
+
+def bootstrap_shift(current, baseline, pct, iterations, alpha, rng):
+    """(low, high) confidence interval of current - baseline at the pct-th percentile"""
+    cur, base = Quantiles(current), Quantiles(baseline)
+    shifts = sorted(cur.draw(pct, rng) - base.draw(pct, rng) for _ in range(iterations))
+    low = shifts[int(alpha / 2 * (iterations - 1))]
+    high = shifts[int(math.ceil((1 - alpha / 2) * (iterations - 1)))]
+    return low, high
+
+
+def error_rate_p(current, baseline):
+    """One-sided p that the current error rate is higher (pooled two-proportion z-test)"""
+    e1, n1 = sum(current.errors.values()), current.attempts()
+    e2, n2 = sum(baseline.errors.values()), baseline.attempts()
+    if not n1 or not n2:
+        return 1.0
+    pooled = (e1 + e2) / (n1 + n2)
+    if pooled in (0.0, 1.0):
+        return 1.0
+    z = (e1 / n1 - e2 / n2) / math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    return _normal_sf(z)
+
+
+def sample_rank(baseline, seconds):
+    """Percent of baseline samples at or below `seconds` - where one new sample sits in the baseline"""
+    below = sum(count for value, count in _buckets(baseline) if value <= seconds)
+    return 100.0 * below / baseline.count if baseline.count else 0.0
+
+
+class GateResult:
+    def __init__(self):
+        self.lines = []
+        self.regressions = []
+        self.inconclusive = False
+
+    @property
+    def exit_code(self):
+        if self.regressions:
+            return 1
+        return 2 if self.inconclusive else 0
+
+
+def compare(current, baseline, alpha=0.01, percentiles=(50, 99), min_shift_pct=5.0, min_shift_seconds=0.0,
+            iterations=2000, min_samples=10, seed=0):
+    """Gate current RunStats against baseline RunStats; returns a GateResult"""
+    result = GateResult()
+    cur, base = current.histogram, baseline.histogram
+    if cur.count < min_samples or base.count < min_samples:
+        result.inconclusive = True
+        result.lines.append(f'⚠️  Not enough samples to compare: current {cur.count}, baseline {base.count} '
+                            f'(need {min_samples} each)')
+        return result
+
+    rng = random.Random(seed)
+    u, p = mann_whitney(cur, base)
+    delta = cliffs_delta(u, cur.count, base.count)
+    result.lines.append(f'📐 Mann-Whitney: U={u:.0f}, one-sided p={p:.2g}, '
+                        f"Cliff's delta={delta:+.3f} ({effect_label(delta)})")
+
+    for pct in percentiles:
+        base_value, cur_value = base.percentile(pct), cur.percentile(pct)
+        low, high = bootstrap_shift(cur, base, pct, iterations, alpha, rng)
+        tolerance = max(min_shift_seconds, base_value * min_shift_pct / 100.0)
+        line = (f'p{pct:<4g} baseline {base_value:.3f}s  current {cur_value:.3f}s  '
+                f'shift {cur_value - base_value:+.3f}s  {100 * (1 - alpha):g}% CI [{low:+.3f}s, {high:+.3f}s]')
+        # The median also needs the rank test to agree; tails rely on the bootstrap alone
+        significant = low > tolerance and (pct != 50 or p < alpha)
+        if significant:
+            result.regressions.append(f'p{pct:g}')
+            result.lines.append(f'❌ {line}  REGRESSION (> {tolerance:.3f}s)')
+        elif high < -tolerance:
+            result.lines.append(f'🚀 {line}  faster')
+        else:
+            result.lines.append(f'✅ {line}')
+
+    error_p = error_rate_p(current, baseline)
+    rates = (f'errors {sum(current.errors.values())}/{current.attempts()} vs '
+             f'{sum(baseline.errors.values())}/{baseline.attempts()}, one-sided p={error_p:.2g}')
+    if error_p < alpha:
+        result.regressions.append('error rate')
+        result.lines.append(f'❌ {rates}  REGRESSION')
+    else:
+        result.lines.append(f'✅ {rates}')
+    return result
+
+
+def gate_from_env(current, baseline):
+    return compare(
+        current, baseline,
+        alpha=float(os.getenv('ALPHA', '0.01')),
+        percentiles=[float(p) for p in os.getenv('GATE_PERCENTILES', '50 99').split()],
+        min_shift_pct=float(os.getenv('MIN_SHIFT_PCT', '5')),
+        min_shift_seconds=float(os.getenv('MIN_SHIFT_SECONDS', '0')),
+        iterations=int(os.getenv('BOOTSTRAP', '2000')),
+        min_samples=int(os.getenv('MIN_SAMPLES', '10')),
+        seed=int(os.getenv('SEED', '0')),
+    )
+
+
+def run_gate(current, baseline, baseline_path):
+    """Print the comparison and return the exit status"""
+    print(f'🚦 REGRESSION GATE: {current.label or "current"} ({current.histogram.count} samples) vs '
+          f'{baseline_path} ({baseline.histogram.count} samples)')
+    result = gate_from_env(current, baseline)
+    for line in result.lines:
+        print(line)
+    if result.regressions:
+        print(f'🚨 Latency regression in {", ".join(result.regressions)}')
+    elif not result.inconclusive:
+        print('✅ No significant regression')
+    return result.exit_code
+
+
+def check_sample(seconds, baseline_path):
+    """Where one measured duration falls in the baseline, for the single-invocation scripts"""
+    baseline = RunStats.load(baseline_path).histogram
+    rank = sample_rank(baseline, seconds)
+    icon = '✅' if seconds <= baseline.percentile(99) else '⚠️ '
+    print(f'{icon} {seconds:.2f}s is at p{rank:.1f} of the baseline ({baseline.count} runs: '
+          f'p50 {baseline.percentile(50):.2f}s, p99 {baseline.percentile(99):.2f}s)')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print('Usage: python3 regression_gate.py current.json baseline.json')
+        sys.exit(1)
+    sys.exit(run_gate(RunStats.load(sys.argv[1]), RunStats.load(sys.argv[2]), sys.argv[2]))
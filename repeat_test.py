@@ -0,0 +1,76 @@
+"""
+Repeat-N latency test - runs one agent REPEAT times and reports percentiles from a histogram
+
+With BASELINE_HISTOGRAM set the run is gated against that stored histogram
+(see regression_gate.py) and the exit status is non-zero on a regression.
+"""
+import json
+import os
+import sys
+import time
+
+from agentcore_common import agent_arn, build_payload, expected_seconds, make_client, new_session_id
+from latency_histogram import RunStats
+from regression_gate import run_gate
+from results_store import results_sink
+from streaming_reader import read_streaming_body
+
+
+def test_repeat():
+    """Invoke the same agent REPEAT times back to back and record every sample"""
+
+    agent = os.getenv('AGENT', 'sleep')
+    repeat = int(os.getenv('REPEAT', '20'))
+    duration_seconds = int(os.getenv('DURATION_SECONDS', '0'))
+    read_timeout = int(os.getenv('READ_TIMEOUT', '900'))
+    histogram_out = os.getenv('HISTOGRAM_OUT', f'latency_{agent}_{int(time.time())}.json')
+    baseline_path = os.getenv('BASELINE_HISTOGRAM')
+    label = os.getenv('RUN_LABEL', os.getenv('RUNNER_NAME', 'local'))
+
+    client = make_client(read_timeout=read_timeout, connect_timeout=60, max_pool_connections=1)
+
+    requested = expected_seconds(agent, duration_seconds)
+    stats = RunStats(label=label, requested_seconds=requested, on_result=results_sink(agent, 'repeat', requested=requested))
+
+    print(f'🚀 REPEAT TEST: {agent} agent x {repeat}')
+    print(f'⏱️  Requested duration: {requested:g} seconds')
+    print(f'🏷️  Run label: {label}')
+    print('')
+
+    try:
+        arn = agent_arn(agent)
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    for i in range(repeat):
+        session_id = new_session_id(f'repeat-{agent}-{i}')
+        start_time = time.time()
+        try:
+            response = client.invoke_agent_runtime(
+                agentRuntimeArn=arn,
+                runtimeSessionId=session_id,
+                payload=json.dumps(build_payload(agent, duration_seconds))
+            )
+            read_streaming_body(response['response'], start_time)
+            latency = time.time() - start_time
+            stats.record_success(latency)
+            print(f'   ✅ {i + 1}/{repeat}: {latency:.2f}s')
+        except Exception as e:
+            stats.record_error(type(e).__name__)
+            print(f'   ❌ {i + 1}/{repeat}: {type(e).__name__} after {time.time() - start_time:.2f}s')
+
+    print('')
+    stats.report()
+    stats.save(histogram_out)
+    print(f'💾 Histogram written to {histogram_out} (merge with: python3 latency_histogram.py merge)')
+
+    if baseline_path:
+        print('')
+        exit_code = run_gate(stats, RunStats.load(baseline_path), baseline_path)
+        if exit_code:
+            sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    test_repeat()
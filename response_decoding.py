@@ -0,0 +1,254 @@
+"""
+Response decoding - one pass from raw body bytes to Python values, no eval
+
+Agent responses come back as JSON, as the repr() of a Python dict (what an
+agent returns when it str()s a DynamoDB item, Decimal('3') values included)
+or as DynamoDB-typed JSON ({"status": {"S": "completed"}}). The format is
+sniffed once from the first bytes instead of trying json.loads and falling
+back to eval():
+
+  {" [ " digits true/false/null  -> JSON, decoded straight from the bytes
+                                    (orjson when installed, else json; what
+                                    orjson rejects, e.g. NaN, is retried with json)
+  {' [' (  True/False/None         -> Python literal, walked with ast, no code runs
+  anything else                    -> not decodable (ValueError)
+
+DynamoDB-typed values and JSON documents wrapped in a JSON string are
+unwrapped on the way out.
+
+Limitation: with orjson installed, JSON integers wider than 64 bits come
+back as floats (orjson parses them without raising, so there is nothing to
+fall back on, and scanning every body for long digit runs costs more than
+the parse). Agent responses carry no such numbers; DynamoDB N values are
+strings and stay exact either way.
+
+  python3 response_decoding.py    (benchmark against the json.loads + eval path)
+  RESULT_SIZES="1KB 64KB 1MB 8MB"  ITERATIONS=20
+"""
+import ast
+import json
+import os
+from decimal import Decimal, InvalidOperation
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SNIFF_BYTES = 64
+JSON_STARTS = tuple(b'"-0123456789') + tuple(b'tfn')
+PYTHON_STARTS = (b'True', b'False', b'None', b'Decimal(')
+
+
+def sniff(data):
+    """'json', 'python', 'text' or 'empty' from the first non-blank bytes of a body"""
+    head = data[:SNIFF_BYTES]
+    if isinstance(head, str):
+        head = head.encode('utf-8', errors='replace')
+    head = bytes(head).lstrip()
+    if not head:
+        return 'empty'
+    if head[0] in b'{[(':
+        inner = head[1:].lstrip()
+        if head[0] == ord('(') or inner[:1] == b"'" or inner.startswith(PYTHON_STARTS):
+            return 'python'
+        return 'json'
+    if head[0] == ord("'") or head.startswith(PYTHON_STARTS):
+        return 'python'
+    if head[0] in JSON_STARTS:
+        return 'json'
+    return 'text'
+
+
+def _json_loads(data):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity, which stdlib json accepts
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def _is_number(text):
+    try:
+        return isinstance(text, str) and Decimal(text).is_finite()
+    except InvalidOperation:
+        return False
+
+
+def _number(text):
+    """DynamoDB N / Decimal string -> int when integral, else float"""
+    value = Decimal(text)
+    return int(value) if value == value.to_integral_value() else float(value)
+
+
+def _literal(node):
+    """ast.literal_eval plus Decimal('...') calls, which DynamoDB item reprs are full of"""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Dict):
+        if None in node.keys:
+            raise ValueError('dict unpacking is not a literal')
+        return {_literal(k): _literal(v) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [_literal(item) for item in node.elts]
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _literal(node.operand)
+        if isinstance(operand, (int, float)) and not isinstance(operand, bool):
+            return -operand if isinstance(node.op, ast.USub) else operand
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'Decimal'
+            and len(node.args) == 1 and not node.keywords and isinstance(node.args[0], ast.Constant)
+            and _is_number(node.args[0].value)):
+        return _number(node.args[0].value)
+    raise ValueError(f'not a literal: {type(node).__name__}')
+
+
+def _python_loads(data):
+    text = data if isinstance(data, str) else bytes(data).decode('utf-8')
+    try:
+        return _literal(ast.parse(text.strip(), mode='eval').body)
+    except (SyntaxError, TypeError) as e:  # TypeError: unhashable key such as {[1]: 2}
+        raise ValueError(f'not a Python literal: {e}') from None
+
+
+def _is_typed(value):
+    """True only for a well-formed typed value, checked all the way down
+
+    Plain JSON that merely looks typed ({"M": "foo"}, {"N": "abc"}) is left
+    alone instead of failing half-way through the unwrap.
+    """
+    if not (isinstance(value, dict) and len(value) == 1):
+        return False
+    (kind, inner), = value.items()
+    if kind in ('S', 'B'):
+        return isinstance(inner, str)
+    if kind == 'N':
+        return _is_number(inner)
+    if kind == 'BOOL':
+        return isinstance(inner, bool)
+    if kind == 'NULL':
+        return inner is True
+    if kind == 'M':
+        return isinstance(inner, dict) and all(_is_typed(item) for item in inner.values())
+    if kind == 'L':
+        return isinstance(inner, list) and all(_is_typed(item) for item in inner)
+    if kind == 'NS':
+        return isinstance(inner, list) and all(_is_number(item) for item in inner)
+    if kind in ('SS', 'BS'):
+        return isinstance(inner, list) and all(isinstance(item, str) for item in inner)
+    return False
+
+
+def _typed(value):
+    (kind, inner), = value.items()
+    if kind == 'N':
+        return _number(inner)
+    if kind == 'NULL':
+        return None
+    if kind == 'BOOL':
+        return bool(inner)
+    if kind == 'M':
+        return {key: _typed(item) for key, item in inner.items()}
+    if kind == 'L':
+        return [_typed(item) for item in inner]
+    if kind == 'NS':
+        return [_number(item) for item in inner]
+    if kind in ('SS', 'BS'):
+        return list(inner)
+    return inner  # S, B
+
+
+def unwrap_dynamodb(value):
+    """Plain values from a DynamoDB-typed item ({'k': {'S': 'v'}}) or typed value ({'M': {...}})"""
+    if _is_typed(value):
+        return _typed(value)
+    if isinstance(value, dict) and value and all(_is_typed(item) for item in value.values()):
+        return {key: _typed(item) for key, item in value.items()}
+    return value
+
+
+def decode_response(data):
+    """Decode a response body (bytes, bytearray, memoryview or str) into Python values
+
+    Raises ValueError when the body is empty, plain text or malformed.
+    """
+    kind = sniff(data)
+    if kind == 'json':
+        try:
+            value = _json_loads(data)
+        except ValueError:
+            value = _python_loads(data)  # JSON-looking but e.g. {"ok": True}
+    elif kind == 'python':
+        value = _python_loads(data)
+    else:
+        raise ValueError(f'{kind} response is not a document')
+    if isinstance(value, str) and sniff(value) in ('json', 'python') and value.lstrip()[:1] in ('{', '['):
+        value = decode_response(value)  # a document sent as a JSON string
+    return unwrap_dynamodb(value)
+
+
+def legacy_decode(text):
+    """What github_async_test / github_sync_test used to do, kept only as the benchmark baseline"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return eval(text, {'__builtins__': {}})  # locally generated benchmark input only
+
+
+def sample_bodies(size):
+    """One get_results document with `size` characters of processed_data, in every shape agents send"""
+    from payload_sweep import make_data
+
+    document = {
+        'status': 'completed',
+        'task_id': 1234567,
+        'steps': 42,
+        'processed_data': make_data(size, 'text'),
+        'completion_time': '2024-01-01T00:00:00',
+    }
+    dynamodb = {key: ({'N': str(value)} if isinstance(value, int) else {'S': value})
+                for key, value in document.items()}
+    with_decimals = {key: (Decimal(value) if isinstance(value, int) else value) for key, value in document.items()}
+    return document, {
+        'json': json.dumps(document).encode('utf-8'),
+        'python': repr(document).encode('utf-8'),
+        'decimal': repr(with_decimals).encode('utf-8'),
+        'dynamodb': json.dumps(dynamodb).encode('utf-8'),
+    }
+
+
+def test_response_decoding():
+    """Time decode_response against the json.loads + eval path on large processed_data results"""
+    from payload_sweep import best_of, format_size, parse_size
+
+    sizes = [parse_size(s) for s in os.getenv('RESULT_SIZES', '1KB 64KB 1MB 8MB').split()]
+    iterations = int(os.getenv('ITERATIONS', '20'))
+
+    print(f'🚀 RESPONSE DECODING BENCHMARK: {", ".join(format_size(s) for s in sizes)}, best of {iterations}')
+    print(f'⚙️  JSON decoder: {"orjson" if orjson is not None else "json (pip install orjson for faster decoding)"}')
+    print('')
+    print(f'{"size":>7} {"shape":<9} {"legacy":>10} {"decode":>10} {"speedup":>8} {"MB/s":>8}  check')
+
+    for size in sizes:
+        document, bodies = sample_bodies(size)
+        for shape, body in bodies.items():
+            try:
+                legacy_seconds, legacy = best_of(lambda: legacy_decode(body.decode('utf-8')), iterations)
+                legacy_ms = f'{legacy_seconds * 1000:.3f}ms'
+                if legacy != document:
+                    legacy_ms += '*'  # parsed, but still typed / wrapped
+            except Exception as e:
+                legacy_seconds, legacy_ms = None, type(e).__name__[:10]
+            seconds, decoded = best_of(lambda: decode_response(body), iterations)
+            speedup = f'{legacy_seconds / seconds:.1f}x' if legacy_seconds else 'n/a'
+            check = '✅' if decoded == document else '❌'
+            print(f'{format_size(size):>7} {shape:<9} {legacy_ms:>10} {seconds * 1000:>8.3f}ms {speedup:>8} '
+                  f'{len(body) / seconds / (1024 * 1024):>8.1f}  {check}')
+
+    print('')
+    print('💡 * = legacy parsed the body but left DynamoDB types for the caller to unwrap.')
+    print('💡 Each decode reads the bytes once: no str copy for JSON and no eval for Python literals.')
+
+
+if __name__ == "__main__":
+    test_response_decoding()
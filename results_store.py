@@ -0,0 +1,259 @@
+"""
+Persistent run-results store - every invocation and probe result in one SQLite file
+
+Set RESULTS_DB to a file path and the load/latency scripts append one row per
+invocation (and idle_timeout_probe one row per probe connection) with the
+agent, scenario, runner, start time, outcome and latency. Rows are handed to
+a background writer thread through a queue and inserted in batches, so the
+measurement loop only pays for a queue put. The database runs in WAL mode so
+trend queries can read while a run is still writing.
+
+Percentile trends are nearest-rank lookups on a covering (outcome, agent,
+day, latency, scenario) index, so a per-agent, per-day p50/p99 over hundreds of
+thousands of rows comes back in well under a second.
+
+  python3 results_store.py trend [agent] [days]    (per-day percentiles, default all agents, 30 days)
+  python3 results_store.py runs [days]             (rows per agent/scenario/runner)
+  python3 results_store.py bench [rows]            (load a scratch database and time the trend query)
+  RESULTS_DB=results.db  RESULTS_BATCH=500  RUN_LABEL / RUNNER_NAME (runner column, default 'local')
+"""
+import atexit
+import math
+import os
+import queue
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,            -- epoch seconds the invocation or probe started
+    day TEXT NOT NULL,           -- UTC date of ts, what trends group by
+    agent TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    runner TEXT NOT NULL,
+    kind TEXT NOT NULL,          -- 'invoke' or 'probe'
+    outcome TEXT NOT NULL,       -- 'ok' or the exception class / drop cause
+    latency REAL,                -- seconds; NULL when nothing was measured
+    requested REAL               -- seconds the agent was asked to work for
+);
+CREATE INDEX IF NOT EXISTS results_ts ON results (ts);
+CREATE INDEX IF NOT EXISTS results_agent ON results (agent, ts);
+CREATE INDEX IF NOT EXISTS results_scenario ON results (scenario, ts);
+CREATE INDEX IF NOT EXISTS results_runner ON results (runner, ts);
+CREATE INDEX IF NOT EXISTS results_trend ON results (outcome, agent, day, latency, scenario);
+"""
+
+INSERT = ('INSERT INTO results (ts, day, agent, scenario, runner, kind, outcome, latency, requested) '
+          'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)')
+
+_STOP = object()
+
+
+def connect(path):
+    db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')  # WAL keeps the file consistent; only the last batch is at risk
+    db.executescript(SCHEMA)
+    return db
+
+
+def default_runner():
+    return os.getenv('RUN_LABEL', os.getenv('RUNNER_NAME', 'local'))
+
+
+class ResultsStore:
+    """Append-only results table fed by a batching writer thread"""
+
+    def __init__(self, path, batch_size=500, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.error = None
+        self._queue = queue.SimpleQueue()
+        connect(path).close()  # create the schema before the first row is queued
+        self._writer = threading.Thread(target=self._write_loop, name='results-store', daemon=True)
+        self._writer.start()
+
+    def record(self, agent, scenario, outcome, latency=None, started_at=None, runner=None, kind='invoke',
+               requested=None):
+        """Queue one result; never blocks on the database"""
+        ts = started_at if started_at is not None else time.time() - (latency or 0.0)
+        self._queue.put((ts, time.strftime('%Y-%m-%d', time.gmtime(ts)), agent, scenario,
+                         runner or default_runner(), kind, outcome, latency, requested))
+
+    def sink(self, agent, scenario, kind='invoke', requested=None):
+        """Callback for RunStats(on_result=...): (seconds, error class name or None)"""
+        runner = default_runner()
+
+        def on_result(seconds, error):
+            self.record(agent, scenario, error or 'ok', seconds, runner=runner, kind=kind, requested=requested)
+        return on_result
+
+    def _write_loop(self):
+        db = connect(self.path)
+        batch = []
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                try:
+                    with db:
+                        db.executemany(INSERT, batch)
+                    self.written += len(batch)
+                except sqlite3.Error as e:
+                    self.error = f'{type(e).__name__}: {e}'  # reported by close(); measurements go on
+                batch = []
+        db.close()
+
+    def close(self):
+        """Write everything queued so far and stop the writer"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        if self.error:
+            print(f'⚠️  Results store {self.path}: {self.error}')
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_store():
+    """The process-wide store at RESULTS_DB, or None when results are not being kept"""
+    global _shared
+    path = os.getenv('RESULTS_DB')
+    if not path:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResultsStore(path, batch_size=int(os.getenv('RESULTS_BATCH', '500')))
+            atexit.register(_shared.close)
+        return _shared
+
+
+def results_sink(agent, scenario, kind='invoke', requested=None):
+    """RunStats on_result callback writing to RESULTS_DB, or None when it is not set"""
+    store = shared_store()
+    return store.sink(agent, scenario, kind, requested) if store else None
+
+
+def percentile_trend(db, agent=None, scenario=None, days=30, percentiles=(50, 90, 99), now=None):
+    """Rows of (agent, day, successes, errors, p..., ...) for the last `days` UTC days
+
+    Each percentile is one nearest-rank lookup (ORDER BY latency LIMIT 1
+    OFFSET rank - 1) that walks the covering trend index inside SQLite, so
+    no latency values are pulled into Python.
+    """
+    since = time.strftime('%Y-%m-%d', time.gmtime((now or time.time()) - days * 86400))
+    filters = ['day >= ?']
+    params = [since]
+    if agent:
+        filters.append('agent = ?')
+        params.append(agent)
+    if scenario:
+        filters.append('scenario = ?')
+        params.append(scenario)
+    where = ' AND '.join(filters)
+    # Both counts read only the covering trend index; left alone the planner scans the table for outcome != 'ok'
+    ok = db.execute(f"SELECT agent, day, COUNT(*) FROM results INDEXED BY results_trend "
+                    f"WHERE outcome = 'ok' AND latency IS NOT NULL AND {where} GROUP BY agent, day", params).fetchall()
+    failed = db.execute(f"SELECT agent, day, COUNT(*) FROM results INDEXED BY results_trend "
+                        f"WHERE outcome != 'ok' AND {where} GROUP BY agent, day", params).fetchall()
+    counts = {(a, d): [n, 0] for a, d, n in ok}
+    for a, d, n in failed:
+        counts.setdefault((a, d), [0, 0])[1] = n
+    pick = (f"SELECT latency FROM results INDEXED BY results_trend WHERE outcome = 'ok' AND agent = ? AND day = ? AND latency IS NOT NULL"
+            f"{' AND scenario = ?' if scenario else ''} ORDER BY latency LIMIT 1 OFFSET ?")
+    rows = []
+    for (group_agent, day), (count, errors) in sorted(counts.items()):
+        values = []
+        for pct in percentiles:
+            if not count:
+                values.append(None)
+                continue
+            rank = max(1, math.ceil(count * pct / 100.0))
+            group = (group_agent, day, scenario) if scenario else (group_agent, day)
+            values.append(db.execute(pick, (*group, rank - 1)).fetchone()[0])
+        rows.append((group_agent, day, count, errors, *values))
+    return rows
+
+
+def print_trend(rows, percentiles=(50, 90, 99)):
+    print(f'{"agent":<10} {"day":<10} {"ok":>8} {"errors":>7} ' + ' '.join(f'{f"p{p:g}":>9}' for p in percentiles))
+    for agent, day, count, errors, *values in rows:
+        cells = ' '.join(f'{v:>8.3f}s' if v is not None else f'{"-":>9}' for v in values)
+        print(f'{agent:<10} {day:<10} {count:>8} {errors:>7} {cells}')
+
+
+def print_runs(db, days=30):
+    since = time.time() - days * 86400
+    print(f'{"agent":<10} {"scenario":<32} {"runner":<20} {"rows":>8} {"errors":>7}  last')
+    for agent, scenario, runner, rows, errors, last in db.execute(
+            "SELECT agent, scenario, runner, COUNT(*), SUM(outcome != 'ok'), MAX(ts) FROM results "
+            "WHERE ts >= ? GROUP BY agent, scenario, runner ORDER BY MAX(ts) DESC", (since,)):
+        print(f'{agent:<10} {scenario:<32} {runner:<20} {rows:>8} {errors:>7}  '
+              f'{time.strftime("%Y-%m-%d %H:%M", time.localtime(last))}')
+
+
+def bench(rows):
+    """Fill a scratch database through ResultsStore and time the trend query on it"""
+    path = os.path.join(tempfile.mkdtemp(prefix='results-bench-'), 'results.db')
+    rng = random.Random(0)
+    agents = ('sleep', 'sync', 'async', '4m40s', 'debug')
+    now = time.time()
+    # 30 days of results, appended in time order the way real runs produce them
+    timestamps = sorted(now - rng.random() * 30 * 86400 for _ in range(rows))
+    store = ResultsStore(path, batch_size=5000)
+    started = time.perf_counter()
+    for i, ts in enumerate(timestamps):
+        latency = rng.lognormvariate(0, 0.5)
+        outcome = 'ok' if rng.random() > 0.01 else 'ReadTimeoutError'
+        store.record(rng.choice(agents), 'bench', outcome, latency, started_at=ts, runner=f'runner-{i % 4}')
+    queued = time.perf_counter() - started
+    store.close()
+    written = time.perf_counter() - started
+    print(f'💾 {store.written} rows: {queued / rows * 1e6:.2f}us per record() call, '
+          f'{written:.2f}s until all were written')
+
+    db = connect(path)
+    started = time.perf_counter()
+    result = percentile_trend(db, days=30, now=now)
+    print(f'📈 Trend for 5 agents x 30 days: {time.perf_counter() - started:.3f}s ({len(result)} rows)')
+    started = time.perf_counter()
+    percentile_trend(db, agent='sleep', days=7, now=now)
+    print(f'📈 Trend for one agent x 7 days: {time.perf_counter() - started:.3f}s')
+    db.close()
+    print(f'🗑️  Scratch database: {path}')
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'trend'
+    if command == 'bench':
+        bench(int(sys.argv[2]) if len(sys.argv) > 2 else 500000)
+        sys.exit(0)
+    if command not in ('trend', 'runs'):
+        print("Usage: python3 results_store.py trend [agent] [days] | runs [days] | bench [rows]")
+        sys.exit(1)
+    database = connect(os.getenv('RESULTS_DB', 'results.db'))
+    if command == 'runs':
+        print_runs(database, int(sys.argv[2]) if len(sys.argv) > 2 else 30)
+    else:
+        agent_filter = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != 'all' else None
+        print_trend(percentile_trend(database, agent=agent_filter, days=int(sys.argv[3]) if len(sys.argv) > 3 else 30))
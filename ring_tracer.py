@@ -0,0 +1,214 @@
+"""
+Low-overhead ring-buffer tracer - replaces global DEBUG logging on the hot path
+
+Events are packed into preallocated fixed-size records in one bytearray and
+only formatted when the buffer is dumped (on failure or at exit). Nothing is
+formatted or written while a request is in flight.
+
+  TRACE_MODE=ring              use the tracer instead of DEBUG logging
+  TRACE_CATEGORIES=all         or a comma list of connection,request,retry,response,app
+  TRACE_CAPACITY=65536         number of records kept (oldest are overwritten)
+  TRACE_DUMP=failure           or 'always' to dump at every exit
+  TRACE_FILE=                  dump to this file instead of stdout
+"""
+import atexit
+import itertools
+import os
+import struct
+import sys
+import threading
+import time
+
+from agentcore_common import install_connection_mixin
+
+CONNECTION = 1
+REQUEST = 2
+RETRY = 4
+RESPONSE = 8
+APP = 16
+ALL = CONNECTION | REQUEST | RETRY | RESPONSE | APP
+
+CATEGORY_NAMES = {
+    'connection': CONNECTION,
+    'request': REQUEST,
+    'retry': RETRY,
+    'response': RESPONSE,
+    'app': APP,
+}
+
+# perf_counter_ns, category, event id, thread id (low 32 bits), two integer arguments
+RECORD = struct.Struct('<qHHIqq')
+
+_pack_into = RECORD.pack_into
+_now_ns = time.perf_counter_ns
+_thread_id = threading.get_ident
+
+
+def parse_categories(value):
+    """'all' or a comma list of category names -> bitmask"""
+    if not value or value == 'all':
+        return ALL
+    mask = 0
+    for name in value.split(','):
+        mask |= CATEGORY_NAMES[name.strip()]
+    return mask
+
+
+class RingTracer:
+    """Fixed-size binary event ring; emit() is a mask check plus one struct.pack_into"""
+
+    def __init__(self, capacity=65536, categories=ALL):
+        self.capacity = capacity
+        self.categories = categories
+        self._buffer = bytearray(capacity * RECORD.size)
+        self._counter = itertools.count()  # next() is atomic under the GIL
+        self._names = []
+        self._ids = {}
+        self._failed = False
+
+    def event_id(self, name):
+        """Intern an event name once, outside the hot path"""
+        if name not in self._ids:
+            self._ids[name] = len(self._names)
+            self._names.append(name)
+        return self._ids[name]
+
+    def emit(self, category, event, a=0, b=0):
+        if not category & self.categories:
+            return
+        index = next(self._counter)
+        _pack_into(self._buffer, (index % self.capacity) * RECORD.size,
+                   _now_ns(), category, event, _thread_id() & 0xFFFFFFFF, a, b)
+
+    def mark_failure(self):
+        self._failed = True
+
+    def records(self):
+        """Recorded events, oldest first"""
+        # Peek at the counter without losing a slot
+        count = next(self._counter)
+        self._counter = itertools.count(count)
+        first = max(0, count - self.capacity)
+        for index in range(first, count):
+            yield RECORD.unpack_from(self._buffer, (index % self.capacity) * RECORD.size)
+
+    def dump(self, out=None):
+        out = out or sys.stdout
+        category_names = {bit: name for name, bit in CATEGORY_NAMES.items()}
+        start = None
+        for t_ns, category, event, thread, a, b in self.records():
+            start = t_ns if start is None else start
+            out.write(f'{(t_ns - start) / 1e6:12.3f}ms {category_names.get(category, category):<10} '
+                      f'{self._names[event]:<24} thread={thread:08x} a={a} b={b}\n')
+        out.flush()
+
+    def dump_at_exit(self, always=False, path=None):
+        """Dump the ring when the process exits, by default only if a failure was marked"""
+        previous_hook = sys.excepthook
+
+        def excepthook(*args):
+            self.mark_failure()
+            previous_hook(*args)
+
+        def dump():
+            if not (always or self._failed):
+                return
+            if path:
+                with open(path, 'w') as f:
+                    self.dump(f)
+                print(f'🧾 Trace written to {path}')
+            else:
+                print('🧾 TRACE DUMP')
+                self.dump()
+
+        sys.excepthook = excepthook
+        atexit.register(dump)
+
+    def install(self, client):
+        """Trace botocore call events and connection lifecycle for one client"""
+        tracer = self
+        call_start = self.event_id('call.start')
+        send = self.event_id('request.send')
+        retry = self.event_id('retry.check')
+        call_end = self.event_id('call.end')
+        connect_start = self.event_id('connection.connect')
+        connect_end = self.event_id('connection.connected')
+        request_new = self.event_id('connection.request.new')
+        request_reused = self.event_id('connection.request.reused')
+        response_headers = self.event_id('connection.response')
+
+        def before_call(**kwargs):
+            tracer.emit(REQUEST, call_start)
+
+        def before_send(request, **kwargs):
+            body = request.body
+            tracer.emit(REQUEST, send, len(body) if isinstance(body, (bytes, str)) else -1)
+
+        def needs_retry(attempts, response=None, caught_exception=None, **kwargs):
+            status = response[0].status_code if response else 0
+            tracer.emit(RETRY, retry, attempts, status)
+
+        def after_call(http_response, **kwargs):
+            tracer.emit(RESPONSE, call_end, http_response.status_code)
+
+        def after_call_error(exception, **kwargs):
+            tracer.emit(RESPONSE, tracer.event_id(f'call.error.{type(exception).__name__}'))
+
+        class TracedConnection:
+            _trace_fresh = False
+
+            def connect(self):
+                tracer.emit(CONNECTION, connect_start, self.port)
+                super().connect()
+                self._trace_fresh = True
+                tracer.emit(CONNECTION, connect_end, self.port)
+
+            def request(self, *args, **kwargs):
+                result = super().request(*args, **kwargs)
+                tracer.emit(CONNECTION, request_new if self._trace_fresh else request_reused)
+                self._trace_fresh = False
+                return result
+
+            def getresponse(self, *args, **kwargs):
+                response = super().getresponse(*args, **kwargs)
+                tracer.emit(CONNECTION, response_headers, response.status)
+                return response
+
+        events = client.meta.events
+        events.register('before-call', before_call)
+        events.register('before-send', before_send)
+        events.register('needs-retry', needs_retry)
+        events.register('after-call', after_call)
+        events.register('after-call-error', after_call_error)
+        install_connection_mixin(client, TracedConnection)
+        return self
+
+
+def tracer_from_env():
+    """Build a tracer from TRACE_* environment variables and arrange its exit dump"""
+    tracer = RingTracer(
+        capacity=int(os.getenv('TRACE_CAPACITY', '65536')),
+        categories=parse_categories(os.getenv('TRACE_CATEGORIES', 'all'))
+    )
+    tracer.dump_at_exit(always=os.getenv('TRACE_DUMP', 'failure') == 'always', path=os.getenv('TRACE_FILE'))
+    return tracer
+
+
+def measure_overhead(count=200000):
+    """Nanoseconds per emit() for an enabled and a filtered-out category"""
+    tracer = RingTracer(capacity=4096, categories=REQUEST)
+    event = tracer.event_id('overhead')
+    results = {}
+    for label, category in (('enabled', REQUEST), ('filtered', RETRY)):
+        start = time.perf_counter_ns()
+        for i in range(count):
+            tracer.emit(category, event, i)
+        results[label] = (time.perf_counter_ns() - start) / count
+    return results
+
+
+if __name__ == "__main__":
+    overhead = measure_overhead()
+    print('🔬 RING TRACER OVERHEAD')
+    print(f'⏱️  Enabled category: {overhead["enabled"]:.0f} ns/event')
+    print(f'⏱️  Filtered category: {overhead["filtered"]:.0f} ns/event')
@@ -0,0 +1,316 @@
+"""
+Declarative scenario runner - many scenarios at once under global concurrency and rate budgets
+
+Scenarios live in SCENARIO_FILE (scenarios.json) instead of in their own
+scripts. Each one names an agent and may override:
+
+  arn               template, e.g. arn:aws:bedrock-agentcore:{region}:{account_id}:runtime/{runtime_id}
+  runtime_id        defaults to the agent's entry in AGENT_RUNTIMES
+  payload           template; defaults to the payload the agent's own script sends
+  duration_seconds  prompt  connect_timeout  read_timeout  concurrency  repeat
+
+String values in templates are filled with {region} {account_id} {agent}
+{runtime_id} {duration_seconds} {prompt} {index}; a value that is exactly
+one placeholder keeps the variable's type, so "{duration_seconds}" stays an
+integer. Top-level "defaults" apply to every scenario.
+
+Every scenario runs at the same time in one process. Invocations are started
+longest-expected first, never more than a scenario's own concurrency at once,
+and never more than MAX_IN_FLIGHT or RATE per second across all of them, so a
+full pass takes about as long as its longest scenario.
+
+  python3 scenario_runner.py          (run)
+  python3 scenario_runner.py list     (show the scenarios and what they expand to)
+  SCENARIO_FILE=scenarios.json  SCENARIOS=name,name (default all)  MAX_IN_FLIGHT=50  RATE=0 (req/s, 0 = unlimited)
+  SCENARIO_REPORT=scenario_report.json
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agentcore_common import AGENT_RUNTIMES, REGION, build_payload, expected_seconds, make_client, new_session_id
+from latency_histogram import RunStats
+from results_store import results_sink
+from streaming_reader import read_streaming_body
+
+SCENARIO_FIELDS = ('name', 'agent', 'arn', 'runtime_id', 'payload', 'duration_seconds', 'prompt', 'connect_timeout',
+                   'read_timeout', 'concurrency', 'repeat')
+DEFAULT_ARN = 'arn:aws:bedrock-agentcore:{region}:{account_id}:runtime/{runtime_id}'
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+def fill(template, variables):
+    """Substitute {placeholders} in every string of a JSON-like template"""
+    if isinstance(template, dict):
+        return {key: fill(value, variables) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill(value, variables) for value in template]
+    if not isinstance(template, str):
+        return template
+    whole = PLACEHOLDER.fullmatch(template)
+    if whole:
+        return variables[whole.group(1)]
+    return PLACEHOLDER.sub(lambda m: str(variables[m.group(1)]), template)
+
+
+def placeholders(template):
+    """Every {name} used anywhere in a JSON-like template"""
+    if isinstance(template, dict):
+        return set().union(*(placeholders(value) for value in template.values()))
+    if isinstance(template, list):
+        return set().union(*(placeholders(value) for value in template))
+    return set(PLACEHOLDER.findall(template)) if isinstance(template, str) else set()
+
+
+class Scenario:
+    """One entry of the scenario file with defaults applied"""
+
+    def __init__(self, spec):
+        unknown = set(spec) - set(SCENARIO_FIELDS)
+        if unknown:
+            raise ValueError(f'scenario {spec.get("name", "?")}: unknown fields {", ".join(sorted(unknown))}')
+        if 'name' not in spec or 'agent' not in spec:
+            raise ValueError(f'scenario {spec.get("name", "?")}: "name" and "agent" are required')
+        self.name = spec['name']
+        self.agent = spec['agent']
+        self.runtime_id = spec.get('runtime_id') or AGENT_RUNTIMES.get(self.agent)
+        if self.runtime_id is None:
+            raise ValueError(f'scenario {self.name}: unknown agent {self.agent} and no runtime_id')
+        self.arn_template = spec.get('arn', DEFAULT_ARN)
+        self.payload_template = spec.get('payload')
+        self.duration_seconds = int(spec.get('duration_seconds', 0))
+        self.prompt = spec.get('prompt', 'tell me a joke')
+        self.connect_timeout = int(spec.get('connect_timeout', 60))
+        self.read_timeout = int(spec.get('read_timeout', 900))
+        self.concurrency = max(1, int(spec.get('concurrency', 1)))
+        self.repeat = max(1, int(spec.get('repeat', 1)))
+        requested = expected_seconds(self.agent, self.duration_seconds)
+        self.stats = RunStats(label=self.name, requested_seconds=requested,
+                              on_result=results_sink(self.agent, self.name, requested=requested))
+        self.in_flight = 0
+        self.started_at = None
+        self.finished_at = None
+        unknown = placeholders([self.arn_template, self.payload_template]) - set(self.variables())
+        if unknown:
+            raise ValueError(f'scenario {self.name}: unknown placeholders '
+                             f'{", ".join("{" + name + "}" for name in sorted(unknown))}')
+
+    def variables(self, index=0):
+        return {
+            'region': REGION,
+            'account_id': os.getenv('AWS_ACCOUNT_ID', ''),
+            'agent': self.agent,
+            'runtime_id': self.runtime_id,
+            'duration_seconds': self.duration_seconds,
+            'prompt': self.prompt,
+            'index': index,
+        }
+
+    def arn(self):
+        if '{account_id}' in self.arn_template and not os.getenv('AWS_ACCOUNT_ID'):
+            raise ValueError('AWS_ACCOUNT_ID environment variable required')
+        return fill(self.arn_template, self.variables())
+
+    def payload(self, index):
+        if self.payload_template is None:
+            return build_payload(self.agent, self.duration_seconds, self.prompt)
+        return fill(self.payload_template, self.variables(index))
+
+    def expected(self):
+        """Seconds one invocation should take; longer scenarios are started first"""
+        return expected_seconds(self.agent, self.duration_seconds)
+
+
+def load_scenarios(path, names=None):
+    with open(path) as f:
+        spec = json.load(f)
+    defaults = spec.get('defaults', {})
+    scenarios = [Scenario({**defaults, **entry}) for entry in spec.get('scenarios', [])]
+    seen = set()
+    for scenario in scenarios:
+        if scenario.name in seen:
+            raise ValueError(f'scenario {scenario.name} is defined twice')
+        seen.add(scenario.name)
+    if names:
+        missing = set(names) - seen
+        if missing:
+            raise ValueError(f'no such scenarios: {", ".join(sorted(missing))}')
+        scenarios = [scenario for scenario in scenarios if scenario.name in names]
+    return scenarios
+
+
+class RateBudget:
+    """Spaces request starts at least 1/rate seconds apart across every scenario"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+
+class ScenarioScheduler:
+    """Starts every scenario's invocations as soon as the scenario, global and rate budgets allow"""
+
+    def __init__(self, scenarios, max_in_flight=50, rate=0.0):
+        self.scenarios = scenarios
+        self.max_in_flight = max_in_flight
+        self.rate = RateBudget(rate)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._clients = {}
+        # Longest-expected first, then round-robin so short scenarios are not starved behind one big one
+        ordered = sorted(scenarios, key=lambda s: -s.expected())
+        self._pending = [(scenario, index) for index in range(max(s.repeat for s in scenarios) if scenarios else 0)
+                         for scenario in ordered if index < scenario.repeat]
+
+    def _client(self, scenario):
+        """botocore timeouts are per client: one client per (connect, read) timeout pair"""
+        key = (scenario.connect_timeout, scenario.read_timeout)
+        if key not in self._clients:
+            self._clients[key] = make_client(read_timeout=scenario.read_timeout,
+                                             connect_timeout=scenario.connect_timeout,
+                                             max_pool_connections=self.max_in_flight)
+        return self._clients[key]
+
+    def _next_job(self):
+        """First pending invocation whose scenario has room; None if every one is at its limit"""
+        for position, (scenario, index) in enumerate(self._pending):
+            if scenario.in_flight < scenario.concurrency:
+                return self._pending.pop(position)
+        return None
+
+    def _run(self, client, arn, scenario, index):
+        start_time = time.time()
+        error = 'Interrupted'  # anything not caught below still releases the slots in finally
+        try:
+            payload = json.dumps(scenario.payload(index))
+            response = client.invoke_agent_runtime(agentRuntimeArn=arn,
+                                                   runtimeSessionId=new_session_id(f'scenario-{scenario.name}-{index}'),
+                                                   payload=payload)
+            read_streaming_body(response['response'], start_time)
+            error = None
+        except Exception as e:
+            error = type(e).__name__
+        finally:
+            latency = time.time() - start_time
+            with self._cond:
+                if error:
+                    scenario.stats.record_error(error, latency)
+                else:
+                    scenario.stats.record_success(latency)
+                scenario.in_flight -= 1
+                self.in_flight -= 1
+                if scenario.stats.attempts() == scenario.repeat:
+                    scenario.finished_at = time.time()
+                    icon = '✅' if not scenario.stats.errors else '⚠️ '
+                    print(f'   {icon} {scenario.name} finished: {scenario.stats.histogram.count}/{scenario.repeat} '
+                          f'succeeded in {scenario.finished_at - scenario.started_at:.1f}s')
+                self._cond.notify_all()
+
+    def run(self):
+        arns = {scenario.name: scenario.arn() for scenario in self.scenarios}
+        clients = {scenario.name: self._client(scenario) for scenario in self.scenarios}
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            while True:
+                with self._cond:
+                    job = None
+                    while self._pending:
+                        job = self._next_job() if self.in_flight < self.max_in_flight else None
+                        if job:
+                            break
+                        self._cond.wait()
+                    if job is None:
+                        break
+                    scenario, index = job
+                    scenario.in_flight += 1
+                    self.in_flight += 1
+                    if scenario.started_at is None:
+                        scenario.started_at = time.time()
+                self.rate.wait()
+                pool.submit(self._run, clients[scenario.name], arns[scenario.name], scenario, index)
+
+
+def report(scenarios, wall_time):
+    """One table for the whole pass, then each scenario's full latency report"""
+    print(f'{"scenario":<28} {"agent":<6} {"ok":>9} {"p50":>9} {"p99":>9} {"max":>9} {"wall":>8}  errors')
+    serial = 0.0
+    for s in scenarios:
+        h = s.stats.histogram
+        wall = (s.finished_at or time.time()) - s.started_at if s.started_at else 0.0
+        serial += h.mean() * h.count if h.count else 0.0
+        errors = ', '.join(f'{name}={n}' for name, n in s.stats.errors.most_common()) or 'none'
+        print(f'{s.name:<28} {s.agent:<6} {f"{h.count}/{s.repeat}":>9} '
+              f'{h.percentile(50) if h.count else 0:>8.2f}s {h.percentile(99) if h.count else 0:>8.2f}s '
+              f'{h.max() if h.count else 0:>8.2f}s {wall:>7.1f}s  {errors}')
+    print('')
+    print(f'⏱️  Pass took {wall_time:.1f}s; the same invocations one after another would take ~{serial:.1f}s')
+    for s in scenarios:
+        print('')
+        s.stats.report()
+
+
+def test_scenarios():
+    """Run every selected scenario at once and print one combined report"""
+
+    path = os.getenv('SCENARIO_FILE', 'scenarios.json')
+    names = [n.strip() for n in os.getenv('SCENARIOS', '').split(',') if n.strip()]
+    max_in_flight = int(os.getenv('MAX_IN_FLIGHT', '50'))
+    rate = float(os.getenv('RATE', '0'))
+    report_out = os.getenv('SCENARIO_REPORT')
+
+    try:
+        scenarios = load_scenarios(path, names)
+    except (OSError, ValueError) as e:
+        print(f'❌ FAILED to load {path}: {e}')
+        sys.exit(1)
+
+    total = sum(s.repeat for s in scenarios)
+    print(f'🚀 SCENARIO RUN: {len(scenarios)} scenarios, {total} invocations from {path}')
+    print(f'🔀 At most {max_in_flight} in flight{f", {rate:g} req/s" if rate else ""} across all scenarios')
+    print('')
+
+    scheduler = ScenarioScheduler(scenarios, max_in_flight=max_in_flight, rate=rate)
+    start_time = time.time()
+    print(f"📡 Starting at {time.strftime('%H:%M:%S')}")
+    try:
+        scheduler.run()
+    except ValueError as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        sys.exit(1)
+    wall_time = time.time() - start_time
+
+    print('')
+    print(f'🏁 ALL SCENARIOS COMPLETE after {wall_time:.1f} seconds')
+    print('')
+    report(scenarios, wall_time)
+
+    if report_out:
+        with open(report_out, 'w') as f:
+            json.dump({'wall_seconds': wall_time, 'scenarios': {s.name: s.stats.to_dict() for s in scenarios}}, f)
+        print(f'💾 Combined report written to {report_out}')
+
+
+def list_scenarios():
+    path = os.getenv('SCENARIO_FILE', 'scenarios.json')
+    for s in load_scenarios(path):
+        print(f'📋 {s.name}: {s.agent} x {s.repeat} (at most {s.concurrency} at once), '
+              f'connect/read timeout {s.connect_timeout}s/{s.read_timeout}s, expected {s.expected():g}s')
+        print(f'   payload: {json.dumps(s.payload(0))[:120]}')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'list':
+        list_scenarios()
+    else:
+        test_scenarios()
@@ -0,0 +1,226 @@
+"""
+Warm runtime session pool - separates session cold start from steady-state latency
+
+Pre-warms POOL_SIZE runtimeSessionIds per agent ARN with a cheap request,
+leases them to invocations one at a time and recycles them. Every result is
+tagged cold (first request on a session, or the session sat idle long enough
+to have expired) or warm, and the two populations are reported separately.
+
+The most recently used idle session is leased first, so a lightly loaded
+pool keeps a few sessions hot instead of letting all of them go stale. A
+session is replaced with a fresh one after a failed invocation, after
+MAX_USES requests, or once it has been idle longer than SESSION_IDLE_SECONDS.
+
+  AGENT=sleep  POOL_SIZE=4  REQUESTS=40  DURATION_SECONDS=0  POOL=1 (0 = new session per call)
+  MAX_USES=0 (unlimited)  SESSION_IDLE_SECONDS=840  (local server: COLD_START_SECONDS=3)
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from agentcore_common import agent_arn, build_payload, expected_seconds, make_client, new_session_id
+from latency_histogram import RunStats
+from streaming_reader import read_streaming_body
+
+# Cheapest request that still starts a session; None means the agent has no cheap call
+# (the deployed sync agent only takes prompt/steps, so any call to it is real work)
+WARM_PAYLOADS = {
+    'sleep': build_payload('sleep', 0),
+    'sync': None,
+    'async': {'action': 'get_results', 'task_id': -1},
+    '4m40s': None,
+    'debug': dict(build_payload('debug', 0), large_data=''),  # without the 50KB body
+}
+
+
+class PooledSession:
+    __slots__ = ('session_id', 'uses', 'created_at', 'last_used')
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.uses = 0
+        self.created_at = time.time()
+        self.last_used = None
+
+    def is_warm(self, idle_timeout, now):
+        return self.last_used is not None and now - self.last_used <= idle_timeout
+
+
+class Lease:
+    """One invocation's hold on a session"""
+    __slots__ = ('session', 'cold', 'failed')
+
+    def __init__(self, session, cold):
+        self.session = session
+        self.cold = cold
+        self.failed = False
+
+    @property
+    def session_id(self):
+        return self.session.session_id
+
+    def fail(self):
+        """Mark the session suspect; it is replaced instead of returned to the pool"""
+        self.failed = True
+
+
+class SessionPool:
+    """Fixed set of runtime sessions for one agent ARN, leased to one invocation at a time"""
+
+    def __init__(self, client, arn, size, prefix='pool', warm_payload=None, max_uses=0, idle_timeout=840.0):
+        self.client = client
+        self.arn = arn
+        self.size = size
+        self.prefix = prefix
+        self.warm_payload = warm_payload
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.recycled = 0
+        self._created = 0
+        self._idle = [self._new_session() for _ in range(size)]
+        self._cond = threading.Condition()
+
+    def _new_session(self):
+        self._created += 1
+        return PooledSession(new_session_id(f'{self.prefix}-{self._created}'))
+
+    def warm(self, concurrency=None):
+        """Send the warm-up request on every idle session at once; returns (session_id, seconds, error)"""
+        if self.warm_payload is None:
+            return []
+        body = json.dumps(self.warm_payload)
+
+        def warm_one(session):
+            start_time = time.time()
+            try:
+                response = self.client.invoke_agent_runtime(agentRuntimeArn=self.arn,
+                                                            runtimeSessionId=session.session_id, payload=body)
+                read_streaming_body(response['response'], start_time)
+            except Exception as e:
+                return session.session_id, time.time() - start_time, type(e).__name__
+            session.last_used = time.time()
+            session.uses += 1
+            return session.session_id, time.time() - start_time, None
+
+        with self._cond:
+            sessions = list(self._idle)
+        with ThreadPoolExecutor(max_workers=concurrency or len(sessions) or 1) as pool:
+            return list(pool.map(warm_one, sessions))
+
+    @contextmanager
+    def lease(self):
+        """Borrow a session for one invocation; blocks while every session is in use"""
+        with self._cond:
+            while not self._idle:
+                self._cond.wait()
+            session = self._idle.pop()  # most recently returned first
+            if session.last_used is not None and not session.is_warm(self.idle_timeout, time.time()):
+                self.recycled += 1
+                session = self._new_session()  # expired while idle: start clean rather than guess
+        lease = Lease(session, cold=not session.is_warm(self.idle_timeout, time.time()))
+        try:
+            yield lease
+        except BaseException:
+            lease.fail()
+            raise
+        finally:
+            session.uses += 1
+            session.last_used = time.time()
+            with self._cond:
+                if lease.failed or (self.max_uses and session.uses >= self.max_uses):
+                    self.recycled += 1
+                    session = self._new_session()
+                self._idle.append(session)
+                self._cond.notify()
+
+
+def test_session_pool():
+    """Invoke through a warm pool and report cold and warm latency separately"""
+
+    agent = os.getenv('AGENT', 'sleep')
+    pool_size = int(os.getenv('POOL_SIZE', '4'))
+    requests = int(os.getenv('REQUESTS', '40'))
+    duration_seconds = int(os.getenv('DURATION_SECONDS', '0'))
+    use_pool = os.getenv('POOL', '1') == '1'
+    max_uses = int(os.getenv('MAX_USES', '0'))
+    idle_timeout = float(os.getenv('SESSION_IDLE_SECONDS', '840')) * float(os.getenv('TIME_SCALE', '1.0'))
+    read_timeout = int(os.getenv('READ_TIMEOUT', '900'))
+
+    client = make_client(read_timeout=read_timeout, connect_timeout=60, max_pool_connections=pool_size)
+    requested = expected_seconds(agent, duration_seconds)
+    cold = RunStats(label=f'{agent}-cold', requested_seconds=requested)
+    warm = RunStats(label=f'{agent}-warm', requested_seconds=requested)
+    lock = threading.Lock()
+
+    print(f'🚀 SESSION POOL TEST: {agent} agent, {requests} requests, '
+          f'{f"pool of {pool_size}" if use_pool else "new session per call"}')
+    print('')
+
+    try:
+        arn = agent_arn(agent)
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    payload = json.dumps(build_payload(agent, duration_seconds))
+    pool = SessionPool(client, arn, pool_size, prefix=f'pool-{agent}', warm_payload=WARM_PAYLOADS.get(agent),
+                       max_uses=max_uses, idle_timeout=idle_timeout)
+    if use_pool:
+        warmed = pool.warm()
+        if warmed:
+            failed = [entry for entry in warmed if entry[2]]
+            print(f'🔥 Warmed {len(warmed) - len(failed)}/{len(warmed)} sessions, '
+                  f'slowest {max(seconds for _, seconds, _ in warmed):.2f}s')
+        else:
+            print('🧊 No cheap warm-up request for this agent - sessions warm up on first use')
+
+    def invoke(session_id):
+        start_time = time.time()
+        response = client.invoke_agent_runtime(agentRuntimeArn=arn, runtimeSessionId=session_id, payload=payload)
+        read_streaming_body(response['response'], start_time)
+        return time.time() - start_time
+
+    def run(index):
+        if not use_pool:
+            is_cold = True
+            try:
+                latency, error = invoke(new_session_id(f'nopool-{agent}-{index}')), None
+            except Exception as e:
+                latency, error = None, type(e).__name__
+        else:
+            with pool.lease() as lease:
+                is_cold = lease.cold
+                try:
+                    latency, error = invoke(lease.session_id), None
+                except Exception as e:
+                    lease.fail()
+                    latency, error = None, type(e).__name__
+        stats = cold if is_cold else warm
+        with lock:
+            if error:
+                stats.record_error(error)
+            else:
+                stats.record_success(latency)
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        list(executor.map(run, range(requests)))
+
+    print(f'🏁 {requests} requests in {time.time() - start_time:.1f} seconds')
+    for stats in (cold, warm):
+        if stats.attempts():
+            print('')
+            stats.report()
+    if use_pool:
+        print('')
+        print(f'♻️  Sessions recycled: {pool.recycled}')
+    if cold.histogram.count and warm.histogram.count:
+        print(f'🧊 Cold start cost (p50 cold - p50 warm): '
+              f'{cold.histogram.percentile(50) - warm.histogram.percentile(50):+.3f}s')
+
+
+if __name__ == "__main__":
+    test_session_pool()
@@ -0,0 +1,270 @@
+"""
+Multi-process soak runner - shards invocations across processes, aggregates through shared memory
+
+One Python process runs out of CPU (GIL, SigV4 signing, TLS) long before the
+network saturates. This runner starts WORKERS processes, each with its own
+pooled bedrock-agentcore client and CONCURRENCY threads running invocations
+back to back. Every result is packed into a fixed-size record in a
+per-worker shared-memory ring; the parent drains the rings into one
+latency histogram while the soak runs, so nothing is pickled per result.
+
+A worker whose ring is full waits for the parent to drain it and drops
+(and counts) a result only after RING_WAIT_SECONDS.
+
+  AGENT=sleep  WORKERS=<cpu count>  CONCURRENCY=50 (threads per worker)  DURATION_SECONDS=0
+  TEST_SECONDS=300  TOTAL_REQUESTS=0 (0 = until TEST_SECONDS)  REPORT_INTERVAL=10
+  RING_CAPACITY=65536  RING_WAIT_SECONDS=1  READ_TIMEOUT=900  HISTOGRAM_OUT=
+"""
+import itertools
+import json
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+from agentcore_common import agent_arn, build_payload, expected_seconds, make_client, new_session_id
+from latency_histogram import LatencyHistogram, RunStats
+from results_store import results_sink
+from streaming_reader import read_streaming_body
+
+# records written, records read, results dropped because the ring stayed full
+HEADER = struct.Struct('<QQQ')
+# started at (epoch seconds), latency seconds, exception class name (empty on success)
+RECORD = struct.Struct('<dd32s')
+
+
+class ResultRing:
+    """Single-producer, single-consumer ring of RECORDs in a named shared-memory block
+
+    The producer only moves the write counter and the consumer only the read
+    counter, so neither side takes a cross-process lock.
+    """
+
+    def __init__(self, capacity=65536, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER.size + capacity * RECORD.size)
+            HEADER.pack_into(self.shm.buf, 0, 0, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.capacity = capacity
+        self._lock = threading.Lock()  # the producer's threads share one write counter
+
+    def _counters(self):
+        return HEADER.unpack_from(self.shm.buf, 0)
+
+    def write(self, started, latency, error=None, wait=1.0):
+        """Append one result; returns False if it had to be dropped"""
+        name = (error or '').encode('ascii', errors='replace')[:RECORD.size - 16]
+        give_up = None
+        with self._lock:
+            while True:
+                written, read, dropped = self._counters()
+                if written - read < self.capacity:
+                    break
+                give_up = give_up or time.monotonic() + wait
+                if time.monotonic() > give_up:
+                    struct.pack_into('<Q', self.shm.buf, 16, dropped + 1)  # never touch the reader's counter
+                    return False
+                time.sleep(0.001)
+            RECORD.pack_into(self.shm.buf, HEADER.size + (written % self.capacity) * RECORD.size,
+                             started, latency, name)
+            # Publish the record only after it is fully written
+            struct.pack_into('<Q', self.shm.buf, 0, written + 1)
+        return True
+
+    def drain(self):
+        """Yield every record written since the last drain as (started, latency, error or None)"""
+        written, read, _ = self._counters()
+        buf = self.shm.buf
+        for index in range(read, written):
+            started, latency, name = RECORD.unpack_from(buf, HEADER.size + (index % self.capacity) * RECORD.size)
+            name = name.rstrip(b'\0')
+            yield started, latency, name.decode('ascii') if name else None
+        struct.pack_into('<Q', buf, 8, written)
+
+    def dropped(self):
+        return self._counters()[2]
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def worker_main(worker_id, ring_name, capacity, settings, start_barrier, stop):
+    """One soak process: its own client and thread pool, results into its ring"""
+    ring = ResultRing(capacity, name=ring_name)
+    client = make_client(read_timeout=settings['read_timeout'], connect_timeout=60,
+                         max_pool_connections=settings['concurrency'])
+    arn = agent_arn(settings['agent'])
+    payload = json.dumps(build_payload(settings['agent'], settings['duration_seconds']))
+    quota = settings['quotas'][worker_id]
+    indexes = itertools.count() if quota is None else iter(range(quota))  # a share of 0 sends nothing
+    indexes_lock = threading.Lock()
+
+    def next_index():
+        with indexes_lock:
+            return next(indexes, None)
+
+    def loop(thread_id):
+        while not stop.is_set() and time.time() < deadline:
+            index = next_index()
+            if index is None:
+                return
+            start_time = time.time()
+            error = None
+            try:
+                response = client.invoke_agent_runtime(
+                    agentRuntimeArn=arn,
+                    runtimeSessionId=new_session_id(f'soak-w{worker_id}-{index}'),
+                    payload=payload
+                )
+                read_streaming_body(response['response'], start_time)
+            except Exception as e:
+                error = type(e).__name__
+            ring.write(start_time, time.time() - start_time, error, settings['ring_wait'])
+
+    start_barrier.wait()  # everyone starts together, after imports and client setup
+    deadline = time.time() + settings['test_seconds']
+    try:
+        with ThreadPoolExecutor(max_workers=settings['concurrency']) as pool:
+            list(pool.map(loop, range(settings['concurrency'])))
+    finally:
+        ring.close()
+
+
+def split_quota(total, workers):
+    """TOTAL_REQUESTS spread over workers, None for everyone when running on time alone"""
+    if not total:
+        return [None] * workers
+    return [total // workers + (1 if i < total % workers else 0) for i in range(workers)]
+
+
+def test_soak_runner():
+    """Soak AGENT from WORKERS processes and aggregate every result live"""
+
+    agent = os.getenv('AGENT', 'sleep')
+    workers = int(os.getenv('WORKERS', str(os.cpu_count() or 1)))
+    concurrency = int(os.getenv('CONCURRENCY', '50'))
+    duration_seconds = int(os.getenv('DURATION_SECONDS', '0'))
+    test_seconds = float(os.getenv('TEST_SECONDS', '300'))
+    total_requests = int(os.getenv('TOTAL_REQUESTS', '0'))
+    report_interval = float(os.getenv('REPORT_INTERVAL', '10'))
+    capacity = int(os.getenv('RING_CAPACITY', '65536'))
+    read_timeout = int(os.getenv('READ_TIMEOUT', '900'))
+    histogram_out = os.getenv('HISTOGRAM_OUT')
+
+    print(f'🚀 SOAK RUNNER: {agent} agent, {workers} processes x {concurrency} threads')
+    print(f'⏱️  {f"{total_requests} requests, at most " if total_requests else ""}{test_seconds:g}s, '
+          f'{duration_seconds} seconds per invocation')
+    print(f'🧮 Ring: {capacity} x {RECORD.size} byte records per worker')
+    print('')
+
+    try:
+        agent_arn(agent)
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    requested = expected_seconds(agent, duration_seconds)
+    stats = RunStats(label=f'{agent}-soak-{workers}x{concurrency}', requested_seconds=requested,
+                     on_result=results_sink(agent, f'soak-{workers}x{concurrency}', requested=requested))
+    interval = LatencyHistogram()
+    per_worker = [0] * workers
+    settings = {
+        'agent': agent,
+        'concurrency': concurrency,
+        'duration_seconds': duration_seconds,
+        'read_timeout': read_timeout,
+        'quotas': split_quota(total_requests, workers),
+        'ring_wait': float(os.getenv('RING_WAIT_SECONDS', '1')),
+        'test_seconds': test_seconds,
+    }
+
+    # spawn: workers must not inherit the parent's threads or sockets
+    context = multiprocessing.get_context('spawn')
+    rings = [ResultRing(capacity) for _ in range(workers)]
+    start_barrier = context.Barrier(workers + 1)
+    stop = context.Event()
+    processes = []
+
+    def drain():
+        for worker_id, ring in enumerate(rings):
+            for _, latency, error in ring.drain():
+                per_worker[worker_id] += 1
+                if error:
+                    stats.record_error(error, latency)
+                else:
+                    stats.record_success(latency)
+                    interval.record(latency)
+
+    start_time = time.time()
+    try:
+        for worker_id, ring in enumerate(rings):
+            process = context.Process(target=worker_main, name=f'soak-{worker_id}',
+                                      args=(worker_id, ring.name, capacity, settings, start_barrier, stop))
+            process.start()
+            processes.append(process)
+        try:
+            start_barrier.wait(timeout=120)
+        except threading.BrokenBarrierError:
+            stop.set()
+            print('❌ FAILED: not every worker process came up within 120s')
+            for process in processes:
+                process.terminate()
+            return
+        start_time = time.time()
+        print(f"📡 Soak started at {time.strftime('%H:%M:%S')}")
+
+        next_report = time.time() + report_interval
+        last_done = 0
+        while any(process.is_alive() for process in processes):
+            time.sleep(0.05)
+            drain()
+            now = time.time()
+            if now >= next_report:
+                done = stats.attempts()
+                print(f'   📈 {now - start_time:6.0f}s  {done} done  {(done - last_done) / report_interval:.1f} req/s  '
+                      f'p50 {interval.percentile(50):.3f}s  p99 {interval.percentile(99):.3f}s  '
+                      f'{sum(stats.errors.values())} errors')
+                interval = LatencyHistogram()
+                last_done = done
+                next_report += report_interval
+        drain()
+    except KeyboardInterrupt:
+        stop.set()
+        print('🛑 Interrupted - waiting for in-flight requests')
+        for process in processes:
+            process.join()
+        drain()
+    finally:
+        dropped = sum(ring.dropped() for ring in rings)
+        for ring in rings:
+            ring.close()
+            ring.unlink()
+
+    wall_time = time.time() - start_time
+    print('')
+    print(f'🏁 SOAK COMPLETE after {wall_time:.1f} seconds')
+    print(f'⚡ Throughput: {stats.attempts() / wall_time if wall_time else 0:.2f} req/s '
+          f'({stats.histogram.count / wall_time if wall_time else 0:.2f} succeeded)')
+    print(f'🧵 Per worker: {", ".join(str(n) for n in per_worker)}')
+    failed_workers = [p.name for p in processes if p.exitcode]
+    if failed_workers:
+        print(f'❌ Worker processes exited with errors: {", ".join(failed_workers)}')
+    if dropped:
+        print(f'⚠️  {dropped} results dropped because a ring stayed full - raise RING_CAPACITY')
+    print('')
+    stats.report()
+    if histogram_out:
+        stats.save(histogram_out)
+        print(f'💾 Histogram written to {histogram_out}')
+
+
+if __name__ == "__main__":
+    test_soak_runner()
@@ -0,0 +1,209 @@
+"""
+Multiplexed async-task status poller - many sessions/task_ids on one event loop
+
+Each task's first get_results poll is scheduled for when it should finish
+(start time + requested duration_seconds), not on a fixed 30s loop. While a
+task is still processing it backs off exponentially from POLL_BASE up to
+POLL_MAX seconds, with jitter so thousands of tasks started together do not
+poll in lockstep. Finished tasks go to a callback and/or an asyncio.Queue
+the moment their result is picked up.
+
+  python3 status_poller.py    (starts TASK_COUNT async tasks, then waits for all of them)
+  TASK_COUNT=50  DURATION_SECONDS=420  CONCURRENCY=100
+  POLL_BASE=5  POLL_MAX=60  POLL_JITTER=0.5  MAX_WAIT=3600  (seconds, multiplied by TIME_SCALE)
+"""
+import asyncio
+import heapq
+import os
+import random
+import time
+
+from agentcore_common import agent_arn, new_session_id
+from async_invoke_engine import AsyncAgentCoreClient, TrackedTask, start_task
+from latency_histogram import LatencyHistogram
+from response_decoding import decode_response
+
+FINAL_STATUSES = ('completed', 'not_found', 'failed')
+
+
+class PollTarget:
+    """One task being waited on"""
+    __slots__ = ('session_id', 'task_id', 'started_at', 'expected_done', 'deadline', 'polls', 'status',
+                 'result', 'error', 'done_at')
+
+    def __init__(self, session_id, task_id, started_at, expected_seconds, max_wait):
+        self.session_id = session_id
+        self.task_id = task_id
+        self.started_at = started_at
+        self.expected_done = started_at + expected_seconds
+        self.deadline = started_at + max_wait
+        self.polls = 0
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.done_at = None
+
+
+class StatusPoller:
+    """Schedules get_results polls for many tasks and delivers each result as soon as it completes"""
+
+    def __init__(self, client, arn, on_result=None, queue=None, base_delay=5.0, max_delay=60.0, jitter=0.5,
+                 max_wait=3600.0, rng=None):
+        self.client = client
+        self.arn = arn
+        self.on_result = on_result
+        self.queue = queue
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_wait = max_wait
+        self.rng = rng or random.Random()
+        self.polls = 0
+        self._schedule = []  # heap of (due time, sequence, target)
+        self._sequence = 0
+        self._active = set()
+        self._wakeup = asyncio.Event()
+
+    def _jittered(self, delay):
+        return delay * (1.0 - self.jitter * self.rng.random())
+
+    def _push(self, due, target):
+        self._sequence += 1
+        heapq.heappush(self._schedule, (due, self._sequence, target))
+        self._wakeup.set()
+
+    def add(self, session_id, task_id, expected_seconds=0.0, started_at=None):
+        """Track one task; its first poll is due when it is expected to finish"""
+        target = PollTarget(session_id, task_id, started_at or time.time(), expected_seconds, self.max_wait)
+        # Small forward jitter so tasks started in one burst do not all poll in the same instant
+        self._push(target.expected_done + self.jitter * self.rng.random() * min(self.base_delay, 1.0), target)
+        return target
+
+    def _next_delay(self, target):
+        """Exponential backoff counted from the expected completion, capped and jittered"""
+        late_polls = max(0, target.polls - 1)
+        return self._jittered(min(self.max_delay, self.base_delay * (2 ** late_polls)))
+
+    def _deliver(self, target):
+        target.done_at = time.time()
+        if self.on_result:
+            self.on_result(target)
+        if self.queue is not None:
+            self.queue.put_nowait(target)
+
+    async def _poll(self, target):
+        target.polls += 1
+        self.polls += 1
+        try:
+            body = await self.client.invoke(self.arn, target.session_id,
+                                            {'action': 'get_results', 'task_id': int(target.task_id)})
+            target.result = decode_response(body)
+            target.status = target.result.get('status', 'unknown')
+        except Exception as e:
+            target.error = f'{type(e).__name__}: {e}'  # transient: poll again on the backoff schedule
+        now = time.time()
+        if target.status in FINAL_STATUSES:
+            self._deliver(target)
+        elif now >= target.deadline:
+            target.status = 'timed_out'
+            self._deliver(target)
+        else:
+            due = now + self._next_delay(target)
+            if due < target.expected_done:
+                due = target.expected_done  # answered early: come back at the estimate, not sooner
+            self._push(min(due, target.deadline), target)
+
+    async def run(self):
+        """Poll until every added task has reached a final status"""
+        while self._schedule or self._active:
+            self._wakeup.clear()
+            now = time.time()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, target = heapq.heappop(self._schedule)
+                job = asyncio.ensure_future(self._poll(target))
+                self._active.add(job)
+                job.add_done_callback(self._finished)
+            timeout = self._schedule[0][0] - now if self._schedule else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _finished(self, job):
+        self._active.discard(job)
+        self._wakeup.set()
+
+
+async def start_and_wait(count, duration, concurrency, time_scale, poll_settings):
+    client = AsyncAgentCoreClient(max_connections=concurrency)
+    arn = agent_arn('async')
+    tasks = [TrackedTask(new_session_id(f'status-poller-{i}')) for i in range(count)]
+    await asyncio.gather(*(start_task(client, arn, task, 'tell me a joke', duration) for task in tasks))
+    started = [task for task in tasks if task.task_id is not None]
+    print(f'✅ {len(started)}/{count} tasks started')
+
+    queue = asyncio.Queue()
+    poller = StatusPoller(client, arn, queue=queue, **poll_settings)
+    for task in started:
+        poller.add(task.session_id, task.task_id, duration * time_scale, task.started_at)
+
+    finished = []
+
+    async def consume():
+        while len(finished) < len(started):
+            target = await queue.get()
+            finished.append(target)
+            icon = '✅' if target.status == 'completed' else '❌'
+            print(f'   {icon} task {target.task_id}: {target.status} after {target.done_at - target.started_at:.1f}s '
+                  f'({target.polls} polls)')
+
+    await asyncio.gather(poller.run(), consume())
+    await client.close()
+    return finished, poller.polls
+
+
+def test_status_poller():
+    """Start TASK_COUNT async tasks and pick every result up through one StatusPoller"""
+
+    count = int(os.getenv('TASK_COUNT', '50'))
+    duration = int(os.getenv('DURATION_SECONDS', '420'))
+    concurrency = int(os.getenv('CONCURRENCY', '100'))
+    time_scale = float(os.getenv('TIME_SCALE', '1.0'))
+    poll_settings = {
+        'base_delay': float(os.getenv('POLL_BASE', '5')) * time_scale,
+        'max_delay': float(os.getenv('POLL_MAX', '60')) * time_scale,
+        'jitter': float(os.getenv('POLL_JITTER', '0.5')),
+        'max_wait': float(os.getenv('MAX_WAIT', '3600')) * time_scale,
+    }
+
+    print(f'🚀 STATUS POLLER: {count} async tasks of {duration}s')
+    print(f'🔄 Backoff {poll_settings["base_delay"]:g}s..{poll_settings["max_delay"]:g}s, '
+          f'jitter {poll_settings["jitter"]:.0%}, first poll at the expected completion')
+    print('')
+
+    start_time = time.time()
+    try:
+        finished, polls = asyncio.run(start_and_wait(count, duration, concurrency, time_scale, poll_settings))
+    except Exception as e:
+        print(f'❌ FAILED: {type(e).__name__}: {e}')
+        return
+
+    pickup = LatencyHistogram()
+    statuses = {}
+    for target in finished:
+        statuses[target.status] = statuses.get(target.status, 0) + 1
+        if target.status == 'completed':
+            pickup.record(max(0.0, target.done_at - target.expected_done))
+
+    print('')
+    print(f'🏁 All tasks resolved after {time.time() - start_time:.1f} seconds')
+    for status, n in sorted(statuses.items()):
+        print(f'📋 {status}: {n}')
+    print(f'📨 {polls} get_results polls for {len(finished)} tasks ({polls / max(1, len(finished)):.2f} per task)')
+    if pickup.count:
+        print(f'⏱️  Pickup delay after expected completion p50/p99/max: {pickup.percentile(50):.3f}s / '
+              f'{pickup.percentile(99):.3f}s / {pickup.max():.3f}s')
+
+
+if __name__ == "__main__":
+    test_status_poller()
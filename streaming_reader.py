@@ -0,0 +1,147 @@
+"""
+Incremental reader for invoke_agent_runtime streaming responses
+
+Reads the StreamingBody chunk by chunk, records time-to-first-byte and
+per-chunk arrival times, parses line-delimited JSON / SSE documents as they
+arrive and spills bodies larger than a threshold to a temporary file.
+"""
+import json
+import os
+import tempfile
+import time
+
+CHUNK_SIZE = 64 * 1024
+SPILL_THRESHOLD = int(os.getenv('SPILL_THRESHOLD_BYTES', str(8 * 1024 * 1024)))
+
+
+class IncrementalJSONParser:
+    """Parse NDJSON or SSE 'data:' lines as they complete; fall back to one whole document"""
+
+    def __init__(self, on_document, max_line=SPILL_THRESHOLD):
+        self.on_document = on_document
+        self.max_line = max_line
+        self.pending = bytearray()
+        self.line_mode = True
+        self.documents = 0
+
+    def feed(self, chunk):
+        if not self.line_mode:
+            return
+        self.pending += chunk
+        while self.line_mode:
+            newline = self.pending.find(b'\n')
+            if newline < 0:
+                break
+            line = bytes(self.pending[:newline]).strip()
+            del self.pending[:newline + 1]
+            self._parse_line(line)
+        if len(self.pending) > self.max_line:
+            # One enormous line - stop buffering it here, the caller keeps or spills the raw bytes
+            self.line_mode = False
+            self.pending = bytearray()
+
+    def _parse_line(self, line):
+        if line.startswith(b'data:'):
+            line = line[5:].strip()
+        if not line or line.startswith(b':') or line.startswith(b'event:') or line.startswith(b'id:'):
+            return
+        try:
+            document = json.loads(line)
+        except ValueError:
+            # Not line-delimited (e.g. pretty-printed JSON); the whole body is parsed at the end
+            self.line_mode = False
+            return
+        self.documents += 1
+        self.on_document(document)
+
+    def finish(self):
+        """Parse a trailing line without newline; returns True if any line documents were seen"""
+        if self.line_mode and self.pending.strip():
+            self._parse_line(bytes(self.pending).strip())
+        self.pending = bytearray()
+        return self.line_mode and self.documents > 0
+
+
+class StreamResult:
+    """Timing and content of one streamed response"""
+    __slots__ = ('ttfb', 'chunk_times', 'total_bytes', 'body_seconds', 'data', 'spill_path', 'documents')
+
+    def __init__(self):
+        self.ttfb = None
+        self.chunk_times = []  # (seconds since start_time, chunk size)
+        self.total_bytes = 0
+        self.body_seconds = 0.0
+        self.data = bytearray()
+        self.spill_path = None
+        self.documents = []
+
+    def text(self):
+        """Decoded body, or a placeholder when it was spilled to disk"""
+        if self.spill_path:
+            return f'<{self.total_bytes} bytes spilled to {self.spill_path}>'
+        return self.data.decode('utf-8', errors='replace')
+
+    def content(self):
+        """The whole body as bytes, read back from the spill file when there is one"""
+        if self.spill_path:
+            with open(self.spill_path, 'rb') as f:
+                return f.read()
+        return bytes(self.data)
+
+    def document(self):
+        """The single parsed document, the last streamed one, or None"""
+        return self.documents[-1] if self.documents else None
+
+    def summary(self):
+        ttfb = f'{self.ttfb:.3f}s' if self.ttfb is not None else 'n/a'
+        return (f'TTFB {ttfb}, body {self.body_seconds:.3f}s, '
+                f'{self.total_bytes} bytes in {len(self.chunk_times)} chunks')
+
+
+def read_streaming_body(body, start_time, chunk_size=CHUNK_SIZE, spill_threshold=SPILL_THRESHOLD,
+                        on_document=None):
+    """Consume a botocore StreamingBody incrementally
+
+    start_time is the time.time() taken just before invoke_agent_runtime was called.
+    on_document receives each parsed document; without it they are kept in result.documents.
+    """
+    result = StreamResult()
+    on_document = on_document or result.documents.append
+    parser = IncrementalJSONParser(on_document, max_line=spill_threshold)
+    spill = None
+    first_byte_at = None
+
+    try:
+        for chunk in body.iter_chunks(chunk_size):
+            now = time.time()
+            if first_byte_at is None:
+                first_byte_at = now
+                result.ttfb = now - start_time
+            result.chunk_times.append((now - start_time, len(chunk)))
+            result.total_bytes += len(chunk)
+            parser.feed(chunk)
+
+            if spill is not None:
+                spill.write(chunk)
+            elif result.total_bytes > spill_threshold:
+                spill = tempfile.NamedTemporaryFile(prefix='agentcore-response-', suffix='.body', delete=False)
+                spill.write(result.data)
+                spill.write(chunk)
+                result.spill_path = spill.name
+                result.data = bytearray()
+            else:
+                result.data += chunk
+    finally:
+        if spill is not None:
+            spill.close()
+        body.close()
+
+    if first_byte_at is not None:
+        result.body_seconds = time.time() - first_byte_at
+
+    if not parser.finish() and spill is None and result.data:
+        try:
+            on_document(json.loads(result.data))
+        except ValueError:
+            pass
+    return result
@@ -0,0 +1,195 @@
+"""
+Sync invocation with async fallback - reattaches to the result instead of losing the work
+
+The sync payload carries a client-generated task_id. If the connection drops
+or times out while the agent is working, the client keeps the same
+runtimeSessionId (so it lands on the same session) and polls
+{'action': 'get_results', 'task_id': ...} the way github_async_test does,
+instead of invoking again. A not_found answer means the request never
+reached the agent, so only then is the invocation sent again with the same
+task_id (the agent treats a repeated task_id as the same work).
+
+Requires an agent that stores results by task_id and answers get_results
+with the task_id echoed back (local_agentcore_server.py's sync agent does; the
+deployed syncAgentv2 takes only prompt/steps and would treat every poll as new
+work), so the fallback is opt-in with FALLBACK=1. A poll answer without our
+task_id and a processing/completed/not_found status, or MAX_POLL_LOSSES polls
+in a row that get no answer, stop the fallback instead of polling blind until
+MAX_WAIT.
+
+  STEPS=5  RUNS=5  CONCURRENCY=5  FALLBACK=0 (1 = reattach via get_results)
+  READ_TIMEOUT=600  POLL_TIMEOUT=30  POLL_INTERVAL=10  MAX_WAIT=3600  MAX_POLL_LOSSES=3
+  (POLL_INTERVAL and MAX_WAIT are multiplied by TIME_SCALE)
+"""
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ConnectionClosedError, EndpointConnectionError, ReadTimeoutError, ResponseStreamingError
+
+from agentcore_common import agent_arn, build_payload, expected_seconds, make_client, new_session_id
+from latency_histogram import RunStats
+from streaming_reader import read_streaming_body
+
+# Failures after which the agent may still be working on the request
+CONNECTION_LOSS = (ReadTimeoutError, ConnectionClosedError, ResponseStreamingError, EndpointConnectionError,
+                   ConnectionError)
+
+# get_results answers from an agent that keeps results by task_id
+POLL_STATUSES = ('processing', 'completed', 'not_found')
+
+
+class FallbackResult:
+    """How one invocation reached its result"""
+    __slots__ = ('task_id', 'mode', 'document', 'error', 'started_at', 'finished_at', 'drops', 'polls', 'resends')
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.mode = None  # sync | reattached | failed
+        self.document = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.drops = 0
+        self.polls = 0
+        self.resends = 0
+
+    def time_to_result(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+
+def invoke_sync(client, arn, session_id, payload):
+    response = client.invoke_agent_runtime(
+        agentRuntimeArn=arn,
+        runtimeSessionId=session_id,
+        payload=json.dumps(payload)
+    )
+    return read_streaming_body(response['response'], time.time()).document()
+
+
+def invoke_with_fallback(client, poll_client, arn, session_id, payload, poll_interval=10.0, max_wait=3600.0,
+                         fallback=False, max_poll_losses=3):
+    """Invoke synchronously; with fallback, on connection loss poll get_results on the same session until done"""
+    task_id = uuid.uuid4().hex
+    payload = dict(payload, task_id=task_id)
+    result = FallbackResult(task_id)
+    deadline = result.started_at + max_wait
+    send = True
+    poll_losses = 0
+
+    while time.time() < deadline:
+        if send:
+            try:
+                result.document = invoke_sync(client, arn, session_id, payload)
+                result.mode = 'sync' if not result.drops else 'reattached'
+                break
+            except CONNECTION_LOSS as e:
+                result.drops += 1
+                result.error = type(e).__name__
+                if not fallback:
+                    break
+            except Exception as e:
+                result.error = type(e).__name__
+                break
+            send = False
+
+        time.sleep(min(poll_interval, max(0.0, deadline - time.time())))
+        result.polls += 1
+        try:
+            document = invoke_sync(poll_client, arn, session_id, {'action': 'get_results', 'task_id': task_id})
+        except CONNECTION_LOSS as e:
+            poll_losses += 1
+            if poll_losses >= max_poll_losses:
+                result.error = f'PollUnanswered ({type(e).__name__})'
+                break
+            continue  # the path is still flaky; try again next interval
+        except Exception as e:
+            result.error = type(e).__name__
+            break
+        poll_losses = 0
+        status = document.get('status') if isinstance(document, dict) else None
+        if status not in POLL_STATUSES or document.get('task_id') != task_id:
+            result.error = 'GetResultsUnsupported'  # the agent does not keep results by task_id
+            break
+        if status == 'completed':
+            result.document = document
+            result.mode = 'reattached'
+            break
+        if status == 'not_found':
+            result.resends += 1
+            send = True  # the first request never arrived, so nothing is running yet
+
+    result.finished_at = time.time()
+    if result.mode is None:
+        result.mode = 'failed'
+        result.error = result.error or 'MaxWaitExceeded'
+    return result
+
+
+def test_sync_fallback():
+    """Run RUNS sync invocations and report time-to-result with and without the fallback"""
+
+    steps = int(os.getenv('STEPS', '5'))
+    runs = int(os.getenv('RUNS', '5'))
+    concurrency = int(os.getenv('CONCURRENCY', str(runs)))
+    fallback = os.getenv('FALLBACK', '0') == '1'
+    read_timeout = int(os.getenv('READ_TIMEOUT', '600'))
+    poll_timeout = int(os.getenv('POLL_TIMEOUT', '30'))
+    time_scale = float(os.getenv('TIME_SCALE', '1.0'))
+    poll_interval = float(os.getenv('POLL_INTERVAL', '10')) * time_scale
+    max_wait = float(os.getenv('MAX_WAIT', '3600')) * time_scale
+    max_poll_losses = int(os.getenv('MAX_POLL_LOSSES', '3'))
+
+    # No botocore retries: a silent re-send would start the work twice on agents without task_id support
+    client = make_client(read_timeout=read_timeout, connect_timeout=30, max_pool_connections=concurrency,
+                         retries={'total_max_attempts': 1})
+    poll_client = make_client(read_timeout=poll_timeout, connect_timeout=30, max_pool_connections=concurrency,
+                              retries={'total_max_attempts': 1})
+    requested = expected_seconds('sync', steps * 60)
+    stats = RunStats(label=f'sync-{"fallback" if fallback else "plain"}', requested_seconds=requested)
+
+    print(f'🚀 SYNC FALLBACK TEST: {runs} x {steps} steps, fallback {"ON" if fallback else "OFF"}')
+    print(f'⏰ Read timeout {read_timeout}s, poll every {poll_interval:g}s (timeout {poll_timeout}s), give up after {max_wait:g}s')
+    print('')
+
+    try:
+        arn = agent_arn('sync')
+    except Exception as e:
+        print(f'❌ FAILED to build agent ARN: {e}')
+        return
+
+    def run(index):
+        session_id = new_session_id(f'sync-fallback-{index}')
+        result = invoke_with_fallback(client, poll_client, arn, session_id, build_payload('sync', steps * 60),
+                                      poll_interval, max_wait, fallback, max_poll_losses)
+        if result.mode == 'failed':
+            print(f'   ❌ {index + 1}/{runs}: {result.error} after {result.time_to_result():.1f}s')
+        else:
+            detail = f' after {result.drops} drop(s), {result.polls} poll(s)' if result.drops else ''
+            print(f'   ✅ {index + 1}/{runs}: {result.mode} in {result.time_to_result():.1f}s{detail}')
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(run, range(runs)))
+
+    for result in results:
+        if result.mode == 'failed':
+            stats.record_error(result.error)
+        else:
+            stats.record_success(result.time_to_result())
+
+    modes = {}
+    for result in results:
+        modes[result.mode] = modes.get(result.mode, 0) + 1
+    print('')
+    print(f'📊 Outcomes: {", ".join(f"{mode}={n}" for mode, n in sorted(modes.items()))}')
+    print(f'🔁 Drops {sum(r.drops for r in results)}, polls {sum(r.polls for r in results)}, '
+          f're-sends after not_found {sum(r.resends for r in results)}')
+    print('📊 Time to result:')
+    stats.report()
+
+
+if __name__ == "__main__":
+    test_sync_fallback()
@@ -0,0 +1,139 @@
+"""
+Per-connection TCP options (keep-alive, TCP_USER_TIMEOUT, TCP_NODELAY) for botocore clients
+
+Replaces monkeypatching socket.socket: options are attached to one client's
+urllib3 connection class, can differ per endpoint host, and the values the
+kernel actually accepted are read back after each connect.
+
+  KEEPALIVE_IDLE=60 KEEPALIVE_INTERVAL=30 KEEPALIVE_COUNT=3
+  TCP_USER_TIMEOUT_MS=0 (0 = kernel default)  TCP_NODELAY=1
+"""
+import os
+import socket
+import threading
+
+from agentcore_common import install_connection_mixin
+
+
+class TcpOptions:
+    """One set of socket options; None leaves the kernel default in place"""
+
+    def __init__(self, keepalive=True, keep_idle=None, keep_interval=None, keep_count=None,
+                 user_timeout_ms=None, nodelay=True):
+        self.keepalive = keepalive
+        self.keep_idle = keep_idle
+        self.keep_interval = keep_interval
+        self.keep_count = keep_count
+        self.user_timeout_ms = user_timeout_ms
+        self.nodelay = nodelay
+
+    @classmethod
+    def from_env(cls, keep_idle=60, keep_interval=30, keep_count=3):
+        """Read KEEPALIVE_* / TCP_* variables, falling back to the given defaults"""
+        user_timeout = int(os.getenv('TCP_USER_TIMEOUT_MS', '0'))
+        return cls(
+            keepalive=os.getenv('KEEPALIVE', '1') == '1',
+            keep_idle=int(os.getenv('KEEPALIVE_IDLE', str(keep_idle))),
+            keep_interval=int(os.getenv('KEEPALIVE_INTERVAL', str(keep_interval))),
+            keep_count=int(os.getenv('KEEPALIVE_COUNT', str(keep_count))),
+            user_timeout_ms=user_timeout or None,
+            nodelay=os.getenv('TCP_NODELAY', '1') == '1',
+        )
+
+    def socket_options(self):
+        """(level, option, value) tuples in urllib3's socket_options format; unsupported options are skipped"""
+        options = []
+        if self.nodelay:
+            options.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+        if self.keepalive:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            for name, value in (('TCP_KEEPIDLE', self.keep_idle), ('TCP_KEEPINTVL', self.keep_interval),
+                                ('TCP_KEEPCNT', self.keep_count)):
+                if value is not None and hasattr(socket, name):
+                    options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+            if self.keep_idle is not None and not hasattr(socket, 'TCP_KEEPIDLE') and hasattr(socket, 'TCP_KEEPALIVE'):
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, self.keep_idle))  # macOS name
+        if self.user_timeout_ms is not None and hasattr(socket, 'TCP_USER_TIMEOUT'):
+            options.append((socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, self.user_timeout_ms))
+        return options
+
+    def apply(self, sock):
+        for level, option, value in self.socket_options():
+            sock.setsockopt(level, option, value)
+
+    def describe(self):
+        if not self.keepalive:
+            keepalive = 'keep-alive OFF'
+        else:
+            keepalive = f'keep-alive idle={self.keep_idle} interval={self.keep_interval} count={self.keep_count}'
+        user_timeout = f'{self.user_timeout_ms}ms' if self.user_timeout_ms is not None else 'default'
+        return f'{keepalive}, user_timeout={user_timeout}, nodelay={"on" if self.nodelay else "off"}'
+
+
+def effective_options(sock):
+    """Read back the options the kernel is actually using on a connected socket"""
+    values = {}
+    for key, level, name in (
+        ('keepalive', socket.SOL_SOCKET, 'SO_KEEPALIVE'),
+        ('keep_idle', socket.IPPROTO_TCP, 'TCP_KEEPIDLE'),
+        ('keep_interval', socket.IPPROTO_TCP, 'TCP_KEEPINTVL'),
+        ('keep_count', socket.IPPROTO_TCP, 'TCP_KEEPCNT'),
+        ('user_timeout_ms', socket.IPPROTO_TCP, 'TCP_USER_TIMEOUT'),
+        ('nodelay', socket.IPPROTO_TCP, 'TCP_NODELAY'),
+    ):
+        if hasattr(socket, name):
+            try:
+                values[key] = sock.getsockopt(level, getattr(socket, name))
+            except OSError:
+                pass
+    return values
+
+
+class TcpOptionsFactory:
+    """Applies TcpOptions per endpoint host to the connections of one botocore client"""
+
+    def __init__(self, default=None, per_host=None):
+        self.default = default or TcpOptions()
+        self.per_host = dict(per_host or {})
+        self.applied = {}  # host -> effective values read back from the last connection
+        self.connections = {}  # host -> number of connections opened
+        self._lock = threading.Lock()
+
+    def options_for(self, host):
+        return self.per_host.get(host, self.default)
+
+    def _connected(self, host, sock):
+        values = effective_options(sock)
+        with self._lock:
+            self.applied[host] = values
+            self.connections[host] = self.connections.get(host, 0) + 1
+
+    def install(self, client):
+        factory = self
+
+        class TcpOptionsConnection:
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self._base_socket_options = list(self.socket_options or [])
+                self._options_host = self.host
+
+            def _new_conn(self):
+                # Tunnelled connections only learn their target host in set_tunnel(), which runs before this
+                self._options_host = getattr(self, '_tunnel_host', None) or self.host
+                self.socket_options = self._base_socket_options + \
+                    factory.options_for(self._options_host).socket_options()
+                return super()._new_conn()
+
+            def connect(self):
+                super().connect()
+                factory._connected(self._options_host, self.sock)
+
+        install_connection_mixin(client, TcpOptionsConnection)
+        return self
+
+    def report(self):
+        for host, values in sorted(self.applied.items()):
+            wanted = self.options_for(host).describe()
+            applied = ' '.join(f'{key}={value}' for key, value in values.items())
+            print(f'🔧 {host}: {self.connections.get(host, 0)} connection(s), requested [{wanted}]')
+            print(f'   applied [{applied}]')